@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""End-to-end pipeline benchmark against synthetic ZIM fixtures.
+
+For each --scale, builds (or reuses) a fixture archive with make_fixture.py,
+copies the pipeline scripts into a scratch directory so nothing under scrape/
+or src/ is touched, and runs stages 1–5 there as separate processes with
+ZIM_PATH pointing at the fixture. The LLM stages (enrich.py,
+score_popularity.py) talk to a local stub of the Messages API via
+ANTHROPIC_BASE_URL, so runs are free, offline and deterministic.
+
+Each stage records wall time, peak RSS and items/s (species indexed, pages
+written, sprites made, ...), plus the span and counter totals from the
+stage's instrument.py run log. The index stage is also scored against the
+fixture's expected index (found, exact, missing and unexpected species), so
+parser changes show up as accuracy, not just speed. Results go to
+scrape/bench/results/ as one JSON file per scale and run, and are compared
+with the previous run at the same scale so throughput regressions show up per
+stage.
+
+Usage:
+    python3 scrape/bench.py                       # 1k species
+    python3 scrape/bench.py --scale 1k 10k 100k
+    python3 scrape/bench.py --stages index pages extract --llm-latency-ms 50
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from make_fixture import FIXTURE_VERSION, expected_path, parse_count
+from records import count_records, read_records
+
+SCRAPE_DIR = Path(__file__).resolve().parent
+BENCH_DIR = SCRAPE_DIR / "bench"
+FIXTURES_DIR = BENCH_DIR / "fixtures"
+RESULTS_DIR = BENCH_DIR / "results"
+
+RESULTS_VERSION = 1
+
+
+def count_json(path, key=None):
+    """Length of a JSON file's top-level value, or the value of `key` in it."""
+    if not path.exists():
+        return 0
+    data = json.loads(path.read_text())
+    return data[key] if key else len(data)
+
+
+def count_files(directory, pattern):
+    return sum(1 for _ in directory.glob(pattern)) if directory.exists() else 0
+
+
+# (name, script, output item count given the scratch scrape/ dir)
+STAGES = [
+    ("index", "build_index.py", lambda d: count_records(d / "species_index.jsonl")),
+    ("pages", "extract_pages.py", lambda d: count_files(d / "pages", "*.html")),
+    ("extract", "extract.py", lambda d: count_records(d / "extracted.jsonl")),
+    ("images", "extract_images.py", lambda d: count_files(d / "images", "*.png")),
+    ("originals", "extract_originals.py", lambda d: count_files(d / "originals", "*.webp")),
+    ("dedupe", "dedupe_images.py", lambda d: count_json(d / "image_dupes.json", "hashed")),
+    ("photos", "transcode_photos.py", lambda d: count_json(d / "photo_widths.json")),
+    ("enrich", "enrich.py", lambda d: count_json(d / "llm_cache" / "descriptions.json")),
+    ("popularity", "score_popularity.py", lambda d: count_json(d / "popularity_scores.json")),
+    ("build", "build.py", lambda d: count_json(d.parent / "src" / "data" / "species.json")),
+]
+
+# Tools a stage shells out to; the stage is skipped when they're missing
+REQUIRES = {"images": ["convert"], "photos": ["convert"]}
+
+
+# ---------------------------------------------------------------------------
+# LLM stub — just enough of POST /v1/messages for enrich.py and
+# score_popularity.py. Answers are derived from a hash of the species name.
+# ---------------------------------------------------------------------------
+def stable(text, mod):
+    return zlib.crc32(text.encode()) % mod
+
+
+def stub_answer(prompt):
+    if "Animals:\n" in prompt:
+        names = [line[2:] for line in prompt.split("Animals:\n", 1)[1].splitlines()
+                 if line.startswith("- ")]
+        return {name: stable(name, 101) for name in names}
+
+    m = re.search(r"Wikipedia article about (.+?) \(", prompt)
+    name = m.group(1) if m else "this animal"
+    answer = {}
+    if '"region":' in prompt:
+        answer["region"] = ["Continental US", "Southeastern US", "Western US, Mexico"][stable(name, 3)]
+    if '"habitat":' in prompt:
+        answer["habitat"] = ["Deciduous forests", "Near large bodies of water", "Grasslands"][stable(name, 3)]
+    if '"stats":' in prompt:
+        answer["stats"] = {k: stable(name + k, 101) for k in ("size", "speed", "rarity", "danger")}
+    if '"description":' in prompt:
+        answer["description"] = f"A benchmark stand-in for the {name}, scoring {stable(name, 100)} on trivia."
+    if '"name":' in prompt:
+        answer["name"] = name.title()
+    return answer
+
+
+class StubLLM(BaseHTTPRequestHandler):
+    latency = 0.0
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = body["messages"][0]["content"]
+        if self.latency:
+            time.sleep(self.latency)
+        text = json.dumps(stub_answer(prompt))
+        payload = json.dumps({
+            "id": "msg_bench", "type": "message", "role": "assistant",
+            "model": body.get("model", "stub"),
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn", "stop_sequence": None,
+            "usage": {"input_tokens": len(prompt) // 4, "output_tokens": len(text) // 4},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub(latency_ms):
+    StubLLM.latency = latency_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubLLM)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ---------------------------------------------------------------------------
+# Running stages
+# ---------------------------------------------------------------------------
+def fixture_for(species, seed, rebuild):
+    path = FIXTURES_DIR / f"fixture-{species}-s{seed}-v{FIXTURE_VERSION}.zim"
+    if path.exists() and expected_path(path).exists() and not rebuild:
+        print(f"Reusing {path.name}")
+        return path, {"bytes": path.stat().st_size, "seconds": None, "cached": True}
+    # In a child process, so the harness stays small: Linux carries the
+    # parent's peak RSS into each stage's ru_maxrss
+    print(f"Building {path.name}...")
+    start = time.perf_counter()
+    subprocess.run([sys.executable, SCRAPE_DIR / "make_fixture.py", "--species", str(species),
+                    "--seed", str(seed), "--out", path], check=True)
+    return path, {"bytes": path.stat().st_size,
+                  "seconds": round(time.perf_counter() - start, 2), "cached": False}
+
+
+def scratch_tree(root):
+    """A copy of the pipeline scripts under root/scrape, with the output dirs
+    build.py expects next to it."""
+    scrape = root / "scrape"
+    scrape.mkdir()
+    for script in SCRAPE_DIR.glob("*.py"):
+        shutil.copy2(script, scrape)
+    (root / "src" / "data").mkdir(parents=True)
+    (root / "public" / "images" / "animals").mkdir(parents=True)
+    return scrape
+
+
+def run_log_totals(scrape, script):
+    """Span and counter totals from the stage's instrument.py run log."""
+    logs = sorted((scrape / "runs").glob(f"{Path(script).stem}-*.jsonl"))
+    if not logs:
+        return {}
+    spans, counters = {}, {}
+    for line in logs[-1].read_text().splitlines():
+        record = json.loads(line)
+        if record["event"] == "span":
+            spans[record["name"]] = {"calls": record["calls"], "seconds": record["seconds"]}
+        elif record["event"] == "counter":
+            counters[record["name"]] = record["value"]
+    return {"spans": spans, "counters": counters}
+
+
+def index_accuracy(index_path, expected_path):
+    """How species_index.jsonl compares with the fixture's expected index,
+    matching entries by wiki path."""
+    found = {s["wiki_path"]: s for s in read_records(index_path)} if index_path.exists() else {}
+    expected = {s["wiki_path"]: s for s in read_records(expected_path)}
+    hits = found.keys() & expected.keys()
+    return {
+        "expected": len(expected),
+        "found": len(hits),
+        "exact": sum(1 for path in hits if found[path] == expected[path]),
+        "missing": len(expected.keys() - found.keys()),
+        "unexpected": len(found.keys() - expected.keys()),
+    }
+
+
+def run_stage(name, script, counter, scrape, env, args, log_dir):
+    missing = [tool for tool in REQUIRES.get(name, []) if not shutil.which(tool)]
+    if missing:
+        print(f"  {name:<11} skipped (needs {', '.join(missing)})")
+        return {"name": name, "status": "skipped", "reason": f"needs {', '.join(missing)}"}
+
+    log_path = log_dir / f"{name}.log"
+    with open(log_path, "w") as log:
+        start = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, script, *args], cwd=scrape, env=env,
+                                stdout=log, stderr=subprocess.STDOUT)
+        _, status, usage = os.wait4(proc.pid, 0)
+        seconds = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+
+    items = counter(scrape)
+    result = {
+        "name": name,
+        "status": "ok" if proc.returncode == 0 else "failed",
+        "seconds": round(seconds, 3),
+        "items": items,
+        "items_per_sec": round(items / seconds, 1) if seconds else None,
+        "cpu_seconds": round(usage.ru_utime + usage.ru_stime, 3),
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        "max_rss_mb": round(usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1),
+        **run_log_totals(scrape, script),
+    }
+    line = (f"  {name:<11} {result['status']:<7} {seconds:8.2f}s  {items:>7} items  "
+            f"{result['items_per_sec'] or 0:>9.1f}/s  {result['max_rss_mb']:>7.1f} MB")
+    print(line, flush=True)
+    if proc.returncode != 0:
+        tail = log_path.read_text(errors="replace").splitlines()[-5:]
+        result["log_tail"] = tail
+        for row in tail:
+            print(f"      | {row}")
+    return result
+
+
+def git_rev():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SCRAPE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def previous_result(species, discover):
+    """The latest earlier run at this scale with the same index mode."""
+    for run in sorted(RESULTS_DIR.glob(f"{species}-*.json"), reverse=True):
+        result = json.loads(run.read_text())
+        if result.get("discover", False) == discover:
+            return result
+    return None
+
+
+def compare(result, before, threshold):
+    """Print per-stage throughput change vs. the previous run; returns regressions."""
+    if not before:
+        return []
+    old = {s["name"]: s for s in before["stages"] if s["status"] == "ok"}
+    print(f"  vs. {before['started']} ({before.get('git') or 'unknown rev'}):")
+    regressions = []
+    for stage in result["stages"]:
+        prev = old.get(stage["name"])
+        if stage["status"] != "ok" or not prev or not prev["items_per_sec"] or not stage["items_per_sec"]:
+            continue
+        change = stage["items_per_sec"] / prev["items_per_sec"] - 1
+        flag = ""
+        if change < -threshold:
+            flag = "  <-- regression"
+            regressions.append(stage["name"])
+        print(f"    {stage['name']:<11} {prev['items_per_sec']:>9.1f}/s → "
+              f"{stage['items_per_sec']:>9.1f}/s  {change:+.1%}{flag}")
+    return regressions
+
+
+def bench_scale(species, args, stub_url):
+    fixture, fixture_stats = fixture_for(species, args.seed, args.rebuild_fixture)
+    env = os.environ | {
+        "ZIM_PATH": str(fixture),
+        "ANTHROPIC_BASE_URL": stub_url,
+        "ANTHROPIC_API_KEY": "bench",
+        "PYTHONUNBUFFERED": "1",
+    }
+    stage_args = {"index": ["--workers", str(args.workers)] + (["--discover"] if args.discover else [])}
+
+    root = Path(tempfile.mkdtemp(prefix=f"pokedex-bench-{species}-"))
+    try:
+        scrape = scratch_tree(root)
+        env["SCRAPE_RUN_DIR"] = str(scrape / "runs")
+        log_dir = root / "logs"
+        log_dir.mkdir()
+        print(f"\n{species} species ({root})")
+        stages = [
+            run_stage(name, script, counter, scrape, env, stage_args.get(name, []), log_dir)
+            for name, script, counter in STAGES
+            if name in args.stages
+        ]
+        for stage in stages:
+            if stage["name"] == "index" and stage["status"] == "ok":
+                acc = stage["accuracy"] = index_accuracy(scrape / "species_index.jsonl",
+                                                         expected_path(fixture))
+                print(f"  index accuracy: {acc['found']}/{acc['expected']} found, "
+                      f"{acc['exact']} exact, {acc['missing']} missing, {acc['unexpected']} unexpected")
+    finally:
+        if args.keep:
+            print(f"  Kept scratch tree at {root}")
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+    return {
+        "version": RESULTS_VERSION,
+        "started": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git": git_rev(),
+        "species": species,
+        "seed": args.seed,
+        "workers": args.workers,
+        "discover": args.discover,
+        "llm_latency_ms": args.llm_latency_ms,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "fixture": {"name": fixture.name, **fixture_stats},
+        "stages": stages,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", nargs="+", default=["1k"],
+                        help="species counts to benchmark, e.g. 1k 10k 100k")
+    parser.add_argument("--stages", nargs="+", default=[name for name, _, _ in STAGES],
+                        choices=[name for name, _, _ in STAGES])
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="passed to build_index.py")
+    parser.add_argument("--discover", action="store_true",
+                        help="run build_index.py with --discover (full-text fish discovery)")
+    parser.add_argument("--llm-latency-ms", type=int, default=0,
+                        help="delay added to every stub LLM response")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="items/s drop vs. the previous run to flag as a regression")
+    parser.add_argument("--rebuild-fixture", action="store_true")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch tree and logs")
+    args = parser.parse_args()
+
+    stub = start_stub(args.llm_latency_ms)
+    stub_url = f"http://127.0.0.1:{stub.server_address[1]}"
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+
+    regressions = {}
+    try:
+        for scale in args.scale:
+            species = parse_count(scale)
+            before = previous_result(species, args.discover)
+            result = bench_scale(species, args, stub_url)
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            out = RESULTS_DIR / f"{species}-{stamp}.json"
+            out.write_text(json.dumps(result, indent=2))
+            print(f"  Saved {out.relative_to(SCRAPE_DIR.parent)}")
+            slower = compare(result, before, args.threshold)
+            if slower:
+                regressions[species] = slower
+    finally:
+        stub.shutdown()
+
+    if regressions:
+        print("\nRegressions: " + "; ".join(f"{k}: {', '.join(v)}" for k, v in regressions.items()))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,122 @@
 """Assemble final species.json from extracted data + LLM cache.
 
 Reads:
-  - scrape/extracted.json          (deterministic fields)
+  - scrape/extracted.jsonl         (deterministic fields, streamed)
   - scrape/llm_cache/*.json        (LLM-generated fields)
   - scrape/popularity_scores.json  (cultural awareness scores)
   - scrape/images/*.png            (pixelated species images)
   - scrape/image_filenames.json    (Wikimedia filenames for original images)
+  - scrape/placeholders.json       (wiki_slug → sprite placeholder colors)
+  - scrape/photos/*.{avif,webp}    (responsive photos, from transcode_photos.py)
+  - scrape/photo_widths.json       (wiki_slug → photo widths)
+  - scrape/image_dupes.json        (species whose images duplicate another's)
 
 Outputs:
   - src/data/species.json                  (complete Pokédex entries)
   - public/images/animals/{slug}.png       (copied species sprites)
   - public/images/originals/{slug}.webp    (copied original photos)
+  - public/images/photos/{slug}-{w}.{avif,webp} (copied responsive photos)
+  - src/data/search-index.json             (search postings + facet bitsets,
+                                            including one per state/province)
+  - src/data/precache-plan.json            (service worker precache tiers, read by vite.config.js)
+  - public/data/manifest.json              (dataset version, and diffs from earlier versions)
+  - public/data/diffs/{from}-{to}.json     (what changed in species.json between versions)
+
+Records are streamed: extracted.jsonl is read one record at a time, assembled
+records are spilled to a temp file while only their sort keys stay in memory,
+and species.json is written entry by entry in display order. The search
+index and precache plan are built from SLIM_FIELDS of each entry, and the
+similar-species neighbors from each record's stats, type and genus. Each
+entry's free-text region is mapped to US states and Canadian provinces
+(places.py) and stored as a `places` bitmask.
+
+Species whose sprite or original is byte-identical to another species' (see
+dedupe_images.py) point at that species' files instead of their own copy, so
+public/ holds, and the service worker caches, one file per distinct image.
+
+The previous species.json is read before it's overwritten, and
+dataset_versions.py publishes the difference as a new dataset version, so
+installed clients download a diff rather than the whole file.
 """
 
+import glob
 import hashlib
 import json
+import re
 import shutil
+import tempfile
+import unicodedata
+from collections import Counter
 from pathlib import Path
 from urllib.parse import quote
 
+import numpy as np
+
+import dataset_versions
+import instrument
+import places
+from instrument import span
+from records import Extracted, read_records
+
 SCRAPE_DIR = Path(__file__).resolve().parent
 PROJECT_DIR = SCRAPE_DIR.parent
 CACHE_DIR = SCRAPE_DIR / "llm_cache"
-EXTRACTED_PATH = SCRAPE_DIR / "extracted.json"
+EXTRACTED_PATH = SCRAPE_DIR / "extracted.jsonl"
 POPULARITY_PATH = SCRAPE_DIR / "popularity_scores.json"
 FILENAMES_PATH = SCRAPE_DIR / "image_filenames.json"
+PLACEHOLDERS_PATH = SCRAPE_DIR / "placeholders.json"
+PHOTO_WIDTHS_PATH = SCRAPE_DIR / "photo_widths.json"
+DUPES_PATH = SCRAPE_DIR / "image_dupes.json"
 OUTPUT_PATH = PROJECT_DIR / "src" / "data" / "species.json"
+SEARCH_INDEX_PATH = PROJECT_DIR / "src" / "data" / "search-index.json"
+PRECACHE_PLAN_PATH = PROJECT_DIR / "src" / "data" / "precache-plan.json"
 SPRITE_DIR = SCRAPE_DIR / "images"
 ORIGINALS_DIR = SCRAPE_DIR / "originals"
+PHOTOS_DIR = SCRAPE_DIR / "photos"
 PUBLIC_IMG_DIR = PROJECT_DIR / "public" / "images" / "animals"
 PUBLIC_ORIGINALS_DIR = PROJECT_DIR / "public" / "images" / "originals"
+PUBLIC_PHOTOS_DIR = PROJECT_DIR / "public" / "images" / "photos"
+PUBLIC_DATA_DIR = PROJECT_DIR / "public" / "data"
+# Formats transcode_photos.py writes at every width (must match src/lib/photos.js)
+PHOTO_FORMATS = ("avif", "webp")
 
 TYPE_ORDER = ["Mammal", "Bird", "Reptile", "Amphibian", "Fish"]
 
+# The only species.json fields build_search_index() and build_precache_plan() read
+SLIM_FIELDS = ("id", "name", "species", "type", "region", "places", "image", "conservation_status")
+
+# Service worker tiers: the most popular sprites are precached on install, the
+# rest are cached on first view in LRU runtime caches of these sizes
+PRECACHE_SPRITES = 300
+RUNTIME_SPRITES = 600
+RUNTIME_ORIGINALS = 150
+RUNTIME_PHOTOS = 150
+
+# Similar species: the nearest SIMILAR_COUNT by distance between stats vectors
+# (each stat 0-100), less these bonuses for sharing a genus or type
+SIMILAR_COUNT = 4
+SAME_GENUS_BONUS = 40
+SAME_TYPE_BONUS = 20
+# Distance matrix cells computed at once, to bound memory at any scale
+SIMILAR_BLOCK_CELLS = 1 << 20
+STAT_NAMES = ("size", "speed", "rarity", "danger")
+
+# Search index fields, posting bits and format version (must match src/lib/search.js)
+SEARCH_FIELDS = [("name", 1), ("species", 2), ("region", 4)]
+SEARCH_INDEX_VERSION = 2
+
+# IUCN status → filter code (must match STATUS_CODES in src/hooks/use-species.js)
+STATUS_CODES = {
+    "Least Concern": "LC",
+    "Near Threatened": "NT",
+    "Vulnerable": "VU",
+    "Endangered": "EN",
+    "Critically Endangered": "CR",
+    "Extinct": "EX",
+    "Data Deficient": "DD",
+    "Secure": "DD",
+}
+
 
 def load_cache(name):
     path = CACHE_DIR / f"{name}.json"
@@ -49,21 +133,308 @@ def wikimedia_thumb_url(filename, width=800):
     return f"{prefix}/{encoded}/{width}px-{encoded}"
 
 
-def main():
-    with open(EXTRACTED_PATH) as f:
-        extracted = json.load(f)
-
-    descriptions = load_cache("descriptions")
-    stats = load_cache("stats")
-    regions = load_cache("regions")
-    habitats = load_cache("habitats")
-    names = load_cache("names")
-
-    image_filenames = {}
-    if FILENAMES_PATH.exists():
-        image_filenames = json.loads(FILENAMES_PATH.read_text())
+def normalize_search_text(text):
+    """Lowercase, strip accents and apostrophes, collapse everything else to spaces.
+    Mirrors normalize() in src/lib/search.js."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if unicodedata.category(c) != "Mn")
+    text = re.sub(r"['\u2019]", "", text.lower())
+    return re.sub(r"[^a-z0-9]+", " ", text).strip()
+
+
+def build_search_index(species):
+    """Build the search index shipped next to species.json.
+
+    Every normalized token of the common name, binomial and region gets a
+    posting list of `doc * 8 + field_bits` codes, where doc is the position in
+    species.json. Terms are sorted so prefix lookups are a binary search, and
+    trigrams of each `$term$` map back to term ids for typo-tolerant matching."""
+    postings = {}
+    for doc, s in enumerate(species):
+        for field, bit in SEARCH_FIELDS:
+            for token in normalize_search_text(s.get(field) or "").split():
+                bits = postings.setdefault(token, {})
+                bits[doc] = bits.get(doc, 0) | bit
+
+    terms = sorted(postings)
+    grams = {}
+    for term_id, term in enumerate(terms):
+        padded = f"${term}$"
+        for gram in sorted({padded[i:i + 3] for i in range(len(padded) - 2)}):
+            grams.setdefault(gram, []).append(term_id)
+
+    return {
+        "version": SEARCH_INDEX_VERSION,
+        "ids": [s["id"] for s in species],
+        "terms": terms,
+        "postings": [[doc * 8 + bits for doc, bits in sorted(postings[t].items())] for t in terms],
+        "grams": dict(sorted(grams.items())),
+        "facets": build_facet_index(species),
+    }
+
+
+def build_precache_plan(species):
+    """Precache manifest entries for the top PRECACHE_SPRITES sprites (species
+    are already in popularity order) plus runtime cache sizes for the rest."""
+    precache = []
+    seen = set()
+    for s in species:
+        if len(precache) >= PRECACHE_SPRITES:
+            break
+        path = PROJECT_DIR / "public" / s["image"]
+        if s["image"].endswith(".png") and s["image"] not in seen and path.exists():
+            seen.add(s["image"])
+            revision = hashlib.md5(path.read_bytes()).hexdigest()
+            precache.append({"url": s["image"], "revision": revision})
+    return {
+        "precache": precache,
+        "runtime": {"sprites": RUNTIME_SPRITES, "originals": RUNTIME_ORIGINALS,
+                    "photos": RUNTIME_PHOTOS},
+    }
+
+
+def genus(binomial):
+    """Genus of a binomial, or "" when it's missing or abbreviated ("P. concolor")."""
+    first = binomial.split(" ", 1)[0] if binomial else ""
+    return "" if first.endswith(".") or len(first) < 2 else first
+
+
+def similar_species(stats, types, genera, k=SIMILAR_COUNT):
+    """Positions of each species' k nearest neighbors, nearest first.
+
+    Distance is Euclidean between stats vectors, less SAME_GENUS_BONUS and
+    SAME_TYPE_BONUS. The N x N matrix is computed SIMILAR_BLOCK_CELLS at a
+    time, as |a|^2 + |b|^2 - 2ab, which is exact for integer stats.
+    """
+    x = np.asarray(stats, dtype=np.float64).reshape(len(stats), len(STAT_NAMES))
+    n = len(x)
+    k = min(k, n - 1)
+    if k <= 0:
+        return [[] for _ in range(n)]
+    _, type_codes = np.unique(np.asarray(types, dtype=str), return_inverse=True)
+    genus_names = np.asarray(genera, dtype=str)
+    _, genus_codes = np.unique(genus_names, return_inverse=True)
+    genus_codes[genus_names == ""] = -1
+    squares = (x * x).sum(axis=1)
+    # Equal distances go to the earlier (more popular) species; distinct
+    # distances between integer stats differ by far more than this
+    tiebreak = np.arange(n) * 1e-9
+    rows = max(1, SIMILAR_BLOCK_CELLS // n)
+    neighbors = []
+    for start in range(0, n, rows):
+        block = slice(start, min(n, start + rows))
+        dist = np.sqrt(np.maximum(squares[block, None] + squares[None, :] - 2 * x[block] @ x.T, 0))
+        genus_block = genus_codes[block, None]
+        dist -= SAME_GENUS_BONUS * ((genus_block == genus_codes[None, :]) & (genus_block >= 0))
+        dist -= SAME_TYPE_BONUS * (type_codes[block, None] == type_codes[None, :])
+        dist += tiebreak
+        own = np.arange(block.stop - start)
+        dist[own, own + start] = np.inf
+        nearest = np.argpartition(dist, k - 1, axis=1)[:, :k]
+        ranked = np.take_along_axis(dist, nearest, axis=1).argsort(axis=1)
+        neighbors.extend(np.take_along_axis(nearest, ranked, axis=1).tolist())
+    return neighbors
+
+
+def bitset_words(positions, size):
+    """Pack positions into 32-bit words, bit i of word i // 32 for position i."""
+    words = [0] * ((size + 31) // 32)
+    for i in positions:
+        words[i >> 5] |= 1 << (i & 31)
+    return words
+
+
+def build_facet_index(species):
+    """Bitsets per type, per IUCN code and per place over species.json
+    positions, so the app can filter with word-level ANDs (see
+    src/lib/bitset.js). Places are keyed in places.PLACES order."""
+    types = {}
+    statuses = {}
+    in_place = {}
+    for i, s in enumerate(species):
+        types.setdefault(s["type"], []).append(i)
+        code = STATUS_CODES.get(s.get("conservation_status"))
+        if code:
+            statuses.setdefault(code, []).append(i)
+        for place in places.unmask(s.get("places", "0")):
+            in_place.setdefault(place, []).append(i)
+    size = len(species)
+    return {
+        "types": {t: bitset_words(p, size) for t, p in sorted(types.items())},
+        "statuses": {c: bitset_words(p, size) for c, p in sorted(statuses.items())},
+        "places": {c: bitset_words(in_place[c], size) for c in places.PLACES if c in in_place},
+    }
+
+
+def assemble(entry, caches):
+    """The species.json fields for an Extracted record (plus private `_`
+    fields used while building), or None if LLM fields are missing."""
+    key = entry.wiki_path
+
+    # Use LLM name if available (for species where name == latin)
+    name = caches["names"].get(key, entry.name)
+
+    desc = caches["descriptions"].get(key)
+    st = caches["stats"].get(key)
+    region = caches["regions"].get(key)
+    habitat = caches["habitats"].get(key)
+
+    # Skip species missing critical LLM fields
+    if not desc or not st or not region or not habitat:
+        return None
+
+    # Validate stats are proper integers 0-100
+    try:
+        st = {k: max(0, min(100, int(v))) for k, v in st.items()
+              if k in ("size", "speed", "rarity", "danger")}
+        if len(st) != 4:
+            return None
+    except (ValueError, TypeError):
+        return None
+
+    return {
+        "name": name,
+        "species": entry.species,
+        "type": entry.type.value,
+        "region": region,
+        "habitat": habitat,
+        "stats": st,
+        "description": desc,
+        "_conservation_status": entry.conservation_status and entry.conservation_status.value,
+        "_wiki_slug": key.split("/wiki/")[-1],
+        "_wiki_path": key,
+    }
+
+
+def copy_once(source, dest, copied):
+    """Copy source to dest unless an earlier entry sharing it already did;
+    returns whether it copied."""
+    if dest in copied:
+        return False
+    with span("image copy"):
+        shutil.copy2(source, dest)
+    copied.add(dest)
+    return True
+
+
+def load_assets():
+    """The image lookups finish_entry() needs, empty where a file is missing."""
+    assets = {}
+    for name, path, default, missing in [
+        ("filenames", FILENAMES_PATH, {}, "original_image will be omitted"),
+        ("placeholders", PLACEHOLDERS_PATH, {}, "placeholder will be omitted"),
+        ("photo_widths", PHOTO_WIDTHS_PATH, {}, "photo will be omitted"),
+        ("dupes", DUPES_PATH, {"sprites": {}, "originals": {}},
+         "duplicate images will be copied per species"),
+    ]:
+        if path.exists():
+            assets[name] = json.loads(path.read_text())
+        else:
+            assets[name] = default
+            print(f"WARNING: {path.name} not found, {missing}")
+    return assets
+
+
+def finish_entry(s, assets, counts, copied):
+    """Copy the species' sprite, original and photos into public/ (once per
+    distinct image; `copied` holds what's already there) and return its
+    species.json entry with fields in display order."""
+    slug = s["_wiki_slug"]
+    dupes = assets["dupes"]
+    sprite_slug = dupes["sprites"].get(slug, slug)
+    sprite = SPRITE_DIR / f"{sprite_slug}.png"
+    placeholder = None
+    if sprite.exists():
+        counts["images_copied"] += copy_once(sprite, PUBLIC_IMG_DIR / f"{sprite_slug}.png", copied)
+        counts["images_shared"] += sprite_slug != slug
+        image = f"images/animals/{sprite_slug}.png"
+        placeholder = assets["placeholders"].get(sprite_slug)
     else:
-        print("WARNING: image_filenames.json not found, original_image will be omitted")
+        image = "images/animals/placeholder.svg"
+
+    original_slug = dupes["originals"].get(slug, slug)
+    original = ORIGINALS_DIR / f"{original_slug}.webp"
+    fallback_image = None
+    if original.exists():
+        counts["originals_copied"] += copy_once(
+            original, PUBLIC_ORIGINALS_DIR / f"{original_slug}.webp", copied)
+        counts["originals_shared"] += original_slug != slug
+        fallback_image = f"images/originals/{original_slug}.webp"
+
+    # The card builds one srcset per format from the path and widths
+    photo = None
+    widths = assets["photo_widths"].get(original_slug)
+    if widths and all((PHOTOS_DIR / f"{original_slug}-{w}.{fmt}").exists()
+                      for w in widths for fmt in PHOTO_FORMATS):
+        for w in widths:
+            for fmt in PHOTO_FORMATS:
+                counts["photos_copied"] += copy_once(
+                    PHOTOS_DIR / f"{original_slug}-{w}.{fmt}",
+                    PUBLIC_PHOTOS_DIR / f"{original_slug}-{w}.{fmt}", copied)
+        photo = {"path": f"images/photos/{original_slug}", "widths": widths}
+
+    wiki_filename = assets["filenames"].get(slug)
+    original_image = wikimedia_thumb_url(wiki_filename) if wiki_filename else None
+
+    entry = {
+        "id": slug,
+        "name": s["name"],
+        "species": s["species"],
+        "type": s["type"],
+        "region": s["region"],
+        "habitat": s["habitat"],
+        "stats": s["stats"],
+        "description": s["description"],
+        "image": image,
+        "wiki_url": f"https://en.wikipedia.org{s['_wiki_path']}",
+    }
+    if s["_conservation_status"]:
+        entry["conservation_status"] = s["_conservation_status"]
+    if original_image:
+        entry["original_image"] = original_image
+    if fallback_image:
+        entry["fallback_image"] = fallback_image
+    if photo:
+        entry["photo"] = photo
+    if placeholder:
+        entry["placeholder"] = placeholder
+    codes = places.places(s["region"])
+    if codes:
+        entry["places"] = places.mask(codes)
+    return entry
+
+
+def prune_duplicates(dupes):
+    """Remove public/ copies of duplicate images left by earlier builds;
+    returns how many."""
+    stale = [PUBLIC_IMG_DIR / f"{slug}.png" for slug in dupes["sprites"]]
+    for slug in dupes["originals"]:
+        stale.append(PUBLIC_ORIGINALS_DIR / f"{slug}.webp")
+        stale.extend(PUBLIC_PHOTOS_DIR.glob(f"{glob.escape(slug)}-*"))
+    removed = 0
+    for path in stale:
+        if path.exists():
+            path.unlink()
+            removed += 1
+    return removed
+
+
+def write_json_array(f, entry, first):
+    """Append one entry to a JSON array being streamed to f, formatted exactly
+    like json.dump(entries, f, indent=2)."""
+    f.write("[\n" if first else ",\n")
+    f.write("  " + json.dumps(entry, indent=2).replace("\n", "\n  "))
+
+
+def main():
+    instrument.start("build")
+    caches = {name: load_cache(name)
+              for name in ("descriptions", "stats", "regions", "habitats", "names")}
+
+    assets = load_assets()
+
+    # The release installed clients have, to diff the new one against
+    previous = OUTPUT_PATH.read_bytes() if OUTPUT_PATH.exists() else None
 
     popularity = {}
     if POPULARITY_PATH.exists():
@@ -71,128 +442,105 @@ def main():
     else:
         print("WARNING: popularity_scores.json not found, falling back to alpha sort")
 
-    species_list = []
+    # Pass 1: assemble each record and spill it to a temp file, keeping only
+    # its sort key, offset and what similar_species() needs in memory
     skipped = 0
+    order = []
+    with tempfile.TemporaryFile("w+") as spill:
+        for entry in read_records(EXTRACTED_PATH, Extracted):
+            s = assemble(entry, caches)
+            if s is None:
+                skipped += 1
+                continue
+            # Sort by popularity (highest first), then alphabetically as tiebreaker
+            if popularity:
+                sort_key = (-popularity.get(s["_wiki_path"], 0), s["name"].lower())
+            else:
+                sort_key = (
+                    TYPE_ORDER.index(s["type"]) if s["type"] in TYPE_ORDER else 99,
+                    s["name"].lower(),
+                )
+            features = (s["_wiki_slug"], [s["stats"][k] for k in STAT_NAMES],
+                        s["type"], genus(s["species"]))
+            order.append((sort_key, spill.tell(), features))
+            spill.write(json.dumps(s) + "\n")
+        # Stable, like sorting the records themselves
+        order.sort(key=lambda item: item[0])
 
-    for entry in extracted:
-        key = entry["wiki_path"]
+        with span("similar"):
+            ids, stats, types, genera = zip(*(item[2] for item in order)) if order else ([],) * 4
+            similar = similar_species(stats, types, genera)
 
-        # Use LLM name if available (for species where name == latin)
-        name = names.get(key, entry["name"])
+        # Pass 2: stream entries out in display order, copying images and
+        # keeping just the fields the search index and precache plan need
+        PUBLIC_IMG_DIR.mkdir(parents=True, exist_ok=True)
+        PUBLIC_ORIGINALS_DIR.mkdir(parents=True, exist_ok=True)
+        PUBLIC_PHOTOS_DIR.mkdir(parents=True, exist_ok=True)
+        counts = Counter()
+        copied = set()
+        slim = []
+        with span("write"), open(OUTPUT_PATH, "w") as f:
+            for n, (_, offset, _) in enumerate(order):
+                spill.seek(offset)
+                entry = finish_entry(json.loads(spill.readline()), assets, counts, copied)
+                if similar[n]:
+                    entry["similar"] = [ids[i] for i in similar[n]]
+                write_json_array(f, entry, n == 0)
+                slim.append({k: entry[k] for k in SLIM_FIELDS if k in entry})
+                counts[entry["type"]] += 1
+                counts["original_image"] += "original_image" in entry
+                counts["fallback_image"] += "fallback_image" in entry
+                counts["photo"] += "photo" in entry
+                counts["placeholder"] += "placeholder" in entry
+                counts["places"] += "places" in entry
+                instrument.items()
+            f.write("\n]" if order else "[]")
+        with span("image copy"):
+            pruned = prune_duplicates(assets["dupes"])
 
-        desc = descriptions.get(key)
-        st = stats.get(key)
-        region = regions.get(key)
-        habitat = habitats.get(key)
+    with span("search index"):
+        search_index = build_search_index(slim)
+    with span("write"), open(SEARCH_INDEX_PATH, "w") as f:
+        json.dump(search_index, f, separators=(",", ":"))
 
-        # Skip species missing critical LLM fields
-        if not desc or not st or not region or not habitat:
-            skipped += 1
-            continue
+    with span("dataset diff"):
+        manifest, released, diff_bytes = dataset_versions.publish(
+            previous, OUTPUT_PATH.read_bytes(), PUBLIC_DATA_DIR)
 
-        # Validate stats are proper integers 0-100
-        try:
-            st = {k: max(0, min(100, int(v))) for k, v in st.items()
-                  if k in ("size", "speed", "rarity", "danger")}
-            if len(st) != 4:
-                skipped += 1
-                continue
-        except (ValueError, TypeError):
-            skipped += 1
-            continue
-
-        species_list.append({
-            "name": name,
-            "species": entry["species"],
-            "type": entry["type"],
-            "region": region,
-            "habitat": habitat,
-            "stats": st,
-            "description": desc,
-            "_conservation_status": entry.get("conservation_status"),
-            "_wiki_slug": key.split("/wiki/")[-1],
-            "_wiki_path": key,
-        })
-
-    # Sort by popularity (highest first), then alphabetically as tiebreaker
-    if popularity:
-        species_list.sort(key=lambda s: (-popularity.get(s["_wiki_path"], 0), s["name"].lower()))
-    else:
-        species_list.sort(key=lambda s: (
-            TYPE_ORDER.index(s["type"]) if s["type"] in TYPE_ORDER else 99,
-            s["name"].lower(),
-        ))
-
-    # Copy sprites and originals, assign slug IDs
-    PUBLIC_IMG_DIR.mkdir(parents=True, exist_ok=True)
-    PUBLIC_ORIGINALS_DIR.mkdir(parents=True, exist_ok=True)
-    images_copied = 0
-    originals_copied = 0
-    for i, s in enumerate(species_list, 1):
-        s["id"] = s["_wiki_slug"]
-        slug = s["_wiki_slug"]
-        sprite = SPRITE_DIR / f"{slug}.png"
-        if sprite.exists():
-            shutil.copy2(sprite, PUBLIC_IMG_DIR / f"{slug}.png")
-            s["image"] = f"images/animals/{slug}.png"
-            images_copied += 1
-        else:
-            s["image"] = "images/animals/placeholder.svg"
+    with span("precache plan"):
+        precache_plan = build_precache_plan(slim)
+    with span("write"), open(PRECACHE_PLAN_PATH, "w") as f:
+        json.dump(precache_plan, f, indent=2)
+    instrument.count("skipped", skipped)
 
-        original = ORIGINALS_DIR / f"{slug}.webp"
-        if original.exists():
-            shutil.copy2(original, PUBLIC_ORIGINALS_DIR / f"{slug}.webp")
-            s["_fallback_image"] = f"images/originals/{slug}.webp"
-            originals_copied += 1
-        else:
-            s["_fallback_image"] = None
-
-        wiki_filename = image_filenames.get(s["_wiki_slug"])
-        s["_original_image"] = wikimedia_thumb_url(wiki_filename) if wiki_filename else None
-        del s["_wiki_slug"]
-
-    # Reorder fields for readability
-    output = []
-    for s in species_list:
-        entry = {
-            "id": s["id"],
-            "name": s["name"],
-            "species": s["species"],
-            "type": s["type"],
-            "region": s["region"],
-            "habitat": s["habitat"],
-            "stats": s["stats"],
-            "description": s["description"],
-            "image": s["image"],
-            "wiki_url": f"https://en.wikipedia.org{s['_wiki_path']}",
-        }
-        if s["_conservation_status"]:
-            entry["conservation_status"] = s["_conservation_status"]
-        if s["_original_image"]:
-            entry["original_image"] = s["_original_image"]
-        if s["_fallback_image"]:
-            entry["fallback_image"] = s["_fallback_image"]
-        output.append(entry)
-        del s["_wiki_path"]
-
-    with open(OUTPUT_PATH, "w") as f:
-        json.dump(output, f, indent=2)
-
-    originals = sum(1 for s in output if "original_image" in s)
-    fallbacks = sum(1 for s in output if "fallback_image" in s)
-    print(f"Wrote {len(output)} species to {OUTPUT_PATH}")
+    total = len(slim)
+    print(f"Wrote {total} species to {OUTPUT_PATH}")
     print(f"Skipped {skipped} incomplete entries")
-    print(f"Images copied: {images_copied}/{len(output)}")
-    print(f"Original image URLs: {originals}/{len(output)}")
-    print(f"Fallback originals: {fallbacks}/{len(output)} (copied: {originals_copied})")
-
-    # Type breakdown
-    type_counts = {}
-    for s in output:
-        type_counts[s["type"]] = type_counts.get(s["type"], 0) + 1
+    print(f"Images copied: {counts['images_copied']}/{total} "
+          f"({counts['images_shared']} species share another's)")
+    print(f"Placeholders: {counts['placeholder']}/{total}")
+    print(f"Original image URLs: {counts['original_image']}/{total}")
+    print(f"Fallback originals: {counts['fallback_image']}/{total} "
+          f"(copied: {counts['originals_copied']}, {counts['originals_shared']} shared)")
+    if pruned:
+        print(f"Removed {pruned} stale duplicate images from public/")
+    print(f"Responsive photos: {counts['photo']}/{total} (files copied: {counts['photos_copied']})")
+    print(f"Places: {counts['places']}/{total} species, "
+          f"{len(search_index['facets']['places'])}/{len(places.PLACES)} states and provinces")
+    print(f"Search index: {len(search_index['terms'])} terms, {len(search_index['grams'])} trigrams")
+    if not released:
+        print(f"Dataset version {manifest['version']} (unchanged)")
+    elif diff_bytes is not None:
+        print(f"Dataset version {manifest['version']}: {diff_bytes / 1024:.1f} KB diff, "
+              f"clients on the last {len(manifest['diffs'])} versions update by diff")
+    else:
+        print(f"Dataset version {manifest['version']} (no diff, clients download it whole)")
+    print(f"Precache plan: {len(precache_plan['precache'])} sprites precached, "
+          f"runtime LRU {RUNTIME_SPRITES} sprites / {RUNTIME_ORIGINALS} originals / {RUNTIME_PHOTOS} photos")
+
     print("Type breakdown:")
     for t in TYPE_ORDER:
-        print(f"  {t}: {type_counts.get(t, 0)}")
+        print(f"  {t}: {counts[t]}")
 
 
 if __name__ == "__main__":
@@ -8,65 +8,100 @@ Reads Wikipedia list pages from the ZIM archive:
   - Reptiles:   List_of_North_American_reptiles
   - Fish:       12 state-level lists + global list filtered by NA distribution
 
-Output: scrape/species_index.json
+Output: scrape/species_index.jsonl (one species per line)
+
+Parse results per list page and per-article fish verdicts are cached in
+scrape/index_cache.json (keyed by content hash), so re-runs only re-parse
+changed list pages and only read articles that haven't been checked before.
+Pass --rebuild to ignore the cache.
+
+Fish articles that aren't cached are read and checked on a process pool
+(--workers, default: CPU count); results are merged in input order so the
+output is identical to a serial run.
+
+--discover also asks the archive's full-text index for fish articles that
+no list page links to (DISCOVERY_QUERIES, e.g. "native to North America"
+fish) and puts the hits through the same verdict and validation as the
+global list.
 """
 
+import argparse
+import hashlib
 import json
+import os
 import re
-from html import unescape
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
 from pathlib import Path
 from urllib.parse import unquote
 
-from zim_utils import read_article
+import instrument
+from instrument import span
+from list_parser import iter_items
+from records import IndexEntry, SpeciesType, write_records
+from zim_utils import archive_id, has_fulltext_index, read_article, reopen_archive, resolve, search
 
-OUT = Path(__file__).parent / "species_index.json"
+OUT = Path(__file__).parent / "species_index.jsonl"
+CACHE_PATH = Path(__file__).parent / "index_cache.json"
+
+# Bump when a parser, NA_KEYWORDS or article_verdict() changes
+CACHE_VERSION = 3
 
 SKIP_HREF = ["File:", "Help:", "Wikipedia:", "Template:", "Category:", "Special:", "#",
              "List_of", "Mammal", "Fauna_of", "ISBN", "ISSN", "OCLC", "doi:",
              "IUCN", "Binomial", "Family_(biology)", "Order_(biology)",
              "http:", "https:"]
 
-LATIN_RE = re.compile(r'^[A-Z][a-z]+ [a-z]+(?:-[a-z]+)*(?:\s[a-z]+)?$')
+# ---------------------------------------------------------------------------
+# Patterns — compiled once here rather than looked up per item in the loops.
+# Substring lists are matched with one alternation instead of any(... in ...).
+# ---------------------------------------------------------------------------
+SKIP_RE = re.compile("|".join(map(re.escape, SKIP_HREF)))
 
+LATIN_RE = re.compile(r'^[A-Z][a-z]+ [a-z]+(?:-[a-z]+)*(?:\s[a-z]+)?$')
+TAG_RE = re.compile(r"<[^>]+>")
+MAMMAL_TEXT_RE = re.compile(r"^\s*,\s*")
+BIRD_TEXT_RE = re.compile(r"^(.+?)\s*,\s*([A-Z][a-z]+ [a-z]+(?:\s+[a-z]+)?)")
+REPTILE_TEXT_RE = re.compile(r"^(.+?)\s*\(\s*([A-Z][a-z]+ [a-z]+(?:\s+[a-z]+)?)\s*\)")
+BINOMIAL_RE = re.compile(r'<i[^>]*>(?:<b>)?([A-Z][a-z]+ [a-z]+(?:-[a-z]+)*(?:\s[a-z]+)?)')
+TITLE_RE = re.compile(r'<title>([^<]+)</title>')
+PAREN_SUFFIX_RE = re.compile(r"\s*\([^)]+\)$")
+PAREN_TRAILER_RE = re.compile(r"\s*\([^)]+\)\s*$")
+FISH_LABEL_RE = re.compile(r"List_of_fish(es)?_of_")
 
-def clean(text):
-    text = re.sub(r"<[^>]+>", "", text)
-    text = unescape(text).strip()
-    return re.sub(r"\s+", " ", text)
 
+def skip_href(path):
+    return SKIP_RE.search(path) is not None
 
-def extract_link(html_fragment):
-    m = re.search(r'href="([^"#]+)"', html_fragment)
-    if not m:
-        return None
-    path = m.group(1)
-    if any(x in path for x in SKIP_HREF):
-        return None
-    return "/wiki/" + path
 
+# The parsers below read list items and table rows from list_parser, which
+# streams each page once and keeps nested lists and citation markers out of
+# an item's text.
 
 # ---------------------------------------------------------------------------
 # Mammals: <a href="...">Common name</a>, <i>Abbreviated latin</i>
 # Source: A/List_of_mammals_of_the_United_States
 # ---------------------------------------------------------------------------
 def parse_mammals(html):
-    pattern = (
-        r'<a[^>]*href="([^"#]+)"[^>]*title="([^"]+)"[^>]*>([^<]+)</a>'
-        r'\s*,\s*<i[^>]*>([^<]+)</i>'
-    )
-    matches = re.findall(pattern, html)
     species = []
-    for href, title, name, latin in matches:
-        if any(x in href for x in SKIP_HREF):
+    for item in iter_items(html, ("li",)):
+        link = item.link(named=True)
+        if not link or not link.title or not item.italics or skip_href(link.href):
+            continue
+        # The link text, a comma, then the italic latin name
+        latin = item.italics[0]
+        text = item.text
+        rest = text[len(link.text):] if text.startswith(link.text) else ""
+        m = MAMMAL_TEXT_RE.match(rest)
+        if not m or not rest[m.end():].startswith(latin):
             continue
-        species.append({
-            "name": name.strip(),
-            "latin": latin.strip(),
-            "family": "",
-            "type": "Mammal",
-            "distribution": "",
-            "wiki_path": "/wiki/" + href,
-        })
+        species.append(IndexEntry(
+            name=link.text,
+            latin=latin,
+            type=SpeciesType.MAMMAL,
+            wiki_path="/wiki/" + link.href,
+        ))
     return species
 
 
@@ -79,28 +114,24 @@ def parse_birds(html):
     if content_start > 0:
         html = html[content_start:]
 
-    items = re.findall(r"<li[^>]*>(.*?)</li>", html, re.DOTALL)
     species = []
-    for item in items:
-        if "<i" not in item:
+    for item in iter_items(html, ("li",)):
+        if not item.italics or item.is_heading():
             continue
-        link = extract_link(item)
-        if not link:
+        link = item.link()
+        if not link or skip_href(link.href):
             continue
 
-        text = clean(item)
-        m = re.match(r"^(.+?)\s*,\s*([A-Z][a-z]+ [a-z]+(?:\s+[a-z]+)?)", text)
+        m = BIRD_TEXT_RE.match(item.text)
         if not m:
             continue
 
-        species.append({
-            "name": m.group(1).strip(),
-            "latin": m.group(2).strip(),
-            "family": "",
-            "type": "Bird",
-            "distribution": "",
-            "wiki_path": link,
-        })
+        species.append(IndexEntry(
+            name=m.group(1).strip(),
+            latin=m.group(2).strip(),
+            type=SpeciesType.BIRD,
+            wiki_path="/wiki/" + link.href,
+        ))
     return species
 
 
@@ -109,25 +140,21 @@ def parse_birds(html):
 # Source: A/List_of_amphibians_of_the_United_States
 # ---------------------------------------------------------------------------
 def parse_amphibians(html):
-    pattern = (
-        r'<li[^>]*>\s*<i[^>]*>\s*'
-        r'<a[^>]*href="([^"#]+)"[^>]*title="([^"]+)"[^>]*>([^<]+)</a>'
-        r'\s*</i>'
-    )
-    matches = re.findall(pattern, html)
     species = []
-    for href, title, latin in matches:
-        if any(x in href for x in SKIP_HREF):
+    for item in iter_items(html, ("li",)):
+        # The item has to open with the italic link
+        link = item.links[0] if item.links else None
+        if (not link or not (link.italic and link.lead and link.title and link.text)
+                or "#" in link.href or skip_href(link.href)):
             continue
-        name = title if title != latin else latin
-        species.append({
-            "name": name,
-            "latin": latin,
-            "family": "",
-            "type": "Amphibian",
-            "distribution": "",
-            "wiki_path": "/wiki/" + href,
-        })
+        latin = link.text
+        name = link.title if link.title != latin else latin
+        species.append(IndexEntry(
+            name=name,
+            latin=latin,
+            type=SpeciesType.AMPHIBIAN,
+            wiki_path="/wiki/" + link.href,
+        ))
     return species
 
 
@@ -143,34 +170,26 @@ def parse_reptiles(html):
     if refs_start > 0:
         html = html[:refs_start]
 
-    items = re.findall(r"<li[^>]*>(.*?)</li>", html, re.DOTALL)
     species = []
-    for item in items:
-        if "<i" not in item:
+    for item in iter_items(html, ("li",)):
+        if not item.italics or item.is_heading():
             continue
-        link = extract_link(item)
-        if not link:
+        link = item.link()
+        if not link or skip_href(link.href):
             continue
 
-        text = clean(item)
-        m = re.match(r"^(.+?)\s*\(\s*([A-Z][a-z]+ [a-z]+(?:\s+[a-z]+)?)\s*\)", text)
+        m = REPTILE_TEXT_RE.match(item.text)
         if m:
             name, latin = m.group(1).strip(), m.group(2).strip()
         else:
-            link_match = re.search(r'<a[^>]*>([^<]*)</a>', item)
-            if not link_match:
-                continue
-            name = unescape(link_match.group(1)).strip()
-            latin = name
-
-        species.append({
-            "name": name,
-            "latin": latin,
-            "family": "",
-            "type": "Reptile",
-            "distribution": "",
-            "wiki_path": link,
-        })
+            name = latin = item.links[0].text
+
+        species.append(IndexEntry(
+            name=name,
+            latin=latin,
+            type=SpeciesType.REPTILE,
+            wiki_path="/wiki/" + link.href,
+        ))
     return species
 
 
@@ -204,6 +223,40 @@ NA_KEYWORDS = [
     "rio grande", "columbia river", "yukon", "hudson bay",
     "western atlantic", "eastern pacific",
 ]
+NA_RE = re.compile("|".join(map(re.escape, NA_KEYWORDS)))
+
+# Article sections whose text counts as the species' range, in output order
+RANGE_IDS = ["Distribution", "Range", "Habitat", "Distribution_and_habitat",
+             "Habitat_and_range", "Geographic_range"]
+_RANGE_ID_KEYS = {hid.lower(): hid for hid in RANGE_IDS}
+# One scan finds every range heading id plus the h2/h3 boundaries around them
+SECTION_TOKEN_RE = re.compile(
+    r'(</h[23]>)|(<h[23])|id="(' + "|".join(RANGE_IDS) + r')"', re.IGNORECASE)
+RANGE_PHRASES = ["native to", "found in", "ranges from", "endemic to",
+                 "distributed", "occurs in", "inhabit"]
+RANGE_PHRASE_RE = re.compile("|".join(map(re.escape, RANGE_PHRASES)))
+SENTENCE_SPLIT_RE = re.compile(r"[.!]")
+
+# Infobox classes that make an article a fish (checked above "Binomial name")
+FISH_CLASSES = ["Actinopterygii", "Chondrichthyes", "Sarcopterygii", "Petromyzontida",
+                "Hyperoartia", "Myxini", "Elasmobranchii", "Holocephali"]
+FISH_CLASS_RE = re.compile("|".join(FISH_CLASSES))
+
+# --discover: full-text queries for NA fish articles, and hits kept per query
+DISCOVERY_QUERIES = [
+    '"native to North America" fish',
+    '"native to the United States" fish',
+    '"endemic to the United States" fish',
+    '"found in the United States" fish',
+    '"native to Canada" fish',
+    '"native to Mexico" fish',
+    '"Gulf of Mexico" fish',
+    '"Great Lakes" fish',
+    '"Mississippi River" fish',
+    '"western Atlantic" fish',
+    '"eastern Pacific" fish',
+]
+DISCOVERY_LIMIT = 5000
 
 
 def trim_content(html):
@@ -220,40 +273,38 @@ def trim_content(html):
 
 def parse_fish_table(html):
     html = trim_content(html)
-    rows = re.findall(r"<tr[^>]*>(.*?)</tr>", html, re.DOTALL)
     species = []
-    for row in rows:
-        cells = re.findall(r"<td[^>]*>(.*?)</td>", row, re.DOTALL)
-        if len(cells) < 2:
+    for row in iter_items(html, ("tr",)):
+        if len(row.cells) < 2:
             continue
-        link = re.search(r'<a[^>]*href="([^"#]+)"[^>]*>([^<]+)</a>', cells[0])
-        if not link or any(x in link.group(1) for x in SKIP_HREF):
+        link = row.link(0, named=True)
+        if not link or skip_href(link.href):
             continue
-        latin_m = re.search(r"<i[^>]*>([^<]+)</i>", cells[1])
-        species.append({
-            "name": unescape(link.group(2)).strip(),
-            "latin": latin_m.group(1).strip() if latin_m else "",
-            "family": "", "type": "Fish", "distribution": "",
-            "wiki_path": "/wiki/" + link.group(1),
-        })
+        italics = row.cells[1].italics
+        species.append(IndexEntry(
+            name=link.text,
+            latin=italics[0] if italics else "",
+            type=SpeciesType.FISH,
+            wiki_path="/wiki/" + link.href,
+        ))
     return species
 
 
 def parse_fish_list(html):
     html = trim_content(html)
-    items = re.findall(r"<li[^>]*>(.*?)</li>", html, re.DOTALL)
     species = []
-    for item in items:
-        link = re.search(r'<a[^>]*href="([^"#]+)"[^>]*>([^<]+)</a>', item)
-        if not link or any(x in link.group(1) for x in SKIP_HREF):
+    for item in iter_items(html, ("li",)):
+        if item.is_heading():
+            continue
+        link = item.link(named=True)
+        if not link or skip_href(link.href):
             continue
-        latin_m = re.search(r"<i[^>]*>([^<]+)</i>", item)
-        species.append({
-            "name": unescape(link.group(2)).strip(),
-            "latin": latin_m.group(1).strip() if latin_m else "",
-            "family": "", "type": "Fish", "distribution": "",
-            "wiki_path": "/wiki/" + link.group(1),
-        })
+        species.append(IndexEntry(
+            name=link.text,
+            latin=item.italics[0] if item.italics else "",
+            type=SpeciesType.FISH,
+            wiki_path="/wiki/" + link.href,
+        ))
     return species
 
 
@@ -263,86 +314,144 @@ def parse_fish_page(html):
     return parse_fish_list(html)
 
 
+def range_sections(html):
+    """{heading id: section html} for the first occurrence of each RANGE_IDS
+    id: from the first </h2> or </h3> after the id up to the next <h2/<h3.
+    One pass over the article instead of one regex search per id."""
+    waiting = []  # ids seen, heading not closed yet
+    open_ = {}    # id -> start of its section body
+    sections = {}
+    for m in SECTION_TOKEN_RE.finditer(html):
+        close, heading, hid = m.groups()
+        if hid:
+            hid = _RANGE_ID_KEYS[hid.lower()]
+            if hid not in sections and hid not in open_ and hid not in waiting:
+                waiting.append(hid)
+        elif close:
+            for hid in waiting:
+                open_[hid] = m.end()
+            waiting.clear()
+        elif open_:
+            for hid, start in open_.items():
+                sections[hid] = html[start:m.start()]
+            open_.clear()
+    # Unterminated sections run to the end (before a final newline, like `$`)
+    end = len(html) - 1 if html.endswith("\n") else len(html)
+    for hid, start in open_.items():
+        sections[hid] = html[start:max(start, end)]
+    return sections
+
+
 def get_range_text(html):
-    parts = []
-    for hid in ["Distribution", "Range", "Habitat", "Distribution_and_habitat",
-                 "Habitat_and_range", "Geographic_range"]:
-        m = re.search(rf'id="{hid}".*?</h[23]>(.*?)(?:<h[23]|$)', html,
-                       re.DOTALL | re.IGNORECASE)
-        if m:
-            parts.append(re.sub(r"<[^>]+>", " ", m.group(1))[:1000])
+    sections = range_sections(html)
+    parts = [TAG_RE.sub(" ", sections[hid])[:1000] for hid in RANGE_IDS if hid in sections]
     intro = html[:html.find("<h2") if "<h2" in html else 5000]
-    for sentence in re.split(r"[.!]", re.sub(r"<[^>]+>", " ", intro)):
-        if any(w in sentence.lower() for w in
-               ["native to", "found in", "ranges from", "endemic to",
-                "distributed", "occurs in", "inhabit"]):
+    for sentence in SENTENCE_SPLIT_RE.split(TAG_RE.sub(" ", intro)):
+        if RANGE_PHRASE_RE.search(sentence.lower()):
             parts.append(sentence)
     return " ".join(parts).lower()
 
 
 
-def validate_and_enrich(fish_list):
+def article_verdict(html):
+    """Everything collect_fish() needs from a fish article, from one read:
+    whether its range text mentions North America, whether its infobox
+    classifies it as a fish (for --discover hits), and the binomial and title
+    that validate_and_enrich() uses (latin is None if it isn't a real species)."""
+    verdict = {"na": False, "fish": False, "latin": None, "title": ""}
+    binom_pos = html.find("Binomial name")
+    if binom_pos < 0:
+        return verdict
+    text = get_range_text(html)
+    verdict["na"] = NA_RE.search(text) is not None
+    verdict["fish"] = FISH_CLASS_RE.search(html, 0, binom_pos) is not None
+
+    latin_m = BINOMIAL_RE.search(html, binom_pos, binom_pos + 500)
+    if latin_m:
+        epithet = latin_m.group(1).split()[1] if " " in latin_m.group(1) else ""
+        if epithet not in ("sp", "spp", "sp.", "spp."):
+            verdict["latin"] = latin_m.group(1)
+
+    title_m = TITLE_RE.search(html)
+    verdict["title"] = title_m.group(1).split(" - ")[0].strip() if title_m else ""
+    return verdict
+
+
+def article_path(s):
+    return "A/" + s.wiki_path.split("/wiki/")[-1]
+
+
+def validate_and_enrich(fish_list, cache):
     """Verify each entry is a real species and fix name/latin from the article."""
     result = []
     for i, s in enumerate(fish_list):
         if (i + 1) % 200 == 0:
             print(f"    {i + 1}/{len(fish_list)}...", flush=True)
-        html = read_article("A/" + s["wiki_path"].split("/wiki/")[-1])
-        if not html:
-            continue
-        binom_pos = html.find("Binomial name")
-        if binom_pos < 0:
+        verdict = cached_verdict(cache, article_path(s))
+        if not verdict or not verdict["latin"]:
             continue
-        latin_m = re.search(
-            r'<i[^>]*>(?:<b>)?([A-Z][a-z]+ [a-z]+(?:-[a-z]+)*(?:\s[a-z]+)?)',
-            html[binom_pos:binom_pos + 500],
-        )
-        if not latin_m:
-            continue
-        epithet = latin_m.group(1).split()[1] if " " in latin_m.group(1) else ""
-        if epithet in ("sp", "spp", "sp.", "spp."):
-            continue
-        s["latin"] = latin_m.group(1)
+        s.latin = verdict["latin"]
 
-        genus = s["latin"].split()[0]
-        title_m = re.search(r'<title>([^<]+)</title>', html)
-        title = title_m.group(1).split(" - ")[0].strip() if title_m else ""
+        genus = s.latin.split()[0]
+        title = verdict["title"]
 
-        if s["name"] == s["latin"] or s["name"] == genus:
-            if title and title != s["latin"] and title != genus:
-                s["name"] = title
+        if s.name == s.latin or s.name == genus:
+            if title and title != s.latin and title != genus:
+                s.name = title
             else:
-                slug = unquote(s["wiki_path"].split("/wiki/")[-1]).replace("_", " ")
-                slug = re.sub(r"\s*\([^)]+\)$", "", slug)
+                slug = unquote(s.wiki_path.split("/wiki/")[-1]).replace("_", " ")
+                slug = PAREN_SUFFIX_RE.sub("", slug)
                 if not LATIN_RE.match(slug) and slug != genus:
-                    s["name"] = slug
-        elif title and title != s["latin"] and title != genus and title != s["name"]:
-            s["name"] = title
+                    s.name = slug
+        elif title and title != s.latin and title != genus and title != s.name:
+            s.name = title
 
-        s["name"] = re.sub(r"\s*\([^)]+\)\s*$", "", s["name"]).strip()
+        s.name = PAREN_TRAILER_RE.sub("", s.name).strip()
         result.append(s)
     return result
 
 
-def collect_fish():
+def discover_fish(known):
+    """Fish candidates from the full-text index that aren't among the `known`
+    entries yet. Hits are canonical paths, so they're compared with the
+    resolved paths of the known entries (list pages often link redirects)."""
+    if not has_fulltext_index():
+        print("  Discovery: archive has no full-text index, skipped")
+        return []
+    seen = {resolve(s.wiki_path) for s in known} | {s.wiki_path.lower() for s in known}
+    candidates = {}
+    for query in DISCOVERY_QUERIES:
+        hits = search(query, DISCOVERY_LIMIT)
+        instrument.count("search hits", len(hits))
+        for path in hits:
+            wiki_path = "/wiki/" + path.removeprefix("A/")
+            if path not in seen and wiki_path.lower() not in seen and wiki_path not in candidates:
+                slug = unquote(path.removeprefix("A/")).replace("_", " ")
+                candidates[wiki_path] = IndexEntry(name=slug, latin="", type=SpeciesType.FISH,
+                                                   wiki_path=wiki_path)
+    print(f"  Discovery: {len(DISCOVERY_QUERIES)} queries, {len(candidates)} new candidates")
+    return list(candidates.values())
+
+
+def collect_fish(cache, workers=1, discover=False):
     all_fish = []
     seen = set()
 
     def add(species_list):
         for s in species_list:
-            key = s["wiki_path"].lower()
+            key = s.wiki_path.lower()
             if key not in seen:
                 seen.add(key)
                 all_fish.append(s)
 
     for path in FISH_PAGES:
-        label = re.sub(r"List_of_fish(es)?_of_", "", path.split("/")[-1]).replace("_", " ")
+        label = FISH_LABEL_RE.sub("", path.split("/")[-1]).replace("_", " ")
         print(f"  {label}... ", end="", flush=True)
         html = read_article(path)
         if not html:
             print("NOT FOUND")
             continue
-        add(parse_fish_page(html))
+        add(cached_parse(cache, path, html, parse_fish_page))
         print(f"{len(all_fish)} cumulative unique")
 
     state_count = len(all_fish)
@@ -353,47 +462,170 @@ def collect_fish():
     if not html:
         print("NOT FOUND")
         return all_fish
-    global_fish = parse_fish_list(html)
-    candidates = [s for s in global_fish if s["wiki_path"].lower() not in seen]
+    global_fish = cached_parse(cache, FISH_GLOBAL, html, parse_fish_list)
+    candidates = [s for s in global_fish if s.wiki_path.lower() not in seen]
     print(f"{len(global_fish)} total, {len(candidates)} new candidates")
 
+    # Every article the global filter and validation will need, read once up front
+    prefetch_verdicts(cache, [article_path(s) for s in all_fish + candidates], workers)
+
     added = 0
     for i, s in enumerate(candidates):
         if i % 100 == 0 and i > 0:
             print(f"    ...{i}/{len(candidates)} scanned, {added} NA", flush=True)
-        page_html = read_article("A/" + s["wiki_path"].split("/wiki/")[-1])
-        if not page_html:
-            continue
-        if "Binomial name" not in page_html:
-            continue
-        text = get_range_text(page_html)
-        if any(kw in text for kw in NA_KEYWORDS):
+        verdict = cached_verdict(cache, article_path(s))
+        if verdict and verdict["na"]:
             add([s])
             added += 1
     print(f"  Global filter: +{added} NA fish")
 
+    if discover:
+        found = discover_fish(all_fish)
+        prefetch_verdicts(cache, [article_path(s) for s in found], workers)
+        added = 0
+        for s in found:
+            verdict = cached_verdict(cache, article_path(s))
+            if verdict and verdict["na"] and verdict["fish"]:
+                add([s])
+                added += 1
+        print(f"  Discovery: +{added} NA fish")
+
     print(f"  Validating {len(all_fish)} entries...")
-    all_fish = validate_and_enrich(all_fish)
+    all_fish = validate_and_enrich(all_fish, cache)
     print(f"  Fish total: {len(all_fish)} verified species")
     return all_fish
 
 
+# ---------------------------------------------------------------------------
+# Cache — list-page parse results keyed by page content hash, and fish article
+# verdicts keyed by article content hash. `paths` maps article paths to their
+# content hash in the current archive so unchanged articles aren't even read.
+# ---------------------------------------------------------------------------
+def content_hash(html):
+    return hashlib.sha1(html.encode()).hexdigest()
+
+
+def load_cache(rebuild=False):
+    current = archive_id()
+    cache = None
+    if not rebuild and CACHE_PATH.exists():
+        cache = json.loads(CACHE_PATH.read_text())
+        if cache.get("version") != CACHE_VERSION:
+            cache = None
+    if cache is None:
+        cache = {"version": CACHE_VERSION, "archive": current,
+                 "pages": {}, "paths": {}, "verdicts": {}}
+    elif cache["archive"] != current:
+        # New dump: verdicts still apply to identical content, paths must be re-hashed
+        cache["archive"] = current
+        cache["paths"] = {}
+    cache["stats"] = Counter()
+    return cache
+
+
+def save_cache(cache):
+    stats = cache.pop("stats")
+    with span("cache write"):
+        CACHE_PATH.write_text(json.dumps(cache))
+    for name, value in stats.items():
+        instrument.count(f"cache {name}", value)
+    print(f"Cache: {stats['parsed']} list pages parsed, {stats['reused']} reused; "
+          f"{stats['read']} articles read for {stats['lookups']} lookups")
+
+
+def cached_parse(cache, path, html, parser):
+    """parser(html), reused from the cache when the page content is unchanged."""
+    stats = cache["stats"]
+    key = f"{path}|{parser.__name__}"
+    digest = content_hash(html)
+    hit = cache["pages"].get(key)
+    if hit and hit["hash"] == digest:
+        stats["reused"] += 1
+    else:
+        stats["parsed"] += 1
+        with span("parse"):
+            species = [s.to_dict() for s in parser(html)]
+        hit = cache["pages"][key] = {"hash": digest, "species": species}
+    # Fresh records each call, since callers mutate them (validate_and_enrich)
+    return [IndexEntry.from_dict(s) for s in hit["species"]]
+
+
+def read_verdict(path):
+    """(content hash, article_verdict) for a ZIM path, or (None, None) if missing.
+    Runs in pool workers."""
+    html = read_article(path)
+    if not html:
+        return None, None
+    with span("verdict"):
+        return content_hash(html), article_verdict(html)
+
+
+def store_verdict(cache, path, digest, verdict):
+    cache["paths"][path] = digest
+    if digest is not None and digest not in cache["verdicts"]:
+        cache["verdicts"][digest] = verdict
+
+
+def is_cached(cache, path):
+    digest = cache["paths"].get(path, "")
+    return digest is None or digest in cache["verdicts"]
+
+
+def cached_verdict(cache, path):
+    """article_verdict() for a ZIM path, or None if the article doesn't exist."""
+    cache["stats"]["lookups"] += 1
+    if not is_cached(cache, path):
+        cache["stats"]["read"] += 1
+        store_verdict(cache, path, *read_verdict(path))
+    digest = cache["paths"][path]
+    return None if digest is None else cache["verdicts"][digest]
+
+
+def prefetch_verdicts(cache, paths, workers):
+    """Read and check every uncached article in `paths` on a process pool."""
+    todo = [p for p in dict.fromkeys(paths) if not is_cached(cache, p)]
+    if workers <= 1 or len(todo) < 2:
+        return
+    print(f"  Reading {len(todo)} fish articles on {workers} workers...", flush=True)
+    # Spans inside workers aren't collected, so time the pool as a whole
+    with span("article pool"), ProcessPoolExecutor(max_workers=workers, initializer=reopen_archive) as pool:
+        results = pool.map(read_verdict, todo, chunksize=16)
+        for i, (path, (digest, verdict)) in enumerate(zip(todo, results), 1):
+            store_verdict(cache, path, digest, verdict)
+            if i % 200 == 0:
+                print(f"    {i}/{len(todo)}...", flush=True)
+    cache["stats"]["read"] += len(todo)
+
+
 # ---------------------------------------------------------------------------
 # Manual additions — species present in the ZIM but missing from list pages
 # (e.g. Elk is a separate species from Red deer since 2004 DNA evidence,
 #  but the mammals list page only links to Red_deer)
 # ---------------------------------------------------------------------------
 MANUAL_ADDITIONS = [
-    {
-        "name": "Elk",
-        "latin": "Cervus canadensis",
-        "family": "",
-        "type": "Mammal",
-        "distribution": "",
-        "wiki_path": "/wiki/Elk",
-    },
+    IndexEntry(
+        name="Elk",
+        latin="Cervus canadensis",
+        type=SpeciesType.MAMMAL,
+        wiki_path="/wiki/Elk",
+    ),
 ]
 
+
+def resolve_manual_additions():
+    """MANUAL_ADDITIONS whose articles exist, matching wiki_path against the
+    title index case- and accent-insensitively when it isn't an exact path."""
+    found = []
+    for s in MANUAL_ADDITIONS:
+        if resolve(s.wiki_path) is None:
+            target = resolve(s.wiki_path, fuzzy=True)
+            if target is None:
+                print(f"  {s.name}: {s.wiki_path} not in ZIM, skipped")
+                continue
+            s = replace(s, wiki_path="/wiki/" + target.removeprefix("A/"))
+        found.append(s)
+    return found
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
@@ -406,45 +638,57 @@ SOURCES = [
 
 
 def main():
-    all_species = list(MANUAL_ADDITIONS)
-    print(f"Manual additions: {len(MANUAL_ADDITIONS)}")
-    for label, path, parser in SOURCES:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rebuild", action="store_true",
+                        help="ignore index_cache.json and re-parse everything")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="processes for reading fish articles (1 = serial)")
+    parser.add_argument("--discover", action="store_true",
+                        help="also find fish via the archive's full-text index")
+    args = parser.parse_args()
+
+    instrument.start("build_index")
+    cache = load_cache(args.rebuild)
+    all_species = resolve_manual_additions()
+    print(f"Manual additions: {len(all_species)}")
+    for label, path, parse in SOURCES:
         print(f"Reading {label}... ", end="", flush=True)
         html = read_article(path)
         if html is None:
             print("NOT FOUND in ZIM")
             continue
-        species = parser(html)
+        species = cached_parse(cache, path, html, parse)
         print(f"{len(species)} species")
         all_species.extend(species)
 
     print("Reading Fish...")
-    all_species.extend(collect_fish())
+    all_species.extend(collect_fish(cache, args.workers, args.discover))
+    save_cache(cache)
 
     seen_paths = set()
     seen_latin = set()
     seen_names = set()
     unique = []
     for s in all_species:
-        path_key = s["wiki_path"].lower()
+        path_key = s.wiki_path.lower()
         if path_key in seen_paths:
             continue
         seen_paths.add(path_key)
-        if s["latin"]:
-            latin_key = s["latin"].lower()
+        if s.latin:
+            latin_key = s.latin.lower()
             if latin_key in seen_latin:
                 continue
             seen_latin.add(latin_key)
-        name_key = (s["type"], s["name"].lower())
+        name_key = (s.type, s.name.lower())
         if name_key in seen_names:
             continue
         seen_names.add(name_key)
         unique.append(s)
 
     print(f"\nTotal: {len(all_species)} raw, {len(unique)} unique species")
+    instrument.items(len(unique))
 
-    with open(OUT, "w") as f:
-        json.dump(unique, f, indent=2)
+    write_records(OUT, unique)
     print(f"Saved to {OUT}")
 
 
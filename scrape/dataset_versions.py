@@ -0,0 +1,100 @@
+"""Versioned releases of species.json, so installed clients update by diff.
+
+The app doesn't bundle species.json. src/lib/dataset.js keeps the records in
+Cache Storage and brings them up to date from public/data/:
+
+  manifest.json
+      {"version": 7, "count": 3307, "hash": "<sha1 of species.json>",
+       "diffs": [{"from": 6, "to": 7, "path": "data/diffs/6-7.json", "bytes": 812}, ...]}
+  diffs/<from>-<to>.json
+      {"from": 6, "to": 7, "count": 3307,
+       "removed": [id, ...],
+       "added": [entry, ...],
+       "changed": [{"id": id, "set": {field: value}, "unset": [field, ...]}, ...],
+       "order": [id, ...]}
+
+A client applies the chain of diffs from its version; one too far behind
+(no chain) downloads species.json whole. `order` is only there when the ids'
+order isn't the old order minus the removed ones plus the added ones, so a
+description fix costs a few hundred bytes instead of the whole file.
+
+build.py calls publish() with the previous build's species.json, read before
+it's overwritten, and the new one. The version only goes up when the bytes
+change.
+"""
+
+import hashlib
+import json
+
+# Diffs kept in the manifest; clients further behind download everything
+MAX_DIFFS = 10
+# A diff this large relative to species.json isn't worth chaining
+MAX_DIFF_RATIO = 0.5
+
+
+def diff_records(old, new):
+    """What turns the `old` list of species.json entries into `new`."""
+    old_by_id = {e["id"]: e for e in old}
+    new_ids = {e["id"] for e in new}
+    removed = [e["id"] for e in old if e["id"] not in new_ids]
+    added = []
+    changed = []
+    for entry in new:
+        before = old_by_id.get(entry["id"])
+        if before is None:
+            added.append(entry)
+        elif before != entry:
+            change = {"id": entry["id"],
+                      "set": {k: v for k, v in entry.items() if k not in before or before[k] != v}}
+            unset = [k for k in before if k not in entry]
+            if unset:
+                change["unset"] = unset
+            changed.append(change)
+    diff = {"removed": removed, "added": added, "changed": changed}
+    expected = [e["id"] for e in old if e["id"] in new_ids] + [e["id"] for e in added]
+    ids = [e["id"] for e in new]
+    if ids != expected:
+        diff["order"] = ids
+    return diff
+
+
+def publish(previous, current, data_dir):
+    """Write manifest.json (and a diff from the previous version) to data_dir
+    for the species.json bytes `current`; `previous` is the last build's bytes,
+    or None. Returns (manifest, whether it's a new version, size of the diff
+    written or None)."""
+    manifest_path = data_dir / "manifest.json"
+    diffs_dir = data_dir / "diffs"
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else None
+    digest = hashlib.sha1(current).hexdigest()
+    if manifest and manifest["hash"] == digest:
+        return manifest, False, None
+
+    version = manifest["version"] + 1 if manifest else 1
+    records = json.loads(current)
+    diffs = []
+    written = None
+    # Only chain from the release clients actually have
+    if manifest and previous is not None and hashlib.sha1(previous).hexdigest() == manifest["hash"]:
+        diff = {"from": version - 1, "to": version, "count": len(records)}
+        diff.update(diff_records(json.loads(previous), records))
+        text = json.dumps(diff, separators=(",", ":"))
+        if len(text) <= MAX_DIFF_RATIO * len(current):
+            diffs_dir.mkdir(parents=True, exist_ok=True)
+            path = f"diffs/{version - 1}-{version}.json"
+            (data_dir / path).write_text(text)
+            diffs = manifest["diffs"] + [{"from": version - 1, "to": version,
+                                          "path": f"data/{path}", "bytes": len(text)}]
+            written = len(text)
+    diffs = diffs[-MAX_DIFFS:]
+
+    keep = {d["path"] for d in diffs}
+    if diffs_dir.exists():
+        for stale in diffs_dir.glob("*.json"):
+            if f"data/diffs/{stale.name}" not in keep:
+                stale.unlink()
+
+    manifest = {"version": version, "count": len(records), "hash": digest, "diffs": diffs}
+    data_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(json.dumps(manifest, indent=2) + "\n")
+    return manifest, True, written
@@ -0,0 +1,186 @@
+"""Find species that share an image, and images that look alike.
+
+Infoboxes of related species (subspecies, split species, a genus photo)
+often reuse one photo, so the same sprite and original get stored, copied
+and cached once per species. This pass groups them:
+
+  - Exact duplicates: sprites (scrape/images/*.png) and originals
+    (scrape/originals/*.webp) with the same SHA-1. Every species in a group
+    points at the group's first slug (sorted), so build.py copies one file
+    per group and transcode_photos.py transcodes one photo.
+  - Near duplicates: sprites whose dHash and pHash (NumPy, over a 32x32
+    grayscale of every sprite at once) are both within NEAR_BITS bits, but
+    whose bytes differ. These are only listed, for review: usually the same
+    shot cropped or recompressed differently, or the wrong species' photo.
+
+Output: scrape/image_dupes.json
+    {"hashed": 3116,
+     "sprites": {"Zapus_hudsonius_preblei": "Meadow_jumping_mouse", ...},
+     "originals": {...},
+     "near": [{"a": slug, "b": slug, "dhash": 3, "phash": 6}, ...]}
+"""
+
+import hashlib
+import json
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+import instrument
+from instrument import span
+from sprites import read_png
+
+SCRAPE_DIR = Path(__file__).resolve().parent
+IMAGES_DIR = SCRAPE_DIR / "images"
+ORIGINALS_DIR = SCRAPE_DIR / "originals"
+DUPES_PATH = SCRAPE_DIR / "image_dupes.json"
+
+HASH_SIZE = 32          # grayscale side the hashes are computed from
+NEAR_BITS = 10          # max differing bits (of 64) in both hashes
+BLOCK = 256             # rows of the pairwise distance matrix at a time
+
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+# ---------------------------------------------------------------------------
+# Exact duplicates
+# ---------------------------------------------------------------------------
+def exact_groups(paths):
+    """slug → canonical slug for every file whose bytes another file shares."""
+    groups = defaultdict(list)
+    for path in paths:
+        groups[hashlib.sha1(path.read_bytes()).hexdigest()].append(path.stem)
+    canonical = {}
+    for slugs in groups.values():
+        first = min(slugs)
+        canonical.update((slug, first) for slug in slugs if slug != first)
+    return canonical
+
+
+# ---------------------------------------------------------------------------
+# Perceptual hashes
+# ---------------------------------------------------------------------------
+def _bins(size, n):
+    """reduceat start offsets and bin widths splitting `size` into n bins."""
+    edges = np.linspace(0, size, n + 1).astype(int)
+    return edges[:-1], np.diff(edges)
+
+
+def _shrink(images, rows, cols):
+    """Area-average a (N, H, W) batch down to (N, rows, cols); H, W >= rows, cols."""
+    starts, widths = _bins(images.shape[1], rows)
+    out = np.add.reduceat(images, starts, axis=1) / widths[None, :, None]
+    starts, widths = _bins(images.shape[2], cols)
+    return np.add.reduceat(out, starts, axis=2) / widths[None, None, :]
+
+
+def load_gray(path):
+    """HASH_SIZE x HASH_SIZE luma of a sprite."""
+    width, height, rows = read_png(path.read_bytes())
+    rgb = np.array(rows, dtype=np.float32)[..., :3]
+    luma = rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    if width < HASH_SIZE or height < HASH_SIZE:
+        ys = np.arange(HASH_SIZE) * height // HASH_SIZE
+        xs = np.arange(HASH_SIZE) * width // HASH_SIZE
+        return luma[np.ix_(ys, xs)]
+    return _shrink(luma[None], HASH_SIZE, HASH_SIZE)[0]
+
+
+def _pack(bits):
+    """(N, 64) booleans → (N,) uint64."""
+    return np.packbits(bits, axis=1).view(">u8").ravel().astype(np.uint64)
+
+
+def dhash(gray):
+    """Difference hash of a (N, HASH_SIZE, HASH_SIZE) batch: is each of 8x8
+    cells brighter than its left neighbor, on a 9-wide shrink."""
+    small = _shrink(gray, 8, 9)
+    return _pack((small[:, :, 1:] > small[:, :, :-1]).reshape(len(gray), 64))
+
+
+def _dct_matrix(n):
+    k = np.arange(n)[:, None]
+    m = np.cos(np.pi * (2 * np.arange(n)[None, :] + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    m[0] /= np.sqrt(2)
+    return m
+
+
+def phash(gray):
+    """DCT hash of a (N, HASH_SIZE, HASH_SIZE) batch: the 8x8 lowest
+    frequencies, each above or below their median (DC term left out of it)."""
+    d = _dct_matrix(gray.shape[1]).astype(np.float32)
+    low = (d @ gray @ d.T)[:, :8, :8].reshape(len(gray), 64)
+    return _pack(low > np.median(low[:, 1:], axis=1)[:, None])
+
+
+def hamming(a, b):
+    """(len(a), len(b)) differing bits between two uint64 hash arrays."""
+    x = (a[:, None] ^ b[None, :]).view(np.uint8).reshape(len(a), len(b), 8)
+    return POPCOUNT[x].sum(axis=2, dtype=np.uint8)
+
+
+def near_pairs(slugs, dh, ph, exact):
+    """Pairs within NEAR_BITS in both hashes, excluding exact duplicates,
+    closest first. The distance matrix is built BLOCK rows at a time."""
+    canonical = lambda slug: exact.get(slug, slug)
+    pairs = []
+    for start in range(0, len(slugs), BLOCK):
+        rows = slice(start, start + BLOCK)
+        close = (hamming(dh[rows], dh) <= NEAR_BITS) & (hamming(ph[rows], ph) <= NEAR_BITS)
+        for i, j in zip(*np.nonzero(close)):
+            i += start
+            if i < j and canonical(slugs[i]) != canonical(slugs[j]):
+                pairs.append({"a": slugs[i], "b": slugs[j],
+                              "dhash": int(hamming(dh[i:i + 1], dh[j:j + 1])[0, 0]),
+                              "phash": int(hamming(ph[i:i + 1], ph[j:j + 1])[0, 0])})
+    pairs.sort(key=lambda p: (p["dhash"] + p["phash"], p["a"], p["b"]))
+    return pairs
+
+
+def main():
+    instrument.start("dedupe_images")
+    sprites = sorted(IMAGES_DIR.glob("*.png"))
+    originals = sorted(ORIGINALS_DIR.glob("*.webp"))
+
+    with span("exact hash"):
+        sprite_dupes = exact_groups(sprites)
+        original_dupes = exact_groups(originals)
+
+    slugs, gray = [], []
+    with span("decode"):
+        for path in sprites:
+            try:
+                gray.append(load_gray(path))
+                slugs.append(path.stem)
+            except ValueError as e:
+                print(f"  {path.name}: {e}")
+            instrument.items()
+    with span("perceptual hash"):
+        batch = np.stack(gray) if gray else np.zeros((0, HASH_SIZE, HASH_SIZE), np.float32)
+        dh, ph = dhash(batch), phash(batch)
+    with span("compare"):
+        near = near_pairs(slugs, dh, ph, sprite_dupes)
+
+    with span("write"):
+        DUPES_PATH.write_text(json.dumps({
+            "hashed": len(slugs),
+            "sprites": dict(sorted(sprite_dupes.items())),
+            "originals": dict(sorted(original_dupes.items())),
+            "near": near,
+        }, indent=2) + "\n")
+
+    print(f"Sprites: {len(sprites)}, {len(sprite_dupes)} exact duplicates "
+          f"({len(set(sprite_dupes.values()))} groups)")
+    print(f"Originals: {len(originals)}, {len(original_dupes)} exact duplicates "
+          f"({len(set(original_dupes.values()))} groups)")
+    print(f"Near duplicates to review (dHash and pHash within {NEAR_BITS} bits): {len(near)}")
+    for pair in near[:20]:
+        print(f"  {pair['a']} ~ {pair['b']} (dHash {pair['dhash']}, pHash {pair['phash']})")
+    for name, value in [("sprite duplicates", len(sprite_dupes)),
+                        ("original duplicates", len(original_dupes)), ("near duplicates", len(near))]:
+        instrument.count(name, value)
+
+
+if __name__ == "__main__":
+    main()
@@ -17,15 +17,20 @@ import argparse
 import json
 import re
 import time
+from itertools import islice
 from pathlib import Path
 
 import anthropic
 from bs4 import BeautifulSoup
 
+import instrument
+from instrument import span
+from records import Extracted, count_records, read_records
+
 SCRAPE_DIR = Path(__file__).resolve().parent
 PAGES_DIR = SCRAPE_DIR / "pages"
 CACHE_DIR = SCRAPE_DIR / "llm_cache"
-EXTRACTED_PATH = SCRAPE_DIR / "extracted.json"
+EXTRACTED_PATH = SCRAPE_DIR / "extracted.jsonl"
 
 CACHE_FIELDS = ["descriptions", "stats", "regions", "habitats", "names"]
 
@@ -54,7 +59,8 @@ def load_cache(field):
 
 def save_cache(field, data):
     CACHE_DIR.mkdir(parents=True, exist_ok=True)
-    (CACHE_DIR / f"{field}.json").write_text(json.dumps(data, indent=2))
+    with span("cache write"):
+        (CACHE_DIR / f"{field}.json").write_text(json.dumps(data, indent=2))
 
 
 # --- HTML → plain text ---
@@ -101,7 +107,7 @@ def build_prompt(species, missing_fields):
             '"Near large bodies of water", "Deciduous forests")')
 
     if "stats" in missing_fields:
-        cs = species.get("conservation_status")
+        cs = species.conservation_status and species.conservation_status.value
         cs_hint = f'this species is "{cs}" — ' if cs else ""
         fields.append(
             '"stats": An object with Pokédex-style stats from 0-100:\n'
@@ -127,19 +133,19 @@ def build_prompt(species, missing_fields):
 
     return (
         "You are writing entries for a wildlife Pokédex — a retro-styled catalog of American animals.\n"
-        f"Given this Wikipedia article about {species['name']} ({species['species']}), "
+        f"Given this Wikipedia article about {species.name} ({species.species}), "
         f"generate the following fields:\n\n{numbered}\n\n"
         "Return ONLY valid JSON with the requested fields, no markdown fences or extra text."
     )
 
 
 def enrich_one(client, species, caches):
-    key = species["wiki_path"]
+    key = species.wiki_path
 
     missing = []
     for field in CACHE_FIELDS:
         if field == "names":
-            if species["name"] == species["species"] and key not in caches["names"]:
+            if species.name == species.species and key not in caches["names"]:
                 missing.append("names")
         elif key not in caches[field]:
             missing.append(field)
@@ -147,15 +153,19 @@ def enrich_one(client, species, caches):
     if not missing:
         return None
 
-    article = load_article_text(species["wiki_path"])
+    with span("article text"):
+        article = load_article_text(species.wiki_path)
     prompt = build_prompt(species, missing)
     content = f"<article>\n{article}\n</article>\n\n{prompt}" if article else prompt
 
-    response = client.messages.create(
-        model="claude-sonnet-4-5-20250929",
-        max_tokens=1024,
-        messages=[{"role": "user", "content": content}],
-    )
+    with span("llm call"):
+        response = client.messages.create(
+            model="claude-sonnet-4-5-20250929",
+            max_tokens=1024,
+            messages=[{"role": "user", "content": content}],
+        )
+    instrument.count("input tokens", response.usage.input_tokens)
+    instrument.count("output tokens", response.usage.output_tokens)
 
     text = response.content[0].text.strip()
     text = re.sub(r"^```(?:json)?\s*", "", text)
@@ -181,25 +191,25 @@ def main():
     parser.add_argument("--limit", type=int, default=0)
     args = parser.parse_args()
 
-    extracted = json.loads(EXTRACTED_PATH.read_text())
-    species_list = extracted[:args.limit] if args.limit else extracted
-    total = len(species_list)
+    instrument.start("enrich")
+    available = count_records(EXTRACTED_PATH)
+    total = min(args.limit, available) if args.limit else available
 
-    print(f"Enriching {total} species ({len(extracted)} total)...")
+    print(f"Enriching {total} species ({available} total)...")
 
     caches = {field: load_cache(field) for field in CACHE_FIELDS}
     client = anthropic.Anthropic()
 
     enriched = skipped = errors = 0
 
-    for i, species in enumerate(species_list):
+    for i, species in enumerate(islice(read_records(EXTRACTED_PATH, Extracted), total)):
         prefix = f"[{i+1}/{total}]"
 
         for attempt in range(4):
             try:
                 fields = enrich_one(client, species, caches)
                 if fields:
-                    print(f"{prefix} {species['name']} — enriched: {', '.join(fields)}")
+                    print(f"{prefix} {species.name} — enriched: {', '.join(fields)}")
                     enriched += 1
                     for f in fields:
                         save_cache(f, caches[f])
@@ -207,23 +217,28 @@ def main():
                     skipped += 1
                 break
             except anthropic.RateLimitError:
+                instrument.count("rate limited")
                 delay = 2 ** (attempt + 1)
-                print(f"{prefix} {species['name']} — rate limited, retrying in {delay}s...")
+                print(f"{prefix} {species.name} — rate limited, retrying in {delay}s...")
                 time.sleep(delay)
             except anthropic.APIStatusError as e:
                 if e.status_code >= 500 and attempt < 3:
+                    instrument.count("server errors")
                     delay = 2 ** (attempt + 1)
-                    print(f"{prefix} {species['name']} — {e.status_code}, retrying in {delay}s...")
+                    print(f"{prefix} {species.name} — {e.status_code}, retrying in {delay}s...")
                     time.sleep(delay)
                 else:
-                    print(f"{prefix} {species['name']} — ERROR: {e}")
+                    print(f"{prefix} {species.name} — ERROR: {e}")
                     errors += 1
                     break
             except (json.JSONDecodeError, KeyError, IndexError) as e:
-                print(f"{prefix} {species['name']} — parse error: {e}")
+                print(f"{prefix} {species.name} — parse error: {e}")
                 errors += 1
                 break
+        instrument.items()
 
+    for name, value in [("enriched", enriched), ("skipped (cached)", skipped), ("errors", errors)]:
+        instrument.count(name, value)
     print(f"\nDone. Enriched: {enriched}, Skipped (cached): {skipped}, Errors: {errors}")
     for field in CACHE_FIELDS:
         print(f"  {field}: {len(caches[field])} entries")
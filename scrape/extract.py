@@ -1,19 +1,23 @@
 """Extract structured fields from scraped HTML pages.
 
-Reads species_index.json + pages/*.html → outputs extracted.json with:
+Streams species_index.jsonl + pages/*.html → extracted.jsonl, one record per
+species, with:
   - Full binomial name (from infobox)
   - Conservation status (from infobox)
   - Cleaned common name (from <title> when scraper name == latin)
 """
 
-import json
 import re
 from pathlib import Path
 
+import instrument
+from instrument import span
+from records import Extracted, IndexEntry, RecordWriter, Status, count_records, read_records
+
 SCRAPE_DIR = Path(__file__).resolve().parent
 PAGES_DIR = SCRAPE_DIR / "pages"
-INDEX_PATH = SCRAPE_DIR / "species_index.json"
-OUTPUT_PATH = SCRAPE_DIR / "extracted.json"
+INDEX_PATH = SCRAPE_DIR / "species_index.jsonl"
+OUTPUT_PATH = SCRAPE_DIR / "extracted.jsonl"
 
 IUCN_STATUSES = [
     "Extinct in the Wild",
@@ -88,60 +92,63 @@ def title_case_name(name):
 
 
 def extract_one(entry):
-    html = html_for_species(entry["wiki_path"])
+    with span("page read"):
+        html = html_for_species(entry.wiki_path)
 
-    name = entry["name"]
-    species = entry.get("latin", "")
+    name = entry.name
+    species = entry.latin
     conservation = None
 
     if html:
-        binomial = parse_binomial(html)
-        if binomial:
-            species = binomial
-
-        conservation = parse_conservation_status(html)
-
-        # If scraper name == latin, try to get common name from title
-        if entry["name"] == entry.get("latin", ""):
-            title_name = parse_title_name(html)
-            if title_name and title_name.lower() != species.lower():
-                name = title_name
+        with span("parse"):
+            binomial = parse_binomial(html)
+            if binomial:
+                species = binomial
+
+            status = parse_conservation_status(html)
+            conservation = Status(status) if status else None
+
+            # If scraper name == latin, try to get common name from title
+            if entry.name == entry.latin:
+                title_name = parse_title_name(html)
+                if title_name and title_name.lower() != species.lower():
+                    name = title_name
+    else:
+        instrument.count("no page")
 
     name = title_case_name(name)
 
-    return {
-        "name": name,
-        "species": species,
-        "type": entry["type"],
-        "wiki_path": entry["wiki_path"],
-        "conservation_status": conservation,
-    }
+    return Extracted(
+        name=name,
+        species=species,
+        type=entry.type,
+        wiki_path=entry.wiki_path,
+        conservation_status=conservation,
+    )
 
 
 def main():
-    with open(INDEX_PATH) as f:
-        index = json.load(f)
+    instrument.start("extract")
+    print(f"Processing {count_records(INDEX_PATH)} species...")
 
-    print(f"Processing {len(index)} species...")
-
-    results = []
     status_counts = {}
     name_fixed = 0
 
-    for entry in index:
-        result = extract_one(entry)
-        results.append(result)
-
-        cs = result["conservation_status"] or "Unknown"
-        status_counts[cs] = status_counts.get(cs, 0) + 1
+    with RecordWriter(OUTPUT_PATH) as out:
+        for entry in read_records(INDEX_PATH, IndexEntry):
+            result = extract_one(entry)
+            with span("write"):
+                out.write(result)
+            instrument.items()
 
-        if entry["name"] == entry.get("latin", "") and result["name"] != entry["name"]:
-            name_fixed += 1
+            cs = result.conservation_status.value if result.conservation_status else "Unknown"
+            status_counts[cs] = status_counts.get(cs, 0) + 1
 
-    with open(OUTPUT_PATH, "w") as f:
-        json.dump(results, f, indent=2)
+            if entry.name == entry.latin and result.name != entry.name:
+                name_fixed += 1
+    instrument.count("names fixed", name_fixed)
 
-    print(f"Wrote {len(results)} species to {OUTPUT_PATH}")
+    print(f"Wrote {out.count} species to {OUTPUT_PATH}")
     print(f"Names fixed from title: {name_fixed}")
     print("Conservation status breakdown:")
     for status, count in sorted(status_counts.items(), key=lambda x: -x[1]):
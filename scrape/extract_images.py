@@ -1,43 +1,106 @@
 """Extract species photos from ZIM and pixelate into retro sprites.
 
-Reads species_index.json, finds the infobox photo for each species in the ZIM,
-and saves a pixelated 256x256 PNG (64x64 downscale, 32 colors, nearest-neighbor upscale).
+Streams species_index.jsonl, finds the infobox photo for each species in the ZIM,
+and saves a pixelated 64x64 palette PNG (32 colors). The app scales sprites up
+with `image-rendering: pixelated`, so they're stored at their real resolution.
+
+Work is split so that changing how sprites look never touches the archive:
+
+  1. Sources: each species' photo is read from the ZIM once and stored as is
+     under image_cache/sources/, named by its content hash (species sharing a
+     photo share the file). sources.json maps wiki_slug → hash (or null when
+     there's no photo) and is only refreshed for a new archive or --refresh.
+  2. Sprites: a Recipe (size, colors, crop) says how a source becomes a
+     sprite. Derived sprites live in image_cache/sprites/<recipe key>/<hash>.png,
+     so a new recipe (--size/--colors/--crop) re-runs just this step, on a
+     thread pool, and switching back to an earlier one is a copy. New sprites
+     get a lossless recompression pass on a process pool (sprites.py).
+  3. Each species' sprite is copied to scrape/images/ unless it's already
+     the one for the current source and recipe.
+  4. Placeholders: a 3x3 grid of each sprite's colors (placeholders.py),
+     computed in one NumPy batch for sprites that don't have one cached.
 
 Also extracts original Wikimedia filenames from saved HTML pages and writes
 image_filenames.json for build.py to construct Wikimedia Commons URLs.
 
-Output: scrape/images/{wiki_slug}.png     (pixelated sprite)
+Output: scrape/images/{wiki_slug}.png     (64x64 pixelated sprite)
+        scrape/placeholders.json          (wiki_slug → placeholder, for build.py)
         scrape/image_filenames.json       (wiki_slug → original filename)
+        scrape/image_cache/               (gitignored sources and sprites)
 """
 
+import argparse
+import hashlib
 import json
+import os
 import re
+import shutil
 import subprocess
-import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from pathlib import Path
 from urllib.parse import unquote
 
-from zim_utils import _get_archive, read_article
+import instrument
+from instrument import span
+from placeholders import placeholders
+from records import count_records, read_records
+from sprites import SPRITE_SIZE, optimize_all, report
+from zim_utils import archive_id, read_entry
 
 SCRAPE_DIR = Path(__file__).resolve().parent
-INDEX_PATH = SCRAPE_DIR / "species_index.json"
+INDEX_PATH = SCRAPE_DIR / "species_index.jsonl"
 IMAGES_DIR = SCRAPE_DIR / "images"
 PAGES_DIR = SCRAPE_DIR / "pages"
 FILENAMES_PATH = SCRAPE_DIR / "image_filenames.json"
-
+PLACEHOLDERS_PATH = SCRAPE_DIR / "placeholders.json"
+CACHE_DIR = SCRAPE_DIR / "image_cache"
+SOURCES_DIR = CACHE_DIR / "sources"
+SOURCES_PATH = CACHE_DIR / "sources.json"
+SPRITES_CACHE_DIR = CACHE_DIR / "sprites"
+# wiki_slug → "<recipe key>/<hash>" of the sprite currently in scrape/images/
+MADE_PATH = CACHE_DIR / "images.json"
+# "<recipe key>/<hash>" → placeholder of that sprite
+PLACEHOLDER_CACHE_PATH = CACHE_DIR / "placeholders.json"
+
+# Bump when sources.json's layout or how a photo is found changes
+CACHE_VERSION = 1
+# Bump when pixelate() changes in a way the Recipe fields don't capture
+RECIPE_VERSION = 1
+CROPS = ("center", "north", "south", "east", "west")
+
+
+@dataclass(frozen=True)
+class Recipe:
+    """How a source photo becomes a sprite."""
+    size: int = SPRITE_SIZE
+    colors: int = 32
+    # ImageMagick gravity for the square crop
+    crop: str = "center"
+
+    def key(self):
+        """Short hash naming this recipe's derived sprites."""
+        fields = json.dumps([RECIPE_VERSION, asdict(self)], sort_keys=True)
+        return hashlib.sha1(fields.encode()).hexdigest()[:12]
+
+
+# bytes patterns: articles are searched as read from the ZIM (a memoryview),
+# and only the matched src is decoded
 INFOBOX_RE = re.compile(
-    r'<table[^>]*class="[^"]*infobox biota[^"]*"[^>]*>(.*?)</table>', re.DOTALL
+    rb'<table[^>]*class="[^"]*infobox biota[^"]*"[^>]*>(.*?)</table>', re.DOTALL
 )
-IMG_RE = re.compile(r'<img[^>]+src="([^"]+)"[^>]*>', re.DOTALL)
+IMG_RE = re.compile(rb'<img[^>]+src="([^"]+)"[^>]*>', re.DOTALL)
 SKIP_PREFIXES = ("Status_", "OOjs_", "Distribution_")
 
 
 def find_infobox_image(html):
+    """ZIM path of the infobox photo in `html` (bytes or a memoryview of
+    them), or None."""
     m = INFOBOX_RE.search(html)
     if not m:
         return None
-    for img in IMG_RE.finditer(m.group(1)):
-        src = img.group(1)
+    for img in IMG_RE.finditer(html, m.start(1), m.end(1)):
+        src = img.group(1).decode()
         filename = src.rsplit("/", 1)[-1]
         if any(filename.startswith(p) for p in SKIP_PREFIXES):
             continue
@@ -49,35 +112,28 @@ def find_infobox_image(html):
 
 
 def extract_image_bytes(zim_path):
-    zim = _get_archive()
-    # HTML src attributes are often double-encoded (%252C → %2C)
-    for path in [zim_path, unquote(zim_path)]:
-        try:
-            entry = zim.get_entry_by_path(path)
-            return entry.get_item().content.tobytes()
-        except KeyError:
-            continue
-    return None
-
-
-def pixelate(input_bytes, output_path):
-    with tempfile.NamedTemporaryFile(suffix=".webp", delete=False) as tmp:
-        tmp.write(input_bytes)
-        tmp_path = tmp.name
-    try:
-        subprocess.run([
-            "convert", tmp_path,
-            "-gravity", "center",
-            "-thumbnail", "256x256^",
-            "-extent", "256x256",
-            "-resize", "64x64",
-            "-colors", "32",
-            "-filter", "point",
-            "-resize", "256x256",
-            str(output_path),
-        ], check=True, capture_output=True)
-    finally:
-        Path(tmp_path).unlink(missing_ok=True)
+    """Image content as a memoryview into the ZIM (no copy), or None."""
+    # HTML src attributes are often double-encoded (%252C → %2C); read_entry
+    # tries both spellings against the title index
+    return read_entry(zim_path)
+
+
+def pixelate(image, output_path, recipe=Recipe()):
+    """Pixelate `image` (bytes or a memoryview) into a palette PNG at
+    output_path: crop to a square at 4x the sprite size, then downscale and
+    quantize. The buffer goes to convert on stdin rather than through a temp
+    file."""
+    work = f"{recipe.size * 4}x{recipe.size * 4}"
+    subprocess.run([
+        "convert", "-",
+        "-gravity", recipe.crop,
+        "-thumbnail", f"{work}^",
+        "-extent", work,
+        "-resize", f"{recipe.size}x{recipe.size}",
+        "-colors", str(recipe.colors),
+        "-strip",
+        f"PNG8:{output_path}",
+    ], input=image, check=True, capture_output=True)
 
 
 def zim_path_to_filename(zim_path):
@@ -97,16 +153,13 @@ def zim_path_to_filename(zim_path):
 
 def extract_filenames():
     """Extract original Wikimedia filenames from saved HTML pages."""
-    with open(INDEX_PATH) as f:
-        index = json.load(f)
-
     filenames = {}
-    for entry in index:
+    for entry in read_records(INDEX_PATH):
         slug = entry["wiki_path"].split("/wiki/")[-1]
         page_path = PAGES_DIR / f"{slug}.html"
         if not page_path.exists():
             continue
-        html = page_path.read_text()
+        html = page_path.read_bytes()
         zim_path = find_infobox_image(html)
         if zim_path:
             filenames[slug] = zim_path_to_filename(zim_path)
@@ -116,56 +169,163 @@ def extract_filenames():
     print(f"Wrote {len(filenames)} image filenames to {FILENAMES_PATH}")
 
 
-def main():
-    with open(INDEX_PATH) as f:
-        index = json.load(f)
+def load_sources(refresh=False):
+    current = archive_id()
+    sources = None
+    if not refresh and SOURCES_PATH.exists():
+        sources = json.loads(SOURCES_PATH.read_text())
+        if (sources.get("version"), sources.get("archive")) != (CACHE_VERSION, current):
+            # A new dump may have new photos; source files are kept and reused by hash
+            sources = None
+    return sources or {"version": CACHE_VERSION, "archive": current, "species": {}}
+
+
+def find_source(slug):
+    """Read the species' infobox photo from the ZIM into the source cache.
+    Returns its content hash, or a reason there's none."""
+    # Only the infobox src is needed, so the article is never decoded
+    html = read_entry("A/" + slug)
+    if not html:
+        return None, "no article"
+    with span("parse"):
+        zim_path = find_infobox_image(html)
+    if not zim_path:
+        return None, "no infobox image"
+    image = extract_image_bytes(zim_path)
+    if not image:
+        return None, f"image not in ZIM: {zim_path}"
+    digest = hashlib.sha1(image).hexdigest()
+    path = SOURCES_DIR / digest
+    if not path.exists():
+        with span("image write"):
+            path.write_bytes(image)
+    return digest, None
+
+
+def derive(digest, recipe, out_path):
+    """Run the recipe on one cached source (in a pool thread)."""
+    tmp = out_path.with_name(out_path.name + ".tmp")
+    pixelate((SOURCES_DIR / digest).read_bytes(), tmp, recipe)
+    tmp.replace(out_path)
+    return out_path
 
-    IMAGES_DIR.mkdir(exist_ok=True)
-    total = len(index)
-    extracted = 0
-    skipped_existing = 0
-    no_image = 0
-    errors = 0
 
-    for i, entry in enumerate(index, 1):
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="sprites made at once, and processes for recompressing them")
+    parser.add_argument("--refresh", action="store_true",
+                        help="re-read every species' photo from the ZIM")
+    parser.add_argument("--size", type=int, default=Recipe.size, help="sprite width and height")
+    parser.add_argument("--colors", type=int, default=Recipe.colors, help="palette size")
+    parser.add_argument("--crop", choices=CROPS, default=Recipe.crop,
+                        help="which part of the photo the square crop keeps")
+    args = parser.parse_args()
+    recipe = Recipe(args.size, args.colors, args.crop)
+
+    instrument.start("extract_images")
+    IMAGES_DIR.mkdir(exist_ok=True)
+    SOURCES_DIR.mkdir(parents=True, exist_ok=True)
+    derived_dir = SPRITES_CACHE_DIR / recipe.key()
+    derived_dir.mkdir(parents=True, exist_ok=True)
+    print(f"Recipe {recipe.key()}: {recipe}")
+
+    # 1. Sources: the only step that reads the ZIM
+    total = count_records(INDEX_PATH)
+    sources = load_sources(args.refresh)
+    slugs = []
+    read = 0
+    for i, entry in enumerate(read_records(INDEX_PATH), 1):
         slug = entry["wiki_path"].split("/wiki/")[-1]
-        out_path = IMAGES_DIR / f"{slug}.png"
-
-        if out_path.exists():
-            skipped_existing += 1
-            continue
-
-        wiki_path = "A/" + slug
-        html = read_article(wiki_path)
-        if not html:
-            print(f"[{i}/{total}] {entry['name']} -- no article")
-            no_image += 1
+        slugs.append(slug)
+        if slug in sources["species"]:
             continue
-
-        zim_path = find_infobox_image(html)
-        if not zim_path:
-            print(f"[{i}/{total}] {entry['name']} -- no infobox image")
+        digest, reason = find_source(slug)
+        sources["species"][slug] = digest
+        read += 1
+        if reason:
+            print(f"[{i}/{total}] {entry['name']} -- {reason}")
+    with span("cache write"):
+        SOURCES_PATH.write_text(json.dumps(sources))
+    print(f"Sources: {read} read from the ZIM, {len(slugs) - read} cached")
+
+    # 2. Sprites for this recipe that haven't been made yet
+    made = json.loads(MADE_PATH.read_text()) if MADE_PATH.exists() else {}
+    copies = []
+    todo = {}
+    up_to_date = 0
+    no_image = 0
+    for slug in slugs:
+        digest = sources["species"].get(slug)
+        if not digest:
             no_image += 1
             continue
-
-        img_bytes = extract_image_bytes(zim_path)
-        if not img_bytes:
-            print(f"[{i}/{total}] {entry['name']} -- image not in ZIM: {zim_path}")
-            no_image += 1
+        key = f"{recipe.key()}/{digest}"
+        if made.get(slug) == key and (IMAGES_DIR / f"{slug}.png").exists():
+            up_to_date += 1
             continue
+        derived = derived_dir / f"{digest}.png"
+        if not derived.exists():
+            todo[digest] = derived
+        copies.append((slug, key, derived))
 
-        try:
-            pixelate(img_bytes, out_path)
-            extracted += 1
-            print(f"[{i}/{total}] {entry['name']} ok")
-        except subprocess.CalledProcessError as e:
-            errors += 1
-            print(f"[{i}/{total}] {entry['name']} -- convert failed: {e.stderr[:200]}")
-
-    print(f"\nDone: {extracted} extracted, {skipped_existing} already existed, "
-          f"{no_image} no image, {errors} errors")
-
-    extract_filenames()
+    errors = 0
+    written = []
+    if todo:
+        print(f"Pixelating {len(todo)} sources on {args.workers} workers...", flush=True)
+        # Spans inside pool threads would overlap, so time the pool as a whole
+        with span("pixelate"), ThreadPoolExecutor(max_workers=args.workers) as pool:
+            jobs = {digest: pool.submit(derive, digest, recipe, path) for digest, path in todo.items()}
+            for digest, job in jobs.items():
+                try:
+                    written.append(job.result())
+                except subprocess.CalledProcessError as e:
+                    errors += 1
+                    print(f"  {digest} -- convert failed: {e.stderr[:200]}")
+        results = optimize_all(written, args.workers)
+        report(results, len(written) - len(results))
+
+    # 3. Copy each species' sprite into place
+    copied = 0
+    reused = 0
+    fresh = set(written)
+    with span("image copy"):
+        for slug, key, derived in copies:
+            if derived.exists():
+                shutil.copyfile(derived, IMAGES_DIR / f"{slug}.png")
+                made[slug] = key
+                copied += 1
+                reused += derived not in fresh
+                instrument.items()
+    with span("cache write"):
+        MADE_PATH.write_text(json.dumps(made))
+
+    # 4. Placeholders, keyed like the sprites so they're computed once each
+    current = {slug: made[slug] for slug in slugs
+               if slug in made and (IMAGES_DIR / f"{slug}.png").exists()}
+    cached = {}
+    if PLACEHOLDER_CACHE_PATH.exists():
+        cached = json.loads(PLACEHOLDER_CACHE_PATH.read_text())
+    missing = {key: IMAGES_DIR / f"{slug}.png" for slug, key in current.items() if key not in cached}
+    if missing:
+        with span("placeholders"):
+            cached.update(zip(missing, placeholders(list(missing.values()))))
+        with span("cache write"):
+            PLACEHOLDER_CACHE_PATH.write_text(json.dumps(cached))
+    with span("write"):
+        PLACEHOLDERS_PATH.write_text(json.dumps(
+            {slug: cached[key] for slug, key in sorted(current.items()) if cached[key]}, indent=2) + "\n")
+    print(f"Placeholders: {len(missing)} computed, {len(current) - len(missing)} cached")
+
+    print(f"\nDone: {copied} sprites updated ({reused} from earlier runs of this recipe), "
+          f"{up_to_date} up to date, {no_image} no image, {errors} errors")
+    for name, value in [("sources read", read), ("pixelated", len(written)), ("updated", copied),
+                        ("reused", reused), ("up to date", up_to_date), ("no image", no_image),
+                        ("convert errors", errors), ("placeholders computed", len(missing))]:
+        instrument.count(name, value)
+
+    with span("filenames"):
+        extract_filenames()
 
 
 if __name__ == "__main__":
@@ -1,34 +1,35 @@
 """Extract raw (non-pixelated) species photos from ZIM as local fallbacks.
 
-Reads species_index.json, finds the infobox photo for each species in the ZIM,
+Streams species_index.jsonl, finds the infobox photo for each species in the ZIM,
 and saves the raw WebP bytes to scrape/originals/{wiki_slug}.webp.
-No resizing, no pixelation — just the original ZIM image.
+No resizing, no pixelation — just the original ZIM image, written straight
+from the archive's buffer (neither the article nor the image is copied).
 
 Output: scrape/originals/{wiki_slug}.webp
 """
 
-import json
 from pathlib import Path
 
+import instrument
 from extract_images import find_infobox_image, extract_image_bytes
-from zim_utils import read_article
+from instrument import span
+from records import count_records, read_records
+from zim_utils import read_entry
 
 SCRAPE_DIR = Path(__file__).resolve().parent
-INDEX_PATH = SCRAPE_DIR / "species_index.json"
+INDEX_PATH = SCRAPE_DIR / "species_index.jsonl"
 ORIGINALS_DIR = SCRAPE_DIR / "originals"
 
 
 def main():
-    with open(INDEX_PATH) as f:
-        index = json.load(f)
-
+    instrument.start("extract_originals")
     ORIGINALS_DIR.mkdir(exist_ok=True)
-    total = len(index)
+    total = count_records(INDEX_PATH)
     extracted = 0
     skipped_existing = 0
     no_image = 0
 
-    for i, entry in enumerate(index, 1):
+    for i, entry in enumerate(read_records(INDEX_PATH), 1):
         slug = entry["wiki_path"].split("/wiki/")[-1]
         out_path = ORIGINALS_DIR / f"{slug}.webp"
 
@@ -36,28 +37,34 @@ def main():
             skipped_existing += 1
             continue
 
-        html = read_article("A/" + slug)
+        html = read_entry("A/" + slug)
         if not html:
             no_image += 1
             continue
 
-        zim_path = find_infobox_image(html)
+        with span("parse"):
+            zim_path = find_infobox_image(html)
         if not zim_path:
             no_image += 1
             continue
 
-        img_bytes = extract_image_bytes(zim_path)
-        if not img_bytes:
+        image = extract_image_bytes(zim_path)
+        if not image:
             no_image += 1
             continue
 
-        out_path.write_bytes(img_bytes)
+        with span("image write"):
+            # Written straight from the ZIM's buffer
+            out_path.write_bytes(image)
         extracted += 1
+        instrument.items()
         if i % 100 == 0:
             print(f"[{i}/{total}] {extracted} extracted so far...")
 
     print(f"\nDone: {extracted} extracted, {skipped_existing} already existed, "
           f"{no_image} no image")
+    instrument.count("already existed", skipped_existing)
+    instrument.count("no image", no_image)
 
 
 if __name__ == "__main__":
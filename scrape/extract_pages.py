@@ -1,18 +1,20 @@
 #!/usr/bin/env python3
 """Extract article HTML from ZIM for each species in the index.
 
-Reads scrape/species_index.json, looks up each wiki_path in the ZIM archive,
+Streams scrape/species_index.jsonl, looks up each wiki_path in the ZIM archive,
 and writes HTML to scrape/pages/<name>.html.
 """
 
-import json
 import re
 from pathlib import Path
 from urllib.parse import unquote
 
-from zim_utils import read_article
+import instrument
+from instrument import span
+from records import count_records, read_records
+from zim_utils import read_entry
 
-INDEX = Path(__file__).parent / "species_index.json"
+INDEX = Path(__file__).parent / "species_index.jsonl"
 PAGES_DIR = Path(__file__).parent / "pages"
 
 
@@ -24,32 +26,30 @@ def sanitize_filename(wiki_path):
 
 
 def main():
-    with open(INDEX) as f:
-        species = json.load(f)
-
+    instrument.start("extract_pages")
+    total = count_records(INDEX)
     PAGES_DIR.mkdir(exist_ok=True)
 
     found = 0
     missing = []
-    for i, s in enumerate(species):
+    for i, s in enumerate(read_records(INDEX)):
         wiki_path = s["wiki_path"]
-        raw_name = wiki_path.removeprefix("/wiki/")
-        decoded_name = unquote(raw_name)
-        zim_path = "A/" + decoded_name
-
-        html = read_article(zim_path)
-        if html is None and decoded_name != raw_name:
-            html = read_article("A/" + raw_name)
+        # Encoded or decoded, the title index finds it in one lookup. The
+        # page is copied out as UTF-8 bytes, never decoded
+        html = read_entry(wiki_path)
         if html is None:
             missing.append(s["name"])
+            instrument.count("missing")
             continue
 
         filename = sanitize_filename(wiki_path)
-        (PAGES_DIR / filename).write_text(html)
+        with span("page write"):
+            (PAGES_DIR / filename).write_bytes(html)
         found += 1
+        instrument.items()
 
         if (i + 1) % 200 == 0:
-            print(f"  {i + 1}/{len(species)} processed...")
+            print(f"  {i + 1}/{total} processed...")
 
     print(f"\nExtracted {found} pages, {len(missing)} missing")
     if missing:
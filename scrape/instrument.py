@@ -0,0 +1,191 @@
+"""Shared run instrumentation for the scrape stages.
+
+Each script calls start("<stage>") once in main(), then wraps the expensive
+steps in span("zim read"), span("parse"), ... and counts what it did with
+count() and items(). Spans and counters are aggregated in memory; the run
+log gets a start record, a progress record every PROGRESS_INTERVAL seconds
+while items are flowing, and per-span / per-counter totals plus peak RSS at
+exit, when a summary table is also printed.
+
+Run logs are JSONL files in scrape/runs/ (gitignored), one per stage run:
+
+    {"event": "start", "stage": "extract", "t": 0.0, "time": "...", "pid": 123}
+    {"event": "progress", "t": 5.0, "items": 812, "items_per_sec": 162.4, "rss_mb": 41.2}
+    {"event": "span", "t": 19.7, "name": "parse", "calls": 3307, "seconds": 12.1, "max": 0.04}
+    {"event": "counter", "t": 19.7, "name": "names fixed", "value": 190}
+    {"event": "end", "t": 19.7, "items": 3307, "items_per_sec": 167.9, "peak_rss_mb": 44.0, ...}
+
+Spans can nest (an "llm call" inside an "enrich" loop), so their totals may
+overlap. Spans inside process-pool workers aren't collected; time the pool
+as a whole from the parent.
+
+SCRAPE_PROFILE=cprofile writes a .prof next to the run log and prints the
+top functions by cumulative time; SCRAPE_PROFILE=tracemalloc prints the top
+allocation sites and the traced peak. SCRAPE_RUN_DIR overrides the log
+directory.
+"""
+
+import atexit
+import json
+import os
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+RUN_DIR = Path(os.environ.get("SCRAPE_RUN_DIR") or Path(__file__).resolve().parent / "runs")
+PROGRESS_INTERVAL = 5.0
+TOP_N = 15
+
+_run = None
+
+
+class _Run:
+    def __init__(self, stage):
+        self.stage = stage
+        self.t0 = time.perf_counter()
+        self.spans = {}
+        self.counters = Counter()
+        self.items = 0
+        self.last_progress = self.t0
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        RUN_DIR.mkdir(parents=True, exist_ok=True)
+        self.log_path = RUN_DIR / f"{stage}-{stamp}.jsonl"
+        self.log = open(self.log_path, "w")
+        self.profile = os.environ.get("SCRAPE_PROFILE", "").lower()
+        self.profiler = None
+
+    def elapsed(self):
+        return time.perf_counter() - self.t0
+
+    def emit(self, event, **fields):
+        record = {"event": event, "t": round(self.elapsed(), 3), **fields}
+        self.log.write(json.dumps(record) + "\n")
+        self.log.flush()
+
+
+def peak_rss_mb(who=None):
+    """Peak resident set size in MB of this process (or of its largest child)."""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF if who is None else who)
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return round(usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def current_rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return round(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20, 1)
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+
+def start(stage):
+    """Begin instrumenting this process as `stage`. Call once from main()."""
+    global _run
+    _run = _Run(stage)
+    _run.emit("start", stage=stage, time=datetime.now().isoformat(timespec="seconds"),
+              pid=os.getpid(), argv=sys.argv[1:], profile=_run.profile or None)
+    if _run.profile == "cprofile":
+        import cProfile
+        _run.profiler = cProfile.Profile()
+        _run.profiler.enable()
+    elif _run.profile == "tracemalloc":
+        import tracemalloc
+        tracemalloc.start(10)
+    atexit.register(finish)
+    return _run.log_path
+
+
+@contextmanager
+def span(name):
+    """Time a block under `name`. A no-op aggregate when start() wasn't called."""
+    t = time.perf_counter()
+    try:
+        yield
+    finally:
+        if _run is not None:
+            dt = time.perf_counter() - t
+            s = _run.spans.get(name)
+            if s is None:
+                s = _run.spans[name] = [0, 0.0, 0.0]
+            s[0] += 1
+            s[1] += dt
+            if dt > s[2]:
+                s[2] = dt
+
+
+def count(name, n=1):
+    if _run is not None:
+        _run.counters[name] += n
+
+
+def items(n=1):
+    """Record n finished items (the stage's unit of throughput)."""
+    if _run is None:
+        return
+    _run.items += n
+    now = time.perf_counter()
+    if now - _run.last_progress >= PROGRESS_INTERVAL:
+        _run.last_progress = now
+        elapsed = now - _run.t0
+        _run.emit("progress", items=_run.items, items_per_sec=round(_run.items / elapsed, 1),
+                  rss_mb=current_rss_mb())
+
+
+def _profile_report(run):
+    if run.profiler is not None:
+        import pstats
+        run.profiler.disable()
+        prof_path = run.log_path.with_suffix(".prof")
+        run.profiler.dump_stats(prof_path)
+        print(f"\ncProfile: {prof_path} (top {TOP_N} by cumulative time)")
+        pstats.Stats(run.profiler).sort_stats("cumulative").print_stats(TOP_N)
+    elif run.profile == "tracemalloc":
+        import tracemalloc
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        print(f"\ntracemalloc: peak {peak / 2**20:.1f} MB traced; top {TOP_N} allocation sites:")
+        for stat in snapshot.statistics("lineno")[:TOP_N]:
+            print(f"  {stat.size / 2**20:8.2f} MB  {stat.count:>8}  {stat.traceback[0]}")
+        run.emit("tracemalloc", peak_mb=round(peak / 2**20, 1))
+
+
+def finish():
+    """Write totals to the run log and print the summary table (runs at exit)."""
+    global _run
+    run, _run = _run, None
+    if run is None:
+        return
+    _profile_report(run)
+    elapsed = run.elapsed()
+    for name, (calls, total, longest) in run.spans.items():
+        run.emit("span", name=name, calls=calls, seconds=round(total, 4), max=round(longest, 4))
+    for name, value in run.counters.items():
+        run.emit("counter", name=name, value=value)
+    rate = run.items / elapsed if elapsed else 0
+    peak = peak_rss_mb()
+    children = peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else None
+    run.emit("end", seconds=round(elapsed, 3), items=run.items, items_per_sec=round(rate, 1),
+             peak_rss_mb=peak, child_peak_rss_mb=children or None)
+    run.log.close()
+
+    print(f"\n── {run.stage}: {elapsed:.1f}s, {run.items} items ({rate:.1f}/s), "
+          f"peak RSS {peak} MB" + (f", largest child {children} MB" if children else "") + " ──")
+    if run.spans:
+        print(f"  {'span':<18} {'calls':>8} {'total':>9} {'mean':>9} {'max':>9} {'share':>6}")
+        for name, (calls, total, longest) in sorted(run.spans.items(), key=lambda kv: -kv[1][1]):
+            print(f"  {name:<18} {calls:>8} {total:>8.2f}s {total / calls * 1000:>7.1f}ms "
+                  f"{longest * 1000:>7.1f}ms {total / elapsed:>6.0%}")
+    if run.counters:
+        print("  " + ", ".join(f"{name}={value}" for name, value in run.counters.items()))
+    print(f"  run log: {run.log_path}")
@@ -0,0 +1,260 @@
+"""Streaming parser for Wikipedia list pages.
+
+iter_items(html) makes one pass over a page and yields every list item (<li>)
+and table row (<tr>) in document order, as ListItem records that the
+per-taxon parsers in build_index.py pick names and latin names out of:
+
+    item.text      the item's own text, whitespace-collapsed, with nested
+                   lists and citation markers ([3]) left out
+    item.links     its <a> elements as Link(href, title, text, italic, lead)
+    item.italics   the text of its <i> elements
+    item.cells     for table rows, one Cell per <td> (an <li> has one cell)
+    item.nested    True if the item contains a list of its own
+
+Unlike regexes over the whole page (`<li[^>]*>(.*?)</li>`), a nested list
+doesn't swallow its parent's text or lose its first item, and an item that
+only heads a nested list ("Species split from the eastern fence lizard:")
+can be told apart from a species entry.
+
+The page is tokenized with a single compiled regex, and the events are
+handled the way an html.parser.HTMLParser subclass would handle them.
+HTMLParser itself was about 7x slower than the old regexes on the bird list.
+Attributes are only parsed for the tags that need them.
+"""
+
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from html import unescape
+
+LISTS = {"ul", "ol", "dl"}
+# Tags the parser reacts to; everything else is skipped, keeping its text
+TAGS = LISTS | {"li", "table", "tr", "td", "th", "a", "i", "sup", "script", "style"}
+TOKEN_RE = re.compile(
+    r"<(/?)([a-zA-Z][a-zA-Z0-9]*)([^>]*)>"  # start or end tag
+    r"|<!--.*?-->|<[!?][^>]*>"              # comment, doctype, processing instruction
+    r"|([^<]+|<)",                          # text, or a stray "<"
+    re.DOTALL)
+ATTR_RE = re.compile(r"""([^\s=/]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""")
+SPACE_RE = re.compile(r"\s+")
+
+
+def parse_attrs(raw):
+    return {m.group(1).lower(): unescape(m.group(2) or m.group(3) or m.group(4) or "")
+            for m in ATTR_RE.finditer(raw)}
+
+
+@dataclass(slots=True)
+class Link:
+    href: str
+    title: str
+    text: str = ""
+    # Inside an <i>, and whether it starts its cell (nothing but blanks before it)
+    italic: bool = False
+    lead: bool = False
+
+
+@dataclass(slots=True)
+class Cell:
+    parts: list = field(default_factory=list)
+    links: list = field(default_factory=list)
+    italics: list = field(default_factory=list)
+
+    @property
+    def text(self):
+        return SPACE_RE.sub(" ", "".join(self.parts).strip())
+
+
+@dataclass(slots=True)
+class ListItem:
+    tag: str
+    depth: int
+    cells: list = field(default_factory=list)
+    nested: bool = False
+    in_cell: bool = False
+    done: bool = False
+
+    @property
+    def text(self):
+        return self.cells[0].text if self.cells else ""
+
+    @property
+    def links(self):
+        return self.cells[0].links if self.cells else []
+
+    @property
+    def italics(self):
+        return self.cells[0].italics if self.cells else []
+
+    def link(self, cell=0, named=False):
+        """First link with a real target (no #fragment), as the old href regex
+        found it; named=True also requires link text."""
+        if cell >= len(self.cells):
+            return None
+        for link in self.cells[cell].links:
+            if link.href and "#" not in link.href and (link.text or not named):
+                return link
+        return None
+
+    def is_heading(self):
+        """Only introduces a nested list, e.g. 'Species split from X:'."""
+        return self.nested and self.text.endswith(":")
+
+
+class ListItemParser:
+    """Collects ListItems as the page is fed; see iter_items()."""
+
+    def __init__(self):
+        self.open = []          # items not yet closed, innermost last
+        self.order = deque()    # every item in start order, until yielded
+        self.depth = 0          # list nesting depth
+        self.tables = 0         # table nesting depth
+        self.anchor = None      # Link being read
+        self.in_italic = 0
+        self.italic_parts = []
+        self.skip = 0           # inside a citation <sup> or <script>/<style>
+
+    def _target(self):
+        """Cell of the innermost open item, if text here belongs to it."""
+        if not self.open:
+            return None
+        item = self.open[-1]
+        if item.tag == "tr":
+            return item.cells[-1] if item.in_cell else None
+        return item.cells[0] if item.depth == self.depth else None
+
+    def _close_to(self, tag, depth=None):
+        """Close open items down to (and including) the innermost `tag`."""
+        for i in range(len(self.open) - 1, -1, -1):
+            item = self.open[i]
+            if item.tag == tag and (depth is None or item.depth == depth):
+                for closed in self.open[i:]:
+                    closed.done = True
+                del self.open[i:]
+                return
+
+    def handle_starttag(self, tag, attrs):
+        if self.skip:
+            if tag == "sup":
+                self.skip += 1
+            return
+        if tag in ("script", "style") or (tag == "sup" and "reference" in parse_attrs(attrs).get("class", "")):
+            self.skip = 1
+            return
+        if tag == "li":
+            top = self.open[-1] if self.open else None
+            if top and top.tag == "li" and top.depth == self.depth:
+                self._close_to("li", self.depth)  # implied </li>
+            self._push(ListItem("li", self.depth, [Cell()]))
+        elif tag in LISTS:
+            for item in reversed(self.open):
+                if item.tag == "li" and item.depth == self.depth:
+                    item.nested = True
+                    break
+            self.depth += 1
+        elif tag == "table":
+            self.tables += 1
+        elif tag == "tr":
+            top = self.open[-1] if self.open else None
+            if top and top.tag == "tr" and top.depth == self.tables:
+                self._close_to("tr")  # implied </tr>
+            self._push(ListItem("tr", self.tables))
+        elif tag in ("td", "th"):
+            top = self.open[-1] if self.open else None
+            if top and top.tag == "tr":
+                # Header cells aren't kept; their text goes nowhere
+                if tag == "td":
+                    top.cells.append(Cell())
+                top.in_cell = tag == "td"
+        elif tag == "a":
+            cell = self._target()
+            if cell is not None:
+                attrs = parse_attrs(attrs)
+                self.anchor = Link(attrs.get("href", ""), attrs.get("title", ""),
+                                   italic=self.in_italic > 0, lead=not "".join(cell.parts).strip())
+                cell.links.append(self.anchor)
+        elif tag == "i":
+            self.in_italic += 1
+            if self.in_italic == 1:
+                self.italic_parts = []
+
+    def handle_endtag(self, tag):
+        if self.skip:
+            if tag in ("sup", "script", "style"):
+                self.skip -= 1
+            return
+        if tag == "li":
+            self._close_to("li", self.depth)
+        elif tag in LISTS:
+            if self.depth:
+                self._close_to("li", self.depth)
+                self.depth -= 1
+        elif tag == "tr":
+            self._close_to("tr")
+        elif tag == "table":
+            if self.tables:
+                self._close_to("tr", self.tables)
+                self.tables -= 1
+        elif tag in ("td", "th"):
+            if self.open and self.open[-1].tag == "tr":
+                self.open[-1].in_cell = False
+        elif tag == "a":
+            if self.anchor is not None:
+                self.anchor.text = SPACE_RE.sub(" ", self.anchor.text.strip())
+                self.anchor = None
+        elif tag == "i" and self.in_italic:
+            self.in_italic -= 1
+            if not self.in_italic:
+                cell = self._target()
+                text = "".join(self.italic_parts).strip()
+                if cell is not None and text:
+                    cell.italics.append(text)
+
+    def handle_data(self, data):
+        if self.skip:
+            return
+        if self.in_italic:
+            self.italic_parts.append(data)
+        cell = self._target()
+        if cell is not None:
+            cell.parts.append(data)
+            if self.anchor is not None:
+                self.anchor.text += data
+
+    def _push(self, item):
+        self.open.append(item)
+        self.order.append(item)
+
+    def feed(self, html):
+        """Handle every token of `html`, yielding items as they're finished."""
+        for m in TOKEN_RE.finditer(html):
+            end, tag, attrs, text = m.groups()
+            if tag:
+                tag = tag.lower()
+                if tag not in TAGS:
+                    continue
+                if end:
+                    self.handle_endtag(tag)
+                    if self.order and self.order[0].done:
+                        yield from self.finished()
+                else:
+                    self.handle_starttag(tag, attrs)
+            elif text:
+                self.handle_data(unescape(text) if "&" in text else text)
+        for item in self.order:
+            item.done = True
+        self.open.clear()
+        yield from self.finished()
+
+    def finished(self):
+        """Pop the items that are closed and have no open item before them."""
+        order = self.order
+        while order and order[0].done:
+            yield order.popleft()
+
+
+def iter_items(html, tags=("li", "tr")):
+    """Yield the page's ListItems in document order, in one streaming pass."""
+    for item in ListItemParser().feed(html):
+        if item.tag in tags:
+            yield item
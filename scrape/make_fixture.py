@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""Build a synthetic ZIM archive shaped like the Wikipedia dump, for benchmarks.
+
+Generates list pages in the markup each build_index.py parser expects
+(mammals, birds, amphibians, reptiles, the 12 state fish lists in both table
+and list form, and the global fish list), one article per species with an
+infobox (photo, IUCN status, binomial) and distribution text, and the infobox
+photos themselves. Names, statuses and ranges are drawn from a seeded RNG, so
+the same --species/--seed always produces the same archive.
+
+List pages also carry the quirks of the real ones that trip up naive parsers:
+reptiles grouped under "Species split from ...:" heading items with citation
+markers and nested lists, and fish list pages grouped by family. Some NA
+fish are on no list page at all, for build_index.py --discover to find
+through the archive's full-text index. Next to the
+archive goes <name>.expected.jsonl, the species_index.jsonl that
+build_index.py should produce from it, which bench.py scores the index against.
+
+Photos are real WebPs reused round-robin from public/images/originals/ (or
+--images DIR), so image stages see realistic sizes without extra dependencies.
+
+Usage:
+    python3 scrape/make_fixture.py --species 10k --out /tmp/fixture.zim
+    ZIM_PATH=/tmp/fixture.zim python3 scrape/build_index.py
+
+bench.py builds (and caches) fixtures itself.
+"""
+
+import argparse
+import random
+import time
+from pathlib import Path
+
+from libzim.writer import Creator, Hint, Item, StringProvider
+
+from build_index import FISH_GLOBAL, FISH_PAGES, MANUAL_ADDITIONS
+from records import IndexEntry, SpeciesType, write_records
+
+SCRAPE_DIR = Path(__file__).resolve().parent
+DEFAULT_IMAGES_DIR = SCRAPE_DIR.parent / "public" / "images" / "originals"
+
+# Bump when the generated content changes, so cached fixtures are rebuilt
+FIXTURE_VERSION = 3
+
+# Same mix as the real index (species_index.jsonl)
+TYPE_SHARES = {"Bird": 0.39, "Fish": 0.24, "Mammal": 0.16, "Reptile": 0.12, "Amphibian": 0.09}
+
+NOUNS = {
+    "Mammal": ["vole", "shrew", "bat", "mouse", "squirrel", "fox", "weasel"],
+    "Bird": ["warbler", "sparrow", "hawk", "owl", "tern", "finch", "wren"],
+    "Reptile": ["skink", "snake", "turtle", "lizard", "anole", "kingsnake"],
+    "Amphibian": ["frog", "toad", "salamander", "newt", "treefrog"],
+    "Fish": ["darter", "shiner", "sculpin", "chub", "minnow", "bass", "sucker"],
+}
+ADJECTIVES = ["Northern", "Southern", "Eastern", "Western", "Spotted", "Lesser",
+              "Greater", "Banded", "Pale", "Dusky"]
+SYLLABLES = ["ba", "ce", "di", "fo", "gu", "ka", "le", "lo", "mi", "no",
+             "pa", "ri", "sa", "te", "vo", "zu"]
+
+# (status, weight) roughly as in extracted.jsonl; None = no status in the infobox
+STATUSES = [("Least Concern", 73), ("Vulnerable", 6), ("Endangered", 6),
+            ("Near Threatened", 6), (None, 4), ("Extinct", 2),
+            ("Data Deficient", 1), ("Secure", 1), ("Critically Endangered", 1)]
+# Infobox class and the lead sentence's "a species of ..." per type
+CLASSES = {"Mammal": ("Mammalia", "mammal"), "Bird": ("Aves", "bird"),
+           "Reptile": ("Reptilia", "reptile"), "Amphibian": ("Amphibia", "amphibian"),
+           "Fish": ("Actinopterygii", "ray-finned fish")}
+NA_RANGES = ["North America", "the eastern United States", "southern Canada",
+             "the Great Lakes basin", "the Gulf of Mexico", "the Mississippi drainage",
+             "the western Atlantic"]
+OTHER_RANGES = ["the Indian Ocean", "southeast Asia", "the Amazon basin",
+                "the Mediterranean Sea", "New Guinea", "the Red Sea"]
+
+FILLER = ("lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod "
+          "tempor incididunt ut labore et dolore magna aliqua").split()
+
+
+def word(i):
+    """Bijective base-16 spelling of i, so every index gets a distinct word."""
+    out = []
+    i += 1
+    while i:
+        i, r = divmod(i - 1, len(SYLLABLES))
+        out.append(SYLLABLES[r])
+    return "".join(reversed(out))
+
+
+def parse_count(text):
+    """'10k' → 10000, '1m' → 1000000, '250' → 250."""
+    text = text.lower().strip()
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * scale)
+
+
+def make_species(i, type_, rng, redirect_share=0.02, image_share=0.95):
+    noun = rng.choice(NOUNS[type_])
+    name = f"{rng.choice(ADJECTIVES)} {word(i).capitalize()} {noun}"
+    genus = word(i // 8).capitalize() + "ia"
+    latin = f"{genus} {word(i)}ensis"
+    status = rng.choices([s for s, _ in STATUSES], [w for _, w in STATUSES])[0]
+    return {
+        "name": name,
+        "latin": latin,
+        "type": type_,
+        "slug": name.replace(" ", "_"),
+        "status": status,
+        "na": True,
+        "valid": True,
+        "image": rng.random() < image_share,
+        "redirect": rng.random() < redirect_share,
+        "author": f"{word(rng.randrange(400)).capitalize()}, {rng.randrange(1758, 2020)}",
+        "listed": True,
+    }
+
+
+def plan_species(total, seed):
+    """Species for each list page, sized so build_index.py finds about `total`."""
+    rng = random.Random(seed)
+    counts = {t: max(1, round(total * share)) for t, share in TYPE_SHARES.items()}
+    # State lists cover ~60% of fish; the global list adds the rest, as many
+    # non-NA candidates again, and a few entries that fail validation. Another
+    # 10% are on no list (only --discover finds them)
+    state_count = round(counts["Fish"] * 0.6)
+    unlisted = round(counts["Fish"] * 0.1)
+    counts["Fish"] = state_count + round(counts["Fish"] * 0.8) + unlisted
+    plan = {}
+    i = 0
+    for type_, count in counts.items():
+        plan[type_] = [make_species(i + k, type_, rng) for k in range(count)]
+        i += count
+
+    fish = plan["Fish"]
+    for k, s in enumerate(fish[state_count:]):
+        s["na"] = k % 2 == 0
+    for s in fish[len(fish) - unlisted:]:
+        s["na"] = True
+        s["listed"] = False
+    for s in fish:
+        s["valid"] = rng.random() >= 0.03
+    for s in plan["Amphibian"]:
+        # Some list entries link by latin name; extract.py recovers the common name
+        if rng.random() < 0.3:
+            s["slug"] = s["latin"].replace(" ", "_")
+    return plan, state_count, rng
+
+
+def filler(rng, words):
+    return " ".join(rng.choice(FILLER) for _ in range(words))
+
+
+def article_html(s, rng, article_kb):
+    range_ = rng.choice(NA_RANGES if s["na"] else OTHER_RANGES)
+    noun = s["name"].split()[-1]
+    rows = [f'<tr><th colspan="2">{s["name"]}</th></tr>']
+    if s["image"]:
+        rows.append(f'<tr><td colspan="2"><img src="../I/{s["slug"]}.jpg.webp" width="220" height="165"></td></tr>')
+    if s["status"]:
+        code = "".join(w[0] for w in s["status"].split()).upper()
+        rows.append(f'<tr><td colspan="2"><img src="../I/Status_iucn3.1_{code}.svg.png"> '
+                    f'{s["status"]} (IUCN 3.1)</td></tr>')
+    class_, kind = CLASSES[s["type"]]
+    rows.append(f'<tr><td>Class:</td><td><a href="{class_}" title="{class_}">{class_}</a></td></tr>')
+    if s["valid"]:
+        rows.append('<tr><th colspan="2">Binomial name</th></tr>')
+        rows.append(f'<tr><td colspan="2"><span class="binomial"><i><b>{s["latin"]}</b></i></span>'
+                    f'<br><small>({s["author"]})</small></td></tr>')
+    else:
+        rows.append('<tr><th colspan="2">Genus</th></tr>')
+
+    paragraphs = [f'<p>The <b>{s["name"].lower()}</b> (<i>{s["latin"]}</i>) is a species of {kind}, '
+                  f'a {noun} native to {range_}. {filler(rng, 30)}.</p>']
+    body = []
+    size = 0
+    while size < article_kb * 1024:
+        p = f"<p>{filler(rng, 120)}.<sup>[{len(body) + 1}]</sup></p>"
+        body.append(p)
+        size += len(p)
+
+    return "".join([
+        f'<html><head><meta charset="utf-8"><title>{s["name"]}</title></head><body>',
+        '<div id="mw-content-text">',
+        f'<table class="infobox biota"><tbody>{"".join(rows)}</tbody></table>',
+        *paragraphs,
+        '<h2 id="Description">Description</h2>',
+        *body,
+        '<h2 id="Distribution">Distribution</h2>',
+        f'<p>It is found in {range_}, {filler(rng, 20)}.</p>',
+        '<h2 id="References">References</h2>',
+        f'<ol><li>{s["author"]}. <a href="https://doi.org/10.0/{s["slug"]}">doi:10.0</a></li></ol>',
+        '</div></body></html>',
+    ])
+
+
+def page(title, items, tag="ul"):
+    return (f'<html><head><title>{title}</title></head><body><div id="mw-content-text">'
+            f'<{tag}>{"".join(items)}</{tag}>'
+            '<h2 id="References">References</h2><ul><li><a href="Help:Citation">cite</a> <i>note</i></li></ul>'
+            '</div></body></html>')
+
+
+# Links every real list page has that the parsers must skip
+NOISE = ['<li><a href="Category:Fauna" title="Category:Fauna">Fauna</a>, <i>X. y</i></li>',
+         '<li><a href="List_of_lists" title="List of lists">Lists</a> (<i>Xus yus</i>)</li>',
+         '<li>Order <a href="Order_(biology)" title="Order">Order</a></li>']
+
+
+def li(s, latin=None):
+    """'<a>Name</a> (<i>Latin</i>)' list item, as on the reptile and fish lists."""
+    return (f'<li><a href="{s["slug"]}" title="{s["name"]}">{s["name"]}</a> '
+            f'(<i>{latin or s["latin"]}</i>)</li>')
+
+
+def split_groups(members, every=12, size=3):
+    """Nest every `every`-th run of `size` items under a heading item naming
+    the species they were split from (the next one in the list), with a
+    citation marker, like the real reptiles page."""
+    items = []
+    for i in range(0, len(members), every):
+        chunk = members[i:i + every]
+        head = chunk[size] if len(chunk) > size else None
+        if head is None:
+            items += [li(s) for s in chunk]
+            continue
+        items.append(f'<li>Species split from the <a href="{head["slug"]}" title="{head["name"]}">'
+                     f'{head["name"].lower()}</a> (<i>{head["latin"]}</i>):'
+                     f'<sup id="cite_ref-{i}" class="reference"><a href="#cite_note-{i}">[{i % 20 + 1}]</a></sup>'
+                     f'<ul>{"".join(li(s) for s in chunk[:size])}</ul></li>')
+        items += [li(s) for s in chunk[size:]]
+    return items
+
+
+def family_groups(members):
+    """Fish grouped under 'Family <a>Xidae</a>' items with nested lists."""
+    families = {}
+    for s in members:
+        families.setdefault(s["latin"].split()[0][:-2] + "idae", []).append(s)
+    return [f'<li>Family <a href="{family}" title="{family}">{family}</a>'
+            f'<ul>{"".join(li(s) for s in fish)}</ul></li>'
+            for family, fish in families.items()]
+
+
+def list_pages(plan, state_count, rng):
+    """{zim path: html} for every page build_index.py reads."""
+    pages = {}
+    mammals = [f'<li><a href="{s["slug"]}" title="{s["name"]}">{s["name"]}</a>, '
+               f'<i>{s["latin"][0]}. {s["latin"].split()[1]}</i></li>' for s in plan["Mammal"]]
+    pages["A/List_of_mammals_of_the_United_States"] = page("List of mammals", NOISE + mammals)
+
+    birds = [f'<li><a href="{s["slug"]}" title="{s["name"]}">{s["name"]}</a>, '
+             f'<i>{s["latin"]}</i></li>' for s in plan["Bird"]]
+    pages["A/List_of_birds_of_the_United_States"] = page("List of birds", NOISE + birds)
+
+    amphibians = [f'<li><i><a href="{s["slug"]}" title="{s["slug"].replace("_", " ")}">{s["latin"]}</a></i> '
+                  f'{s["author"]}</li>' for s in plan["Amphibian"]]
+    pages["A/List_of_amphibians_of_the_United_States"] = page("List of amphibians", NOISE + amphibians)
+
+    reptiles = split_groups(plan["Reptile"])
+    # The real path is a redirect (see redirects())
+    pages["A/Reptiles_of_North_America"] = page("Reptiles of North America", NOISE + reptiles)
+
+    fish = plan["Fish"]
+    by_state = [[] for _ in FISH_PAGES]
+    for s in fish[:state_count]:
+        for state in rng.sample(range(len(FISH_PAGES)), rng.randint(1, 3)):
+            by_state[state].append(s)
+    for n, (path, members) in enumerate(zip(FISH_PAGES, by_state)):
+        if n % 2 == 0:
+            rows = [f'<tr><td><a href="{s["slug"]}" title="{s["name"]}">{s["name"]}</a></td>'
+                    f'<td><i>{s["latin"]}</i></td></tr>' for s in members]
+            html = page(path, ['<table class="wikitable"><tbody><tr><th>Name</th><th>Species</th></tr>',
+                               *rows, '</tbody></table>'], tag="div")
+        elif n % 4 == 1:
+            html = page(path, [li(s) for s in members])
+        else:
+            html = page(path, family_groups(members))
+        pages[path] = html
+
+    # Mostly new candidates, plus some fish the state lists already found
+    listed = [s for s in fish[state_count:] if s["listed"]] + rng.sample(fish[:state_count], state_count // 4)
+    rng.shuffle(listed)
+    pages[FISH_GLOBAL] = page("List of common fish names", NOISE + [
+        f'<li><a href="{s["slug"]}" title="{s["name"]}">{s["name"]}</a> <i>{s["latin"]}</i></li>'
+        for s in listed
+    ])
+    return pages
+
+
+def expected_path(fixture):
+    return Path(fixture).with_suffix(".expected.jsonl")
+
+
+def expected_index(plan, state_count):
+    """The species_index.jsonl entries build_index.py should find: every listed
+    species, and the fish that are on a state list or pass the NA filter,
+    if their article validates."""
+    def entry(s, type_, name=None, latin=None):
+        # Search hits are canonical paths, so unlisted fish are found by the
+        # article a redirect points to
+        slug = s["slug"] + ("_(animal)" if s["redirect"] and not s["listed"] else "")
+        return IndexEntry(name=name or s["name"], latin=latin or s["latin"],
+                          type=type_, wiki_path=f"/wiki/{slug}")
+
+    expected = list(MANUAL_ADDITIONS)
+    for s in plan["Mammal"]:
+        expected.append(entry(s, SpeciesType.MAMMAL, latin=f'{s["latin"][0]}. {s["latin"].split()[1]}'))
+    expected += [entry(s, SpeciesType.BIRD) for s in plan["Bird"]]
+    expected += [entry(s, SpeciesType.AMPHIBIAN, name=s["slug"].replace("_", " "))
+                 for s in plan["Amphibian"]]
+    expected += [entry(s, SpeciesType.REPTILE) for s in plan["Reptile"]]
+    expected += [entry(s, SpeciesType.FISH) for k, s in enumerate(plan["Fish"])
+                 if s["valid"] and (k < state_count or s["na"])]
+    return expected
+
+
+class Entry(Item):
+    def __init__(self, path, title, mimetype, content, front=False):
+        super().__init__()
+        self.path = path
+        self.title = title
+        self.mimetype = mimetype
+        self.content = content
+        self.front = front
+
+    def get_path(self):
+        return self.path
+
+    def get_title(self):
+        return self.title
+
+    def get_mimetype(self):
+        return self.mimetype
+
+    def get_contentprovider(self):
+        return StringProvider(self.content)
+
+    def get_hints(self):
+        return {Hint.FRONT_ARTICLE: self.front}
+
+
+def build_fixture(out, species, seed=1, images_dir=DEFAULT_IMAGES_DIR, article_kb=16):
+    """Write a fixture ZIM to `out`. Returns counts of what went in."""
+    start = time.perf_counter()
+    plan, state_count, rng = plan_species(species, seed)
+    photos = sorted(Path(images_dir).glob("*.webp")) if images_dir else []
+    if not photos:
+        print(f"WARNING: no .webp files in {images_dir}, fixture will have no photos")
+
+    counts = {"articles": 0, "redirects": 0, "images": 0, "list_pages": 0}
+    out = Path(out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.unlink(missing_ok=True)
+    # Full-text indexed like the real dump, for build_index.py --discover
+    creator = Creator(str(out)).config_indexing(True, "eng")
+    with creator:
+        creator.set_mainpath("A/Main_Page")
+        for name, value in [("Title", "Pokédex benchmark fixture"), ("Language", "eng"),
+                            ("Creator", "make_fixture.py"), ("Publisher", "pokedex"),
+                            ("Date", "2024-01-01"), ("Name", f"pokedex_fixture_{species}"),
+                            ("Description", f"{species} synthetic species, seed {seed}")]:
+            creator.add_metadata(name, value)
+
+        creator.add_item(Entry("A/Main_Page", "Main Page", "text/html",
+                               page("Main Page", ["<li>fixture</li>"]), front=True))
+        for path, html in list_pages(plan, state_count, rng).items():
+            creator.add_item(Entry(path, path[2:].replace("_", " "), "text/html", html, front=True))
+            counts["list_pages"] += 1
+        creator.add_redirection("A/List_of_North_American_reptiles", "List of North American reptiles",
+                                "A/Reptiles_of_North_America", {Hint.FRONT_ARTICLE: True})
+
+        everyone = [s for members in plan.values() for s in members]
+        everyone.append(make_species(len(everyone), "Mammal", rng) | {"name": "Elk", "slug": "Elk"})
+        for n, s in enumerate(everyone):
+            target = f'A/{s["slug"]}_(animal)' if s["redirect"] else f'A/{s["slug"]}'
+            creator.add_item(Entry(target, s["name"], "text/html",
+                                   article_html(s, rng, article_kb), front=True))
+            counts["articles"] += 1
+            if s["redirect"]:
+                creator.add_redirection(f'A/{s["slug"]}', s["name"], target, {Hint.FRONT_ARTICLE: True})
+                counts["redirects"] += 1
+            if s["image"] and photos:
+                photo = photos[n % len(photos)]
+                creator.add_item(Entry(f'I/{s["slug"]}.jpg.webp', "", "image/webp", photo.read_bytes()))
+                counts["images"] += 1
+            if (n + 1) % 5000 == 0:
+                print(f"  {n + 1}/{len(everyone)} articles...", flush=True)
+        print("  Finishing archive...", flush=True)
+
+    write_records(expected_path(out), expected_index(plan, state_count))
+    counts["bytes"] = out.stat().st_size
+    counts["seconds"] = round(time.perf_counter() - start, 2)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--species", default="1k", help="target species count, e.g. 1k, 10k, 100k")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", type=Path, required=True)
+    parser.add_argument("--images", type=Path, default=DEFAULT_IMAGES_DIR,
+                        help="directory of .webp photos to reuse")
+    parser.add_argument("--article-kb", type=int, default=16,
+                        help="approximate article body size")
+    args = parser.parse_args()
+
+    species = parse_count(args.species)
+    print(f"Building {species}-species fixture (seed {args.seed}) → {args.out}")
+    counts = build_fixture(args.out, species, args.seed, args.images, args.article_kb)
+    print(f"Wrote {counts['list_pages']} list pages, {counts['articles']} articles "
+          f"({counts['redirects']} behind redirects), {counts['images']} photos; "
+          f"{counts['bytes'] / 1e6:.1f} MB in {counts['seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Tiny placeholders shown while species images load.
+
+Each sprite is averaged down to a PLACEHOLDER_SIZE x PLACEHOLDER_SIZE grid of
+colors, stored as one hex string ("rrggbb" per cell, row by row, 54
+characters). build.py embeds it in species.json and src/lib/placeholders.js
+paints it as the background of the list row's sprite and the card's image
+frame, so something of the right colors shows before the image arrives,
+without another request. The sprite is a crop of the same photo the card's
+photo modes show, so one placeholder serves both.
+
+Sprites are decoded one by one (sprites.py) and averaged in one NumPy batch.
+"""
+
+import numpy as np
+
+from sprites import read_png
+
+# Must match PLACEHOLDER_SIZE in src/lib/placeholders.js
+PLACEHOLDER_SIZE = 3
+
+
+def load_rgba(path):
+    """(H, W, 4) float32 pixels of a PNG sprite."""
+    _, _, rows = read_png(path.read_bytes())
+    return np.array(rows, dtype=np.float32)
+
+
+def _cell_sums(images, n):
+    """Sum (N, H, W, C) images over an n x n grid of near-equal cells."""
+    rows = np.linspace(0, images.shape[1], n + 1).astype(int)[:-1]
+    cols = np.linspace(0, images.shape[2], n + 1).astype(int)[:-1]
+    return np.add.reduceat(np.add.reduceat(images, rows, axis=1), cols, axis=2)
+
+
+def encode(images):
+    """Placeholder strings for a (N, H, W, 4) batch of same-sized RGBA
+    images; None for one that's fully transparent. Colors are alpha-weighted,
+    and a cell with nothing opaque in it takes the whole image's color."""
+    alpha = images[..., 3:] / 255
+    weighted = np.concatenate([images[..., :3] * alpha, alpha], axis=3)
+    cells = _cell_sums(weighted, PLACEHOLDER_SIZE)
+    whole = weighted.sum(axis=(1, 2))[:, None, None, :]
+    cells = np.where(cells[..., 3:] > 0, cells, whole)
+    colors = cells[..., :3] / np.maximum(cells[..., 3:], 1e-9)
+    colors = np.clip(np.rint(colors), 0, 255).astype(np.uint8)
+    opaque = whole[:, 0, 0, 3] > 0
+    return [colors[i].tobytes().hex() if opaque[i] else None for i in range(len(images))]
+
+
+def placeholders(paths):
+    """Placeholder (or None) for each sprite in `paths`, batched by size;
+    None too for one that can't be decoded."""
+    out = [None] * len(paths)
+    by_shape = {}
+    for i, path in enumerate(paths):
+        try:
+            image = load_rgba(path)
+        except ValueError as e:
+            print(f"  {path.name}: {e}")
+            continue
+        by_shape.setdefault(image.shape, []).append((i, image))
+    for batch in by_shape.values():
+        for (i, _), value in zip(batch, encode(np.stack([image for _, image in batch]))):
+            out[i] = value
+    return out
@@ -0,0 +1,256 @@
+"""Gazetteer: enrich.py's free-text `region` → US states and Canadian provinces.
+
+`region` is whatever the LLM wrote ("Southeastern US", "Atlantic coast from
+Maine to Texas", "Kaua'i, Hawai'i", "Not found in North America"). places()
+maps it onto the fixed set of PLACES by matching, most specific first:
+
+  1. Named regions: rivers, mountains, coasts, deserts, "New England", ...
+     ("Ohio River Valley" before "Ohio", "Baja California" to nothing)
+  2. State, province and territory names ("west virginia" before "virginia")
+  3. Directions of the US, Canada or North America ("central and eastern
+     North America"), from the tables in DIRECTIONS
+  4. The US, Canada or North America as a whole
+
+Each match blanks its text so shorter phrases don't match inside it. A
+region that says the species is not found / not native here maps to
+nothing, and a vagrant's continent-wide phrases ("rare vagrant to North
+America") are dropped, so it isn't listed for every state.
+
+Ranges ("from Maine to Texas") count only their end points. This is a
+coarse "could I see it here" filter, not a range map.
+
+build.py stores each species' places as a bitmask (bit i = PLACES[i]) and
+one bitset per place in the search index.
+"""
+
+import re
+
+# Code → name, in bit order (must match PLACES in src/lib/places.js)
+PLACES = {
+    "AL": "Alabama", "AK": "Alaska", "AZ": "Arizona", "AR": "Arkansas", "CA": "California",
+    "CO": "Colorado", "CT": "Connecticut", "DE": "Delaware", "DC": "District of Columbia",
+    "FL": "Florida", "GA": "Georgia", "HI": "Hawaii", "ID": "Idaho", "IL": "Illinois",
+    "IN": "Indiana", "IA": "Iowa", "KS": "Kansas", "KY": "Kentucky", "LA": "Louisiana",
+    "ME": "Maine", "MD": "Maryland", "MA": "Massachusetts", "MI": "Michigan", "MN": "Minnesota",
+    "MS": "Mississippi", "MO": "Missouri", "MT": "Montana", "NE": "Nebraska", "NV": "Nevada",
+    "NH": "New Hampshire", "NJ": "New Jersey", "NM": "New Mexico", "NY": "New York",
+    "NC": "North Carolina", "ND": "North Dakota", "OH": "Ohio", "OK": "Oklahoma", "OR": "Oregon",
+    "PA": "Pennsylvania", "RI": "Rhode Island", "SC": "South Carolina", "SD": "South Dakota",
+    "TN": "Tennessee", "TX": "Texas", "UT": "Utah", "VT": "Vermont", "VA": "Virginia",
+    "WA": "Washington", "WV": "West Virginia", "WI": "Wisconsin", "WY": "Wyoming",
+    "PR": "Puerto Rico", "VI": "US Virgin Islands",
+    "AB": "Alberta", "BC": "British Columbia", "MB": "Manitoba", "NB": "New Brunswick",
+    "NL": "Newfoundland and Labrador", "NS": "Nova Scotia", "NT": "Northwest Territories",
+    "NU": "Nunavut", "ON": "Ontario", "PE": "Prince Edward Island", "QC": "Quebec",
+    "SK": "Saskatchewan", "YT": "Yukon",
+}
+BIT = {code: i for i, code in enumerate(PLACES)}
+
+CANADA = {"AB", "BC", "MB", "NB", "NL", "NS", "NT", "NU", "ON", "PE", "QC", "SK", "YT"}
+US = set(PLACES) - CANADA - {"PR", "VI"}
+CONTIGUOUS = US - {"AK", "HI"}
+NORTH_AMERICA = US - {"HI"} | CANADA
+
+
+def _codes(text):
+    return set(text.split())
+
+
+# Directions of the US and Canada; North America's are derived below
+_US = {
+    "north": _codes("WA ID MT ND MN WI MI NY VT NH ME"),
+    "south": _codes("CA AZ NM TX OK AR LA MS AL GA FL SC NC TN"),
+    "east": _codes("ME NH VT MA RI CT NY NJ PA DE MD DC VA WV NC SC GA FL OH MI IN IL WI KY TN AL MS"),
+    "west": _codes("WA OR CA NV ID MT WY UT CO AZ NM"),
+    "central": _codes("ND SD NE KS OK TX MN IA MO"),
+    "northeast": _codes("ME NH VT MA RI CT NY NJ PA"),
+    "northwest": _codes("WA OR ID MT WY"),
+    "southeast": _codes("AL AR FL GA KY LA MS NC SC TN VA WV"),
+    "southwest": _codes("AZ NM TX OK NV UT CA"),
+    "north central": _codes("ND SD NE KS MN IA MO WI MI IL IN OH"),
+    "south central": _codes("TX OK AR LA"),
+    "midwest": _codes("ND SD NE KS MN IA MO WI MI IL IN OH"),
+    "upper midwest": _codes("MN WI MI IA ND SD"),
+}
+_CANADA = {
+    "north": _codes("YT NT NU"),
+    "south": _codes("BC AB SK MB ON QC NB NS PE"),
+    "east": _codes("ON QC NB NS PE NL"),
+    "west": _codes("BC AB SK MB"),
+    "central": _codes("ON QC"),
+    "northeast": _codes("QC NL NU"),
+    "northwest": _codes("YT NT BC"),
+    "southeast": _codes("ON QC NB NS PE"),
+    "southwest": _codes("BC AB"),
+}
+DIRECTIONS = {
+    "us": _US,
+    "canada": _CANADA,
+    "north america": {
+        **{d: _US.get(d, set()) | _CANADA.get(d, set()) for d in _US.keys() | _CANADA.keys()},
+        "north": {"AK"} | CANADA,
+        "south": _US["south"],
+        "west": _US["west"] | _CANADA["west"] | _codes("AK YT"),
+        "northwest": _US["northwest"] | _codes("AK YT NT BC"),
+        "central": _US["central"] | _codes("MB SK ON"),
+    },
+}
+
+ATLANTIC = _codes("ME NH MA RI CT NY NJ DE MD VA NC SC GA FL NB NS PE NL QC")
+PACIFIC = _codes("WA OR CA AK BC")
+GULF = _codes("TX LA MS AL FL")
+COASTS = ATLANTIC | PACIFIC | GULF
+
+# Named regions, as (regex, codes); matched before the place names, which
+# many of them contain. An empty set just consumes the phrase.
+REGIONS = [
+    (r"baja(?: california)?|gulf of california|sea of cortez|lower california", set()),
+    (r"new mexico", {"NM"}),
+    (r"mexico border", set()),
+    (r"gulf of mexico|gulf coast(?:al)?|gulf states", GULF),
+    (r"gulf of maine", _codes("ME NH MA NB NS")),
+    (r"gulf of alaska|aleutians?|bering(?: sea| strait)?|pribilofs?", {"AK"}),
+    (r"gulf of st lawrence|st lawrence(?: river| seaway)?", _codes("QC ON NY NB NS PE NL")),
+    (r"east of (?:the )?mississippi(?: river)?", _US["east"]),
+    (r"west of (?:the )?mississippi(?: river)?", set()),
+    (r"mississippi (?:river|valley|basin|drainage|delta)\w*", _codes("MN WI IA IL MO KY TN AR MS LA")),
+    (r"missouri river\w*", _codes("MT ND SD NE IA KS MO")),
+    (r"ohio (?:river|valley)\w*", _codes("PA OH WV KY IN IL")),
+    (r"tennessee (?:river|valley)\w*", _codes("TN AL MS KY")),
+    (r"columbia river\w*", _codes("WA OR ID BC")),
+    (r"colorado (?:river|plateau)\w*", _codes("CO UT AZ NV CA NM")),
+    (r"rio grande", _codes("CO NM TX")),
+    (r"red river", _codes("TX OK AR LA")),
+    (r"new england", _codes("ME NH VT MA RI CT")),
+    (r"mid atlantic", _codes("NY NJ PA DE MD VA")),
+    (r"pacific northwest", _codes("WA OR ID BC")),
+    (r"great lakes", _codes("MN WI MI IL IN OH PA NY ON")),
+    (r"great plains|high plains", _codes("MT ND SD NE KS OK TX NM CO WY AB SK MB")),
+    (r"great basin", _codes("NV UT OR ID CA")),
+    (r"(?:canadian )?prairie provinces|canadian prairies", _codes("AB SK MB")),
+    (r"maritimes?(?: provinces)?|atlantic canada|canadian maritimes", _codes("NB NS PE NL")),
+    (r"rock(?:y mountains?|ies)", _codes("MT ID WY CO UT NM AB BC")),
+    (r"appalachian?s?(?: mountains| region)?", _codes("NY PA MD WV VA KY TN NC SC GA AL OH")),
+    (r"sierra nevada", _codes("CA NV")),
+    (r"cascades?(?: range| mountains)?", _codes("WA OR CA BC")),
+    (r"ozarks?(?: plateau| mountains)?", _codes("MO AR OK KS")),
+    (r"ouachita(?: mountains)?", _codes("AR OK")),
+    (r"(?:great )?smoky mountains|blue ridge", _codes("NC TN VA GA")),
+    (r"black hills", _codes("SD WY")),
+    (r"four corners", _codes("AZ NM CO UT")),
+    (r"sky islands", _codes("AZ NM")),
+    (r"mojave(?: desert)?", _codes("CA NV AZ UT")),
+    (r"sonoran desert", _codes("AZ CA")),
+    (r"chihuahuan desert", _codes("TX NM")),
+    (r"delmarva(?: peninsula)?|chesapeake(?: bay)?", _codes("DE MD VA")),
+    (r"(?:florida )?keys|everglades", {"FL"}),
+    (r"cape cod", {"MA"}),
+    (r"cape hatteras|outer banks", {"NC"}),
+    (r"long island", {"NY"}),
+    (r"puget sound", {"WA"}),
+    (r"vancouver island", {"BC"}),
+    (r"channel islands", {"CA"}),
+    (r"hawaiian|kauai|oahu|maui|molokai|lanai|big island", {"HI"}),
+    (r"virgin islands|st (?:croix|thomas|john)", {"VI"}),
+    (r"caribbean|west indies|greater antilles", {"PR"}),
+    (r"labrador|newfoundland", {"NL"}),
+    (r"baffin(?: island)?", {"NU"}),
+    (r"hudson bay", _codes("MB ON QC NU")),
+    (r"dakotas", _codes("ND SD")),
+    (r"carolinas", _codes("NC SC")),
+    (r"(?:sub)?arctic(?: canada| tundra| coast)?", _codes("AK YT NT NU")),
+    (r"west(?:ern)? coastal (?:us|north america)", PACIFIC),
+    (r"east(?:ern)? coastal (?:us|north america)", ATLANTIC),
+    (r"coast(?:al|s)? (?:waters )?(?:of )?(?:the )?(?:us|north america)", COASTS),
+    (r"(?:atlantic|east(?:ern)?) (?:coast|seaboard)\w*|atlantic(?: ocean| waters)?", ATLANTIC),
+    (r"(?:pacific|west) coast\w*|pacific(?: ocean| waters)?", PACIFIC),
+    (r"(?:continental|contiguous|mainland) us|lower 48", CONTIGUOUS),
+]
+
+_DIRECTION = (r"(?:far |extreme |lower )?"
+              r"(?:north central|south central|upper midwest|midwest|central|"
+              r"(?:north|south)(?:east|west)?|east|west)(?:ern)?")
+_DIRECTIONS_RE = re.compile(
+    rf"\b({_DIRECTION}(?:(?:,| and| or| to|/) {_DIRECTION})*) "
+    r"(?:part of |parts of |regions? of |half of )?(?:the )?(us|canada|north america|states)\b")
+_MIDWEST_RE = re.compile(r"\b(upper )?midwest(?:ern)?\b")
+_WHOLE = [
+    (re.compile(r"\bnorth america\b"), NORTH_AMERICA),
+    (re.compile(r"\bus\b"), US),
+    (re.compile(r"\bcanada\b"), CANADA),
+]
+_NOT_HERE_RE = re.compile(r"\bnot (?:found|native|established|present|recorded)\b|\bonly outside\b")
+_VAGRANT_RE = re.compile(r"\bvagrants?\b|\baccidental\b")
+
+
+def _place_patterns():
+    """Place names, longest first, so "west virginia" wins over "virginia"."""
+    names = [(name.lower(), code) for code, name in PLACES.items()]
+    names += [("newfoundland and labrador", "NL"), ("nwt", "NT"), ("yukon territory", "YT"),
+              ("washington dc", "DC"), ("washington d c", "DC"), ("pei", "PE")]
+    names.sort(key=lambda item: -len(item[0]))
+    return [(re.compile(rf"\b{re.escape(name)}\b"), {code}) for name, code in names]
+
+
+_PATTERNS = ([(re.compile(rf"\b(?:{pattern})\b"), codes) for pattern, codes in REGIONS]
+             + _place_patterns())
+
+
+def normalize(text):
+    """Lowercase, without okina, apostrophes and most punctuation, with the
+    United States spelled "us"."""
+    text = re.sub(r"[ʻ'’]", "", text.lower()).replace("québec", "quebec")
+    text = re.sub(r"\bunited states(?: of america)?\b|\bu\.s\.a?\.?|\busa\b", " us ", text)
+    text = re.sub(r"[^a-z0-9,/;() ]+", " ", text)
+    text = re.sub(r"\bmid west", "midwest", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _direction_key(word):
+    """"far southeastern" → "southeast"."""
+    word = re.sub(r"^(?:far|extreme|lower) ", "", word.strip())
+    return word.removesuffix("ern")
+
+
+def places(region):
+    """Set of PLACES codes the free-text `region` covers."""
+    if not region:
+        return set()
+    text = normalize(region)
+    if _NOT_HERE_RE.search(text):
+        return set()
+    vagrant = bool(_VAGRANT_RE.search(text))
+    found = set()
+
+    def take(codes):
+        found.update(codes)
+        return " | "
+
+    def directions(match):
+        area = "us" if match.group(2) == "states" else match.group(2)
+        for word in re.split(r",|/| and | or | to ", match.group(1)):
+            found.update(DIRECTIONS[area].get(_direction_key(word), ()))
+        return " | "
+
+    for pattern, codes in _PATTERNS:
+        text = pattern.sub(lambda m: take(codes), text)
+    text = _DIRECTIONS_RE.sub(directions, text)
+    text = _MIDWEST_RE.sub(lambda m: take(_US["upper midwest" if m.group(1) else "midwest"]), text)
+    if not vagrant:
+        for pattern, codes in _WHOLE:
+            text = pattern.sub(lambda m: take(codes), text)
+    return found
+
+
+def mask(codes):
+    """Bitmask of a set of codes, bit i for PLACES[i], as lowercase hex."""
+    value = 0
+    for code in codes:
+        value |= 1 << BIT[code]
+    return format(value, "x")
+
+
+def unmask(hex_mask):
+    """Codes in a mask(), in PLACES order."""
+    value = int(hex_mask, 16)
+    return [code for code, i in BIT.items() if value >> i & 1]
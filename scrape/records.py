@@ -0,0 +1,164 @@
+"""Species records and newline-delimited JSON for the intermediate files.
+
+IndexEntry (species_index.jsonl) and Extracted (extracted.jsonl) are slotted
+dataclasses with SpeciesType / Status enums, so records are small, attribute
+access replaces string-keyed lookups in the hot loops, and from_dict()
+rejects unknown fields and values: a stage that starts writing a different
+shape fails at the next stage's reader instead of drifting silently.
+to_dict() produces the JSON shapes (and key order) the files already use.
+
+species_index.jsonl and extracted.jsonl hold one record per line, so stages
+can stream them: read_records() yields one record at a time and RecordWriter
+writes each record as soon as it's produced. Nothing needs the whole dataset
+in memory just to pass it to the next stage.
+
+read_records() falls back to the old pretty-printed .json array next to the
+requested path (e.g. species_index.json), so trees that haven't re-run the
+earlier stages keep working. That fallback loads the whole array.
+"""
+
+import json
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+
+
+class SpeciesType(str, Enum):
+    MAMMAL = "Mammal"
+    BIRD = "Bird"
+    REPTILE = "Reptile"
+    AMPHIBIAN = "Amphibian"
+    FISH = "Fish"
+
+
+class Status(str, Enum):
+    """IUCN status as written by extract.py (which title-cases the match)."""
+    LEAST_CONCERN = "Least Concern"
+    NEAR_THREATENED = "Near Threatened"
+    VULNERABLE = "Vulnerable"
+    ENDANGERED = "Endangered"
+    CRITICALLY_ENDANGERED = "Critically Endangered"
+    EXTINCT_IN_THE_WILD = "Extinct In The Wild"
+    EXTINCT = "Extinct"
+    DATA_DEFICIENT = "Data Deficient"
+    SECURE = "Secure"
+
+
+def _check_fields(cls, d):
+    extra = d.keys() - cls.FIELDS
+    if extra:
+        raise ValueError(f"{cls.__name__}: unexpected fields {sorted(extra)} in {d}")
+
+
+@dataclass(slots=True)
+class IndexEntry:
+    """One species_index.jsonl record, as found on a Wikipedia list page."""
+    name: str
+    latin: str
+    type: SpeciesType
+    wiki_path: str
+    # Never filled in yet, but part of the file format
+    family: str = ""
+    distribution: str = ""
+
+    FIELDS = frozenset(["name", "latin", "family", "type", "distribution", "wiki_path"])
+
+    @classmethod
+    def from_dict(cls, d):
+        _check_fields(cls, d)
+        return cls(d["name"], d["latin"], SpeciesType(d["type"]), d["wiki_path"],
+                   d.get("family", ""), d.get("distribution", ""))
+
+    def to_dict(self):
+        return {"name": self.name, "latin": self.latin, "family": self.family,
+                "type": self.type.value, "distribution": self.distribution,
+                "wiki_path": self.wiki_path}
+
+
+@dataclass(slots=True)
+class Extracted:
+    """One extracted.jsonl record: the index entry after article parsing."""
+    name: str
+    species: str
+    type: SpeciesType
+    wiki_path: str
+    conservation_status: Status | None = None
+
+    FIELDS = frozenset(["name", "species", "type", "wiki_path", "conservation_status"])
+
+    @classmethod
+    def from_dict(cls, d):
+        _check_fields(cls, d)
+        status = d.get("conservation_status")
+        return cls(d["name"], d["species"], SpeciesType(d["type"]), d["wiki_path"],
+                   Status(status) if status else None)
+
+    def to_dict(self):
+        return {"name": self.name, "species": self.species, "type": self.type.value,
+                "wiki_path": self.wiki_path,
+                "conservation_status": self.conservation_status and self.conservation_status.value}
+
+
+def _legacy(path):
+    return path.with_suffix(".json")
+
+
+def read_records(path, record=None):
+    """Yield the records of a .jsonl file (or its legacy .json array), as
+    dicts or, given a record class, via record.from_dict()."""
+    path = Path(path)
+    load = record.from_dict if record else (lambda d: d)
+    if not path.exists() and _legacy(path).exists():
+        for d in json.loads(_legacy(path).read_text()):
+            yield load(d)
+        return
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield load(json.loads(line))
+
+
+def count_records(path):
+    """Number of records, without parsing them (for progress totals)."""
+    path = Path(path)
+    if not path.exists() and _legacy(path).exists():
+        return len(json.loads(_legacy(path).read_text()))
+    if not path.exists():
+        return 0
+    with open(path) as f:
+        return sum(1 for line in f if line.strip())
+
+
+class RecordWriter:
+    """Write records one per line to a temp file, renamed over `path` only if
+    the with-block finishes, so a crashed run never leaves a truncated file."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.tmp = self.path.with_name(self.path.name + ".tmp")
+        self.count = 0
+
+    def __enter__(self):
+        self.file = open(self.tmp, "w")
+        return self
+
+    def write(self, record):
+        if not isinstance(record, dict):
+            record = record.to_dict()
+        self.file.write(json.dumps(record) + "\n")
+        self.count += 1
+
+    def __exit__(self, exc_type, exc, tb):
+        self.file.close()
+        if exc_type is None:
+            self.tmp.replace(self.path)
+        else:
+            self.tmp.unlink(missing_ok=True)
+
+
+def write_records(path, records):
+    """Write an iterable of dicts or records; returns how many were written."""
+    with RecordWriter(path) as out:
+        for record in records:
+            out.write(record)
+    return out.count
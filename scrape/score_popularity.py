@@ -16,8 +16,12 @@ from pathlib import Path
 
 import anthropic
 
+import instrument
+from instrument import span
+from records import read_records
+
 SCRAPE_DIR = Path(__file__).resolve().parent
-INDEX_PATH = SCRAPE_DIR / "species_index.json"
+INDEX_PATH = SCRAPE_DIR / "species_index.jsonl"
 OUTPUT_PATH = SCRAPE_DIR / "popularity_scores.json"
 
 BATCH_SIZE = 200
@@ -39,11 +43,14 @@ Animals:
 
 def score_batch(client, names):
     names_text = "\n".join(f"- {n}" for n in names)
-    resp = client.messages.create(
-        model=MODEL,
-        max_tokens=4096,
-        messages=[{"role": "user", "content": PROMPT + names_text}],
-    )
+    with span("llm call"):
+        resp = client.messages.create(
+            model=MODEL,
+            max_tokens=4096,
+            messages=[{"role": "user", "content": PROMPT + names_text}],
+        )
+    instrument.count("input tokens", resp.usage.input_tokens)
+    instrument.count("output tokens", resp.usage.output_tokens)
     text = resp.content[0].text.strip()
     # Strip markdown code fence if present
     if text.startswith("```"):
@@ -57,6 +64,7 @@ def main():
     parser.add_argument("--limit", type=int, default=0)
     args = parser.parse_args()
 
+    instrument.start("score_popularity")
     api_key = os.environ.get("ANTHROPIC_API_KEY") or os.environ.get("PERSONAL_ANTHROPIC_API_KEY")
     if not api_key:
         from dotenv import load_dotenv
@@ -65,19 +73,21 @@ def main():
 
     client = anthropic.Anthropic(api_key=api_key)
 
-    with open(INDEX_PATH) as f:
-        species = json.load(f)
-
     cache = {}
     if OUTPUT_PATH.exists():
         cache = json.loads(OUTPUT_PATH.read_text())
 
     # Build list of species still needing scores
-    todo = [(s["wiki_path"], s["name"]) for s in species if s["wiki_path"] not in cache]
+    total = 0
+    todo = []
+    for s in read_records(INDEX_PATH):
+        total += 1
+        if s["wiki_path"] not in cache:
+            todo.append((s["wiki_path"], s["name"]))
     if args.limit:
         todo = todo[:args.limit]
 
-    print(f"Total species: {len(species)}, cached: {len(cache)}, to score: {len(todo)}")
+    print(f"Total species: {total}, cached: {len(cache)}, to score: {len(todo)}")
 
     for batch_start in range(0, len(todo), BATCH_SIZE):
         batch = todo[batch_start:batch_start + BATCH_SIZE]
@@ -87,6 +97,7 @@ def main():
         try:
             scores = score_batch(client, names)
         except Exception as e:
+            instrument.count("batch errors")
             print(f"  Batch error: {e}")
             time.sleep(2)
             continue
@@ -98,8 +109,11 @@ def main():
                 cache[wp] = int(score)
                 matched += 1
 
-        OUTPUT_PATH.write_text(json.dumps(cache, indent=2))
-        print(f"[{len(cache)}/{len(species)}] Batch scored {matched}/{len(batch)}")
+        with span("cache write"):
+            OUTPUT_PATH.write_text(json.dumps(cache, indent=2))
+        instrument.items(matched)
+        instrument.count("unmatched names", len(batch) - matched)
+        print(f"[{len(cache)}/{total}] Batch scored {matched}/{len(batch)}")
 
     OUTPUT_PATH.write_text(json.dumps(cache, indent=2))
     print(f"\nDone. Wrote {len(cache)} entries to {OUTPUT_PATH}")
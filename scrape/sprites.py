@@ -0,0 +1,322 @@
+"""Lossless recompression of the pixel-art sprites.
+
+extract_images.py has ImageMagick write each sprite at its native 64x64 as a
+palette PNG (<= 32 colors); the app scales it up with
+`image-rendering: pixelated`. ImageMagick's PNG encoder doesn't try very hard,
+so this pass re-encodes every sprite with the smallest bit depth its palette
+allows (4 bits for up to 16 colors), no ancillary chunks, and the best of a
+few filter / zlib strategy combinations. The decoded pixels are checked
+against the input before anything is replaced.
+
+Sprites from before the switch were nearest-neighbor upscaled to 256x256, so
+each 4x4 block is one pixel. Those are shrunk back to 64x64 exactly; a PNG
+that isn't an exact upscale keeps its size and is only recompressed.
+
+Only what sprites use is supported: 8-bit grayscale / RGB(A) and 1-8 bit
+palette images, not interlaced.
+
+    python3 scrape/sprites.py                          # scrape/images/*.png
+    python3 scrape/sprites.py public/images/animals --workers 8
+"""
+
+import argparse
+import os
+import struct
+import zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import instrument
+from instrument import span
+
+SCRAPE_DIR = Path(__file__).resolve().parent
+SPRITE_DIR = SCRAPE_DIR / "images"
+SPRITE_SIZE = 64
+
+SIGNATURE = b"\x89PNG\r\n\x1a\n"
+CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+# (level, memLevel, strategy) for each compression attempt
+ZLIB_SETTINGS = [(9, 9, zlib.Z_DEFAULT_STRATEGY), (9, 9, zlib.Z_FILTERED), (9, 9, zlib.Z_RLE)]
+CLEAR = (0, 0, 0, 0)
+
+
+# ---------------------------------------------------------------------------
+# Decoding
+# ---------------------------------------------------------------------------
+def _paeth(a, b, c):
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    return b if pb <= pc else c
+
+
+def _unfilter(kind, line, prev, bpp):
+    if kind == 0:
+        return line
+    out = bytearray(line)
+    if kind == 1:
+        for i in range(bpp, len(out)):
+            out[i] = (out[i] + out[i - bpp]) & 0xFF
+    elif kind == 2:
+        for i in range(len(out)):
+            out[i] = (out[i] + prev[i]) & 0xFF
+    elif kind == 3:
+        for i in range(len(out)):
+            left = out[i - bpp] if i >= bpp else 0
+            out[i] = (out[i] + ((left + prev[i]) >> 1)) & 0xFF
+    elif kind == 4:
+        for i in range(len(out)):
+            left = out[i - bpp] if i >= bpp else 0
+            up_left = prev[i - bpp] if i >= bpp else 0
+            out[i] = (out[i] + _paeth(left, prev[i], up_left)) & 0xFF
+    else:
+        raise ValueError(f"bad PNG filter type {kind}")
+    return bytes(out)
+
+
+def _unpack(line, depth, width):
+    """Sample values of one unfiltered scanline of 1/2/4/8-bit samples."""
+    if depth == 8:
+        return line
+    mask = (1 << depth) - 1
+    shifts = range(8 - depth, -1, -depth)
+    return [(byte >> s) & mask for byte in line for s in shifts][:width]
+
+
+def read_png(data):
+    """(width, height, rows) of a PNG, each row a list of RGBA tuples.
+    Fully transparent pixels all come back as CLEAR."""
+    if data[:8] != SIGNATURE:
+        raise ValueError("not a PNG")
+    pos, header, palette, trns, idat = 8, None, None, None, []
+    while pos < len(data):
+        length, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        body = data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+        if kind == b"IHDR":
+            header = struct.unpack(">IIBBBBB", body)
+        elif kind == b"PLTE":
+            palette = [tuple(body[i:i + 3]) for i in range(0, len(body), 3)]
+        elif kind == b"tRNS":
+            trns = body
+        elif kind == b"IDAT":
+            idat.append(body)
+        elif kind == b"IEND":
+            break
+    width, height, depth, color, _, _, interlace = header
+    if interlace or color not in CHANNELS or (color != 3 and depth != 8):
+        raise ValueError(f"unsupported PNG (color type {color}, depth {depth}, interlace {interlace})")
+
+    if color == 3:
+        alpha = list(trns or b"") + [255] * (len(palette) - len(trns or b""))
+        colors = [(*rgb, a) if a else CLEAR for rgb, a in zip(palette, alpha)]
+    key = None
+    if trns and color in (0, 2):
+        key = tuple(struct.unpack(f">{CHANNELS[color]}H", trns))
+
+    channels = CHANNELS[color]
+    bpp = max(1, depth * channels // 8)
+    stride = (width * depth * channels + 7) // 8
+    raw = zlib.decompress(b"".join(idat))
+    rows, prev = [], bytes(stride)
+    for y in range(height):
+        start = y * (stride + 1)
+        line = _unfilter(raw[start], raw[start + 1:start + 1 + stride], prev, bpp)
+        prev = line
+        if color == 3:
+            rows.append([colors[i] for i in _unpack(line, depth, width)])
+            continue
+        samples = [tuple(line[x:x + channels]) for x in range(0, len(line), channels)]
+        if color == 0:
+            row = [(v, v, v, 0 if key == (v,) else 255) for (v,) in samples]
+        elif color == 2:
+            row = [(*s, 0 if key == s else 255) for s in samples]
+        elif color == 4:
+            row = [(v, v, v, a) for v, a in samples]
+        else:
+            row = samples
+        rows.append([p if p[3] else CLEAR for p in row])
+    return width, height, rows
+
+
+# ---------------------------------------------------------------------------
+# Encoding
+# ---------------------------------------------------------------------------
+def _chunk(kind, body):
+    return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+
+def _pack(indices, depth):
+    if depth == 8:
+        return bytes(indices)
+    per_byte = 8 // depth
+    indices = list(indices) + [0] * (-len(indices) % per_byte)
+    out = bytearray()
+    for i in range(0, len(indices), per_byte):
+        byte = 0
+        for value in indices[i:i + per_byte]:
+            byte = (byte << depth) | value
+        out.append(byte)
+    return bytes(out)
+
+
+def _filter(kind, line, prev):
+    """Filter one scanline (bpp is 1 for palette images)."""
+    if kind == 0:
+        return line
+    out = bytearray(len(line))
+    for i, x in enumerate(line):
+        left = line[i - 1] if i else 0
+        up_left = prev[i - 1] if i else 0
+        if kind == 1:
+            pred = left
+        elif kind == 2:
+            pred = prev[i]
+        elif kind == 3:
+            pred = (left + prev[i]) >> 1
+        else:
+            pred = _paeth(left, prev[i], up_left)
+        out[i] = (x - pred) & 0xFF
+    return bytes(out)
+
+
+def _filtered(lines, adaptive):
+    """Scanlines with filter bytes: all filter 0, or per line the filter with
+    the smallest sum of absolute differences (libpng's heuristic)."""
+    out, prev = bytearray(), bytes(len(lines[0]))
+    for line in lines:
+        kind, best = 0, line
+        if adaptive:
+            cost = lambda data: sum(b if b < 128 else 256 - b for b in data)
+            kind, best = min(((k, _filter(k, line, prev)) for k in range(5)),
+                             key=lambda pair: cost(pair[1]))
+        out.append(kind)
+        out += best
+        prev = line
+    return bytes(out)
+
+
+def write_png(width, height, rows):
+    """Smallest palette PNG we can produce for `rows` (RGBA tuples, <= 256
+    colors): minimal bit depth, transparent entries first so tRNS stays short."""
+    counts = Counter(p for row in rows for p in row)
+    if len(counts) > 256:
+        raise ValueError(f"{len(counts)} colors won't fit a palette")
+    palette = sorted(counts, key=lambda p: (p[3] == 255, -counts[p], p))
+    index = {p: i for i, p in enumerate(palette)}
+    depth = next(d for d in (1, 2, 4, 8) if len(palette) <= 1 << d)
+    lines = [_pack([index[p] for p in row], depth) for row in rows]
+
+    idat = None
+    for adaptive in (False, True):
+        data = _filtered(lines, adaptive)
+        for level, mem_level, strategy in ZLIB_SETTINGS:
+            z = zlib.compressobj(level, zlib.DEFLATED, 15, mem_level, strategy)
+            packed = z.compress(data) + z.flush()
+            if idat is None or len(packed) < len(idat):
+                idat = packed
+
+    alpha = bytes(p[3] for p in palette if p[3] != 255)
+    return b"".join([
+        SIGNATURE,
+        _chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, depth, 3, 0, 0, 0)),
+        _chunk(b"PLTE", b"".join(bytes(p[:3]) for p in palette)),
+        _chunk(b"tRNS", alpha) if alpha else b"",
+        _chunk(b"IDAT", idat),
+        _chunk(b"IEND", b""),
+    ])
+
+
+# ---------------------------------------------------------------------------
+# Sprites
+# ---------------------------------------------------------------------------
+def downscale(width, height, rows, size=SPRITE_SIZE):
+    """Undo a nearest-neighbor upscale to `size` pixels wide. Returns the
+    input unchanged unless every factor x factor block is a single color."""
+    factor = width // size
+    if factor <= 1 or width != size * factor or height % factor:
+        return width, height, rows
+    small = []
+    for y in range(0, height, factor):
+        row = rows[y]
+        if any(rows[y + dy] != row for dy in range(1, factor)):
+            return width, height, rows
+        pixels = row[::factor]
+        if [p for p in pixels for _ in range(factor)] != row:
+            return width, height, rows
+        small.append(pixels)
+    return size, height // factor, small
+
+
+def optimize(path, size=SPRITE_SIZE):
+    """Re-encode the sprite at `path` in place if that makes it smaller (or
+    it was an upscale). Returns (bytes before, bytes after, width after)."""
+    path = Path(path)
+    data = path.read_bytes()
+    width, height, rows = read_png(data)
+    new_width, new_height, new_rows = downscale(width, height, rows, size)
+    out = write_png(new_width, new_height, new_rows)
+    if read_png(out) != (new_width, new_height, new_rows):
+        raise ValueError(f"{path.name}: re-encoded pixels differ")
+    if len(out) < len(data) or new_width != width:
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(out)
+        tmp.replace(path)
+        return len(data), len(out), new_width
+    return len(data), len(data), width
+
+
+def _optimize_one(path):
+    try:
+        return optimize(path)
+    except ValueError as e:
+        print(f"  {Path(path).name}: {e}", flush=True)
+        return None
+
+
+def optimize_all(paths, workers=1):
+    """optimize() every path on a process pool; returns the non-failed results."""
+    paths = [str(p) for p in paths]
+    # Spans inside workers aren't collected, so time the pool as a whole
+    with span("sprite optimize"):
+        if workers <= 1 or len(paths) < 2:
+            results = map(_optimize_one, paths)
+            return [r for r in results if r]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return [r for r in pool.map(_optimize_one, paths, chunksize=32) if r]
+
+
+def report(results, failed=0):
+    """Print and count the before/after totals of an optimize_all() run."""
+    before = sum(r[0] for r in results)
+    after = sum(r[1] for r in results)
+    native = sum(1 for r in results if r[2] <= SPRITE_SIZE)
+    saved = 1 - after / before if before else 0
+    print(f"Sprites: {len(results)} optimized ({native} at {SPRITE_SIZE}x{SPRITE_SIZE}, "
+          f"{failed} skipped): {before / 1024:.0f} KB → {after / 1024:.0f} KB ({saved:.0%} smaller)")
+    for name, value in [("sprite bytes before", before), ("sprite bytes after", after),
+                        ("sprites skipped", failed)]:
+        instrument.count(name, value)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("paths", nargs="*", type=Path, default=[SPRITE_DIR],
+                        help="PNG files or directories of them (default: scrape/images)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="processes to re-encode on (1 = serial)")
+    args = parser.parse_args()
+
+    instrument.start("sprites")
+    paths = []
+    for path in args.paths:
+        paths.extend(sorted(path.glob("*.png")) if path.is_dir() else [path])
+    results = optimize_all(paths, args.workers)
+    instrument.items(len(results))
+    report(results, len(paths) - len(results))
+
+
+if __name__ == "__main__":
+    main()
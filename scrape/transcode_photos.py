@@ -0,0 +1,165 @@
+"""Transcode the raw ZIM originals into responsive AVIF and WebP photos.
+
+Reads scrape/originals/{wiki_slug}.webp (written by extract_originals.py) and
+writes each photo at up to len(PHOTO_WIDTHS) widths in both formats, for the
+card's <picture> srcset. Widths are capped at the source's own width: the
+ZIM's photos are thumbnails (median 220px), so most species get 160px plus
+their native width, and nothing is upscaled.
+
+Each photo is one job on a thread pool (--workers, default: CPU count). The
+work happens in ImageMagick, so threads are enough. Photos whose outputs are
+all newer than their source are skipped, and so are originals that
+dedupe_images.py found to be byte-identical to another species' (build.py
+points those species at the other one's photo).
+
+Output: scrape/photos/{wiki_slug}-{width}.{avif,webp}
+        scrape/photo_widths.json      (wiki_slug → widths, for build.py)
+"""
+
+import argparse
+import json
+import os
+import struct
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import instrument
+from instrument import span
+
+SCRAPE_DIR = Path(__file__).resolve().parent
+ORIGINALS_DIR = SCRAPE_DIR / "originals"
+PHOTOS_DIR = SCRAPE_DIR / "photos"
+WIDTHS_PATH = SCRAPE_DIR / "photo_widths.json"
+DUPES_PATH = SCRAPE_DIR / "image_dupes.json"
+
+PHOTO_WIDTHS = (160, 320, 640)
+# Format → ImageMagick quality (must match PHOTO_FORMATS in src/lib/photos.js)
+PHOTO_FORMATS = {"avif": 50, "webp": 75}
+
+
+def image_width(data):
+    """Pixel width from the header of a WebP, PNG, GIF or JPEG (the ZIM
+    stores a few non-WebP photos under .webp names), or None."""
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        chunk = data[12:16]
+        if chunk == b"VP8 ":
+            return struct.unpack("<H", data[26:28])[0] & 0x3FFF
+        if chunk == b"VP8L":
+            return (int.from_bytes(data[21:25], "little") & 0x3FFF) + 1
+        if chunk == b"VP8X":
+            return int.from_bytes(data[24:27], "little") + 1
+    elif data[:8] == b"\x89PNG\r\n\x1a\n":
+        return struct.unpack(">I", data[16:20])[0]
+    elif data[:4] == b"GIF8":
+        return struct.unpack("<H", data[6:8])[0]
+    elif data[:2] == b"\xff\xd8":
+        pos = 2
+        while pos + 9 < len(data) and data[pos] == 0xFF:
+            marker = data[pos + 1]
+            length = struct.unpack(">H", data[pos + 2:pos + 4])[0]
+            # SOF0-15, minus DHT / JPG / DAC
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                return struct.unpack(">H", data[pos + 7:pos + 9])[0]
+            pos += 2 + length
+    return None
+
+
+def photo_widths(source_width):
+    """Widths to produce for a source `source_width` pixels wide."""
+    widths = [w for w in PHOTO_WIDTHS if w < source_width]
+    if source_width <= PHOTO_WIDTHS[-1]:
+        widths.append(source_width)
+    return widths
+
+
+def output_path(slug, width, fmt):
+    return PHOTOS_DIR / f"{slug}-{width}.{fmt}"
+
+
+def transcode(source, slug, widths):
+    """Write every width and format of one photo; returns how many files."""
+    data = source.read_bytes()
+    for width in widths:
+        for fmt, quality in PHOTO_FORMATS.items():
+            subprocess.run([
+                "convert", "-",
+                # Keep only the first frame of the odd animated GIF
+                "-delete", "1--1",
+                "-resize", f"{width}x>",
+                "-strip",
+                "-quality", str(quality),
+                f"{fmt}:{output_path(slug, width, fmt)}",
+            ], input=data, check=True, capture_output=True)
+    return len(widths) * len(PHOTO_FORMATS)
+
+
+def is_current(source, slug, widths):
+    mtime = source.stat().st_mtime
+    for width in widths:
+        for fmt in PHOTO_FORMATS:
+            out = output_path(slug, width, fmt)
+            if not out.exists() or out.stat().st_mtime < mtime:
+                return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="photos transcoded at once")
+    args = parser.parse_args()
+
+    instrument.start("transcode_photos")
+    PHOTOS_DIR.mkdir(exist_ok=True)
+    sources = sorted(ORIGINALS_DIR.glob("*.webp"))
+    duplicates = {}
+    if DUPES_PATH.exists():
+        duplicates = json.loads(DUPES_PATH.read_text())["originals"]
+    manifest = {}
+    todo = []
+    unreadable = 0
+    with span("plan"):
+        for source in sources:
+            if source.stem in duplicates:
+                continue
+            with open(source, "rb") as f:
+                width = image_width(f.read(64 * 1024))
+            if not width:
+                unreadable += 1
+                continue
+            slug = source.name.removesuffix(".webp")
+            manifest[slug] = photo_widths(width)
+            if not is_current(source, slug, manifest[slug]):
+                todo.append((source, slug, manifest[slug]))
+
+    print(f"Transcoding {len(todo)} of {len(manifest)} photos on {args.workers} workers...", flush=True)
+    files = 0
+    errors = 0
+    # Spans inside worker threads would overlap, so time the pool as a whole
+    with span("transcode"), ThreadPoolExecutor(max_workers=args.workers) as pool:
+        jobs = [pool.submit(transcode, *job) for job in todo]
+        for i, ((source, slug, widths), job) in enumerate(zip(todo, jobs), 1):
+            try:
+                files += job.result()
+                instrument.items()
+            except subprocess.CalledProcessError as e:
+                errors += 1
+                del manifest[slug]
+                print(f"  {slug} -- convert failed: {e.stderr[:200]}")
+            if i % 100 == 0:
+                print(f"  {i}/{len(todo)}...", flush=True)
+
+    with span("write"):
+        WIDTHS_PATH.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+
+    print(f"\nDone: {len(todo) - errors} transcoded ({files} files), "
+          f"{len(manifest) - len(todo) + errors} up to date, {len(duplicates)} duplicates, "
+          f"{unreadable} unreadable, {errors} errors")
+    for name, value in [("files written", files), ("up to date", len(manifest) - len(todo) + errors),
+                        ("duplicates", len(duplicates)), ("unreadable", unreadable), ("convert errors", errors)]:
+        instrument.count(name, value)
+
+
+if __name__ == "__main__":
+    main()
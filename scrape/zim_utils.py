@@ -1,11 +1,39 @@
-"""Shared ZIM reader helper. Opens the archive once and provides lookup functions."""
+"""Shared ZIM reader helper. Opens the archive once and provides lookup functions.
 
+Lookups go through a title index (scrape/title_index.sqlite, gitignored)
+built once per archive from every entry's path and title. It maps each path
+to the id of the entry it finally redirects to, and each normalized title or
+slug ("elk", "red-tailed hawk") to the same ids. resolve() therefore handles
+any spelling of a path (A/ prefix or /wiki/, percent-encoded or not, spaces
+or underscores) with a single indexed query instead of a chain of failing
+archive lookups, and resolve(..., fuzzy=True) also ignores case and accents.
+The index is rebuilt automatically when the archive changes; on the full
+dump that takes a few minutes.
+"""
+
+import os
+import sqlite3
+import unicodedata
 from pathlib import Path
+from urllib.parse import unquote
 from libzim.reader import Archive
+from libzim.search import Query, Searcher
+
+from instrument import span
+
+# ZIM_PATH in the environment overrides the dump (e.g. a fixture from make_fixture.py)
+ZIM_PATH = Path(os.environ.get("ZIM_PATH")
+                or Path(__file__).resolve().parent.parent / "wikipedia_en_all_maxi_2024-01.zim")
+TITLE_INDEX_PATH = Path(os.environ.get("TITLE_INDEX_PATH")
+                        or Path(__file__).resolve().parent / "title_index.sqlite")
 
-ZIM_PATH = Path(__file__).resolve().parent.parent / "wikipedia_en_all_maxi_2024-01.zim"
+# Bump when the index layout or normalize() changes
+TITLE_INDEX_VERSION = 1
+# Redirect chains longer than this are treated as broken
+MAX_REDIRECTS = 8
 
 _archive = None
+_index = None
 
 def _get_archive():
     global _archive
@@ -14,24 +42,192 @@ def _get_archive():
     return _archive
 
 
-def read_article(path):
-    """Read an article by path (e.g. 'A/Largemouth_bass'). Follows redirects.
-    Returns HTML string or None if not found."""
+def reopen_archive():
+    """Drop an inherited archive handle so a forked worker process opens its own."""
+    global _archive, _index
+    _archive = None
+    _index = None
+
+
+def archive_id():
+    """Identify the opened archive so per-path caches can tell when the dump changed."""
+    zim = _get_archive()
+    if zim.has_checksum:
+        return zim.checksum
+    return f"{zim.filesize}:{zim.entry_count}"
+
+
+# ---------------------------------------------------------------------------
+# Title index
+# ---------------------------------------------------------------------------
+def unquote_all(text):
+    """Percent-decode until stable (ZIM paths in HTML are often double-encoded)."""
+    prev = None
+    while text != prev:
+        prev, text = text, unquote(text)
+    return text
+
+
+def normalize(name):
+    """Fuzzy key for a title or slug: decoded, no namespace or /wiki/,
+    underscores as spaces, accents stripped, casefolded."""
+    name = unquote_all(name).removeprefix("/wiki/")
+    if name[1:2] == "/":
+        name = name[2:]
+    name = unicodedata.normalize("NFKD", name.replace("_", " "))
+    name = "".join(c for c in name if not unicodedata.combining(c))
+    return " ".join(name.casefold().split())
+
+
+def _final_entry(entry):
+    for _ in range(MAX_REDIRECTS):
+        if not entry.is_redirect:
+            return entry
+        entry = entry.get_redirect_entry()
+    return None
+
+
+def _index_rows(zim):
+    """(path, fuzzy keys, target id) for every entry; only articles get keys."""
+    for i in range(zim.entry_count):
+        entry = zim._get_entry_by_id(i)
+        target = _final_entry(entry)
+        if target is not None:
+            path = entry.path
+            keys = ()
+            if path.startswith("A/"):
+                keys = {normalize(path), normalize(entry.title or "")} - {""}
+            yield path, keys, target._index
+        if (i + 1) % 1_000_000 == 0:
+            print(f"  title index: {i + 1}/{zim.entry_count} entries...", flush=True)
+
+
+def build_title_index(path=None):
+    """Write the title index for the current archive (to a temp file, renamed
+    into place when complete)."""
+    path = Path(path or TITLE_INDEX_PATH)
     zim = _get_archive()
-    try:
-        entry = zim.get_entry_by_path(path)
-        if entry.is_redirect:
-            entry = entry.get_redirect_entry()
-        return entry.get_item().content.tobytes().decode()
-    except KeyError:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.unlink(missing_ok=True)
+    print(f"Building title index for {zim.entry_count} entries → {path.name}", flush=True)
+    db = sqlite3.connect(tmp)
+    with span("title index"):
+        db.executescript("""
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            CREATE TABLE meta (name TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE paths (path TEXT PRIMARY KEY, id INTEGER) WITHOUT ROWID;
+            CREATE TABLE keys (key TEXT, id INTEGER);
+        """)
+        paths, keys = [], []
+        for entry_path, entry_keys, target in _index_rows(zim):
+            paths.append((entry_path, target))
+            keys.extend((key, target) for key in entry_keys)
+            if len(paths) >= 100_000:
+                db.executemany("INSERT INTO paths VALUES (?, ?)", paths)
+                paths.clear()
+            if len(keys) >= 100_000:
+                db.executemany("INSERT INTO keys VALUES (?, ?)", keys)
+                keys.clear()
+        db.executemany("INSERT INTO paths VALUES (?, ?)", paths)
+        db.executemany("INSERT INTO keys VALUES (?, ?)", keys)
+        db.execute("CREATE INDEX keys_key ON keys (key)")
+        db.executemany("INSERT INTO meta VALUES (?, ?)",
+                       [("archive", archive_id()), ("version", str(TITLE_INDEX_VERSION))])
+        db.commit()
+    db.close()
+    tmp.replace(path)
+
+
+def _title_index():
+    global _index
+    if _index is None:
+        current = (archive_id(), str(TITLE_INDEX_VERSION))
+        if TITLE_INDEX_PATH.exists():
+            db = sqlite3.connect(f"file:{TITLE_INDEX_PATH}?mode=ro", uri=True)
+            meta = dict(db.execute("SELECT name, value FROM meta"))
+            if (meta.get("archive"), meta.get("version")) == current:
+                _index = db
+                return _index
+            db.close()
+        build_title_index()
+        _index = sqlite3.connect(f"file:{TITLE_INDEX_PATH}?mode=ro", uri=True)
+    return _index
+
+
+def _path_variants(name):
+    """Exact spellings to try for a path, title or /wiki/ link, in order."""
+    if name.startswith("/wiki/"):
+        name = "A/" + name[6:]
+    elif name[1:2] != "/":
+        name = "A/" + name
+    # Image srcs are encoded once more than their ZIM path (%252C for %2C),
+    # links to articles may be encoded or not
+    decoded = unquote_all(name)
+    variants = [name, unquote(name), decoded, decoded.replace(" ", "_")]
+    return list(dict.fromkeys(variants))
+
+
+def resolve_id(name, fuzzy=False):
+    """Id of the entry `name` refers to after following redirects, or None.
+    With fuzzy=True, falls back to a case- and accent-insensitive title match
+    (only if it's unambiguous)."""
+    db = _title_index()
+    with span("title lookup"):
+        for variant in _path_variants(name):
+            row = db.execute("SELECT id FROM paths WHERE path = ?", (variant,)).fetchone()
+            if row:
+                return row[0]
+        if fuzzy:
+            ids = {row[0] for row in db.execute("SELECT id FROM keys WHERE key = ?", (normalize(name),))}
+            if len(ids) == 1:
+                return ids.pop()
+    return None
+
+
+def resolve(name, fuzzy=False):
+    """Canonical ZIM path (redirects followed) for any spelling of `name`:
+    'A/Largemouth_bass', '/wiki/Largemouth%20bass', 'largemouth bass'
+    (fuzzy), ... Returns None if nothing matches."""
+    entry_id = resolve_id(name, fuzzy)
+    return None if entry_id is None else _get_archive()._get_entry_by_id(entry_id).path
+
+
+def read_entry(name, fuzzy=False):
+    """Content of the entry `name` resolves to, or None, as a read-only
+    memoryview over libzim's decompressed blob: nothing is copied. bytes
+    regexes, Path.write_bytes() and subprocess input take it as is; decode
+    with str(view, "utf-8") only where text is needed."""
+    entry_id = resolve_id(name, fuzzy)
+    if entry_id is None:
         return None
+    with span("zim read"):
+        return _get_archive()._get_entry_by_id(entry_id).get_item().content
+
+
+def read_article(path):
+    """Read an article by path (e.g. 'A/Largemouth_bass'), in any spelling
+    resolve() accepts. Follows redirects. Returns HTML string or None if not found."""
+    content = read_entry(path)
+    # Straight from the view to str, without a bytes copy in between
+    return None if content is None else str(content, "utf-8")
 
 
 def article_exists(path):
     """Check if an article exists in the ZIM archive."""
+    return resolve_id(path) is not None
+
+
+def has_fulltext_index():
+    return _get_archive().has_fulltext_index
+
+
+def search(query, limit):
+    """Paths of up to `limit` articles matching `query` in the archive's
+    full-text (Xapian) index, best first, redirects resolved. Xapian syntax
+    applies, e.g. '"native to North America" fish'."""
     zim = _get_archive()
-    try:
-        zim.get_entry_by_path(path)
-        return True
-    except KeyError:
-        return False
+    with span("search"):
+        results = Searcher(zim).search(Query().set_query(query))
+        paths = list(results.getResults(0, min(limit, results.getEstimatedMatches())))
+    return [p for p in dict.fromkeys(resolve(path) for path in paths) if p]
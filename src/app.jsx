@@ -4,15 +4,15 @@ import { SpeciesList } from "./components/species-list.jsx";
 import { SpeciesCard } from "./components/species-card.jsx";
 import { Settings } from "./components/settings.jsx";
 import { SightingLog } from "./components/sighting-log.jsx";
-import { useSpecies } from "./hooks/use-species.js";
+import { speciesById, useSpecies } from "./hooks/use-species.js";
 import { useLog } from "./hooks/use-log.js";
 
 export function App() {
   const { log, toggleSeen, setNote, setDate, clearLog, restoreLog } = useLog();
   const {
-    filtered, types, statuses, search, setSearch,
+    filtered, types, statuses, places, search, setSearch,
     typeFilter, setTypeFilter, statusFilter, setStatusFilter,
-    seenFilter, setSeenFilter, STATUS_CODES,
+    placeFilter, setPlaceFilter, seenFilter, setSeenFilter, STATUS_CODES,
   } = useSpecies(log);
   const [selected, setSelected] = useState(null);
   const [page, setPage] = useState("list");
@@ -20,7 +20,8 @@ export function App() {
   const scrollY = useRef(0);
 
   const handleSelect = (s) => {
-    scrollY.current = window.scrollY;
+    // From a card's similar species, keep the list's scroll position
+    if (!selected) scrollY.current = window.scrollY;
     history.pushState({ speciesId: s.id }, "");
     setSelected(s);
     window.scrollTo(0, 0);
@@ -47,9 +48,10 @@ export function App() {
   useEffect(() => {
     const onPopState = (e) => {
       const state = e.state || {};
-      setSelected(null);
+      const species = state.speciesId ? speciesById(state.speciesId) : null;
+      setSelected(species || null);
       setPage(state.page || "list");
-      requestAnimationFrame(() => window.scrollTo(0, scrollY.current));
+      requestAnimationFrame(() => window.scrollTo(0, species ? 0 : scrollY.current));
     };
     window.addEventListener("popstate", onPopState);
     return () => window.removeEventListener("popstate", onPopState);
@@ -62,6 +64,7 @@ export function App() {
           species={filtered}
           types={types}
           statuses={statuses}
+          places={places}
           statusCodes={STATUS_CODES}
           search={search}
           onSearch={setSearch}
@@ -69,6 +72,8 @@ export function App() {
           onTypeFilter={setTypeFilter}
           statusFilter={statusFilter}
           onStatusFilter={setStatusFilter}
+          placeFilter={placeFilter}
+          onPlaceFilter={setPlaceFilter}
           seenFilter={seenFilter}
           onSeenFilter={setSeenFilter}
           onSelect={handleSelect}
@@ -87,6 +92,8 @@ export function App() {
           onBack={handleBack}
           preferOriginal={preferOriginal}
           onToggleImageMode={() => setPreferOriginal((p) => !p)}
+          similar={(selected.similar || []).map(speciesById).filter(Boolean)}
+          onSelect={handleSelect}
         />
       )}
       {page === "log" && (
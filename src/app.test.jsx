@@ -8,6 +8,7 @@ vi.mock("./data/species.json", () => ({
       region: "Northwest", habitat: "Forest", conservation_status: "Least Concern",
       stats: { size: 90, speed: 60, rarity: 40, danger: 85 },
       image: "images/animals/Grizzly_bear.png",
+      similar: ["Bald_eagle", "Gone_species"],
     },
     {
       id: "Bald_eagle", name: "Bald Eagle", species: "Haliaeetus leucocephalus", type: "Bird",
@@ -59,6 +60,17 @@ describe("App", () => {
     expect(getByText("Grizzly Bear")).toBeVisible();
   });
 
+  it("opens a similar species and goes back to the first card", () => {
+    const { container, getByText } = render(<App />);
+    fireEvent.click(getByText("Grizzly Bear"));
+    const similar = container.querySelectorAll(".scard__similar-entry");
+    expect(similar).toHaveLength(1);
+    fireEvent.click(similar[0]);
+    expect(getByText("#0002")).toBeInTheDocument();
+    act(() => window.dispatchEvent(new PopStateEvent("popstate", { state: { speciesId: "Grizzly_bear" } })));
+    expect(getByText("#0001")).toBeInTheDocument();
+  });
+
   it("returns to list via popstate from settings", () => {
     const { getByTitle, getByText, queryByText } = render(<App />);
     fireEvent.click(getByTitle("Settings"));
@@ -1,6 +1,52 @@
-import { useState, useRef } from "preact/hooks";
+import { useState, useRef, useEffect } from "preact/hooks";
+import species from "../data/species.json";
+import {
+  offlineSupported, offlineUrls, offlinePackCount, onOfflineProgress,
+  startOfflineDownload, cancelOfflineDownload, removeOfflinePack,
+} from "../lib/offline-pack.js";
 import "./settings.css";
 
+const BASE = import.meta.env.BASE_URL;
+
+function OfflineSection() {
+  const [progress, setProgress] = useState(null);
+  const [saved, setSaved] = useState(0);
+
+  useEffect(() => onOfflineProgress((p) => {
+    setProgress(p);
+    if (!p) offlinePackCount().then(setSaved);
+  }), []);
+
+  const handleRemove = async () => {
+    await removeOfflinePack();
+    setSaved(0);
+  };
+
+  return (
+    <div class="settings__section">
+      <h3 class="settings__label">OFFLINE</h3>
+      {progress ? (
+        <div class="settings__actions">
+          <p class="settings__msg">DOWNLOADING {progress.done}/{progress.total}</p>
+          <button class="settings__btn" onClick={cancelOfflineDownload}>CANCEL</button>
+        </div>
+      ) : (
+        <div class="settings__actions">
+          <button class="settings__btn" onClick={() => startOfflineDownload(offlineUrls(species, BASE))}>
+            DOWNLOAD ALL FOR OFFLINE
+          </button>
+          {saved > 0 && (
+            <button class="settings__btn settings__btn--danger" onClick={handleRemove}>
+              REMOVE OFFLINE FILES
+            </button>
+          )}
+          {saved > 0 && <p class="settings__msg">{saved} FILES SAVED</p>}
+        </div>
+      )}
+    </div>
+  );
+}
+
 export function Settings({ onBack, onClearData, log, onRestore }) {
   const [confirming, setConfirming] = useState(false);
   const [restoreMsg, setRestoreMsg] = useState("");
@@ -80,6 +126,7 @@ export function Settings({ onBack, onClearData, log, onRestore }) {
           </div>
         )}
       </div>
+      {offlineSupported() && <OfflineSection />}
     </div>
   );
 }
@@ -1,4 +1,6 @@
 import { useEffect, useState } from "preact/hooks";
+import { PHOTO_FORMATS, PHOTO_SIZES, photoFallbackUrl, photoSrcset } from "../lib/photos.js";
+import { placeholderStyle } from "../lib/placeholders.js";
 import "./species-card.css";
 
 const BASE = import.meta.env.BASE_URL;
@@ -27,38 +29,80 @@ function StatBar({ label, value }) {
   );
 }
 
-export function SpeciesCard({ species, entry, onToggleSeen, onSetNote, onSetDate, onBack, preferOriginal, onToggleImageMode }) {
+function SimilarSpecies({ similar, onSelect }) {
+  return (
+    <div class="scard__similar">
+      <span class="scard__info-label">SIMILAR</span>
+      <ul class="scard__similar-list">
+        {similar.map((s) => (
+          <li key={s.id} class="scard__similar-entry" onClick={() => onSelect(s)}>
+            <img
+              class="scard__similar-sprite"
+              src={`${BASE}${s.image}`}
+              alt=""
+              loading="lazy"
+              style={placeholderStyle(s)}
+            />
+            <span class="scard__similar-num">#{String(s.number).padStart(4, "0")}</span>
+            <span class="scard__similar-name">{s.name}</span>
+          </li>
+        ))}
+      </ul>
+    </div>
+  );
+}
+
+export function SpeciesCard({
+  species, entry, onToggleSeen, onSetNote, onSetDate, onBack, preferOriginal, onToggleImageMode,
+  similar = [], onSelect,
+}) {
   const [imgErr, setImgErr] = useState(false);
-  // "sprite" | "original" | "fallback"
+  // "sprite" | "photo" | "original" | "fallback"
   const [imgMode, setImgMode] = useState("sprite");
 
-  const hasAnyOriginal = species.original_image || species.fallback_image;
+  const hasAnyOriginal = species.photo || species.original_image || species.fallback_image;
 
   useEffect(() => {
     setImgErr(false);
     if (preferOriginal && hasAnyOriginal) {
-      setImgMode(species.original_image ? "original" : "fallback");
+      setImgMode(species.photo ? "photo" : species.original_image ? "original" : "fallback");
     } else {
       setImgMode("sprite");
     }
   }, [species.id, preferOriginal]);
 
+  // Warm the cache for the toggle. Local responsive photos are small and the
+  // browser picks their size and format itself, so they aren't preloaded (and
+  // neither are the originals behind them).
   useEffect(() => {
+    if (species.photo) return;
     if (species.original_image) new Image().src = species.original_image;
     if (species.fallback_image) new Image().src = `${BASE}${species.fallback_image}`;
-  }, [species.original_image, species.fallback_image]);
+  }, [species.photo, species.original_image, species.fallback_image]);
 
   const imgSrc =
+    imgMode === "photo" ? photoFallbackUrl(species.photo, BASE) :
     imgMode === "original" ? species.original_image :
     imgMode === "fallback" ? `${BASE}${species.fallback_image}` :
     `${BASE}${species.image}`;
 
   const onImgError = () => {
-    if (imgMode === "original" && species.fallback_image) setImgMode("fallback");
-    else if (imgMode === "original" || imgMode === "fallback") setImgMode("sprite");
+    if (imgMode === "photo" && species.original_image) setImgMode("original");
+    else if ((imgMode === "photo" || imgMode === "original") && species.fallback_image) setImgMode("fallback");
+    else if (imgMode !== "sprite") setImgMode("sprite");
     else setImgErr(true);
   };
 
+  const img = (
+    <img
+      class={imgMode === "sprite" ? "scard__sprite" : undefined}
+      src={imgSrc}
+      alt={species.name}
+      onError={onImgError}
+      loading="lazy"
+    />
+  );
+
   const toggleImage = () => {
     if (!hasAnyOriginal) return;
     onToggleImageMode();
@@ -88,16 +132,24 @@ export function SpeciesCard({ species, entry, onToggleSeen, onSetNote, onSetDate
       <div
         class={`scard__image-frame${!imgErr && hasAnyOriginal ? " scard__image-frame--clickable" : ""}`}
         onClick={() => !imgErr && toggleImage()}
+        style={imgErr ? undefined : placeholderStyle(species)}
       >
         {imgErr ? (
           <div class="scard__placeholder">?</div>
+        ) : imgMode === "photo" ? (
+          <picture>
+            {PHOTO_FORMATS.map((format) => (
+              <source
+                key={format}
+                type={`image/${format}`}
+                srcset={photoSrcset(species.photo, format, BASE)}
+                sizes={PHOTO_SIZES}
+              />
+            ))}
+            {img}
+          </picture>
         ) : (
-          <img
-            src={imgSrc}
-            alt={species.name}
-            onError={onImgError}
-            loading="lazy"
-          />
+          img
         )}
       </div>
 
@@ -152,6 +204,8 @@ export function SpeciesCard({ species, entry, onToggleSeen, onSetNote, onSetDate
           <StatBar key={key} label={STAT_LABELS[key]} value={val} />
         ))}
       </div>
+
+      {similar.length > 0 && onSelect && <SimilarSpecies similar={similar} onSelect={onSelect} />}
     </div>
   );
 }
@@ -11,6 +11,8 @@ const BASE_SPECIES = {
   wiki_url: "https://en.wikipedia.org/wiki/Grizzly_bear",
 };
 
+const PHOTO = { path: "images/photos/Grizzly_bear", widths: [160, 220] };
+
 const UNSEEN_ENTRY = { seen: false, note: "", date: "" };
 const SEEN_ENTRY = { seen: true, note: "Big one!", date: "2025-07-04" };
 
@@ -44,6 +46,12 @@ describe("SpeciesCard", () => {
       expect(img.getAttribute("src")).toBe("https://upload.wikimedia.org/007.jpg");
     });
 
+    it("renders sprites pixelated but not photos", () => {
+      expect(renderCard().container.querySelector("img")).toHaveClass("scard__sprite");
+      const { container } = renderCard({}, UNSEEN_ENTRY, { preferOriginal: true });
+      expect(container.querySelector("img")).not.toHaveClass("scard__sprite");
+    });
+
     it("calls onToggleImageMode on click", () => {
       const { container, props } = renderCard();
       fireEvent.click(container.querySelector(".scard__image-frame"));
@@ -70,6 +78,31 @@ describe("SpeciesCard", () => {
       expect(container.querySelector(".scard__placeholder").textContent).toBe("?");
     });
 
+    it("prefers local responsive photos, avif first", () => {
+      const { container } = renderCard({ photo: PHOTO }, UNSEEN_ENTRY, { preferOriginal: true });
+      const sources = container.querySelectorAll("picture source");
+      expect([...sources].map((s) => s.getAttribute("type"))).toEqual(["image/avif", "image/webp"]);
+      expect(sources[0].getAttribute("srcset")).toBe(
+        "/images/photos/Grizzly_bear-160.avif 160w, /images/photos/Grizzly_bear-220.avif 220w",
+      );
+      expect(container.querySelector("picture img").getAttribute("src")).toBe("/images/photos/Grizzly_bear-220.webp");
+    });
+
+    it("falls back from photo to original_image", () => {
+      const { container } = renderCard({ photo: PHOTO }, UNSEEN_ENTRY, { preferOriginal: true });
+      fireEvent.error(container.querySelector("img"));
+      expect(container.querySelector("picture")).not.toBeInTheDocument();
+      expect(container.querySelector("img").getAttribute("src")).toBe("https://upload.wikimedia.org/007.jpg");
+    });
+
+    it("paints the placeholder in the image frame until an image fails", () => {
+      const { container } = renderCard({ placeholder: "336699".repeat(9) });
+      const frame = container.querySelector(".scard__image-frame");
+      expect(frame.style.getPropertyValue("--placeholder")).toContain("#336699 0% 33.33%");
+      fireEvent.error(container.querySelector("img"));
+      expect(frame.style.getPropertyValue("--placeholder")).toBe("");
+    });
+
     it("does not toggle for species without original_image", () => {
       const { container } = renderCard({ original_image: undefined, fallback_image: undefined });
       const imgBefore = container.querySelector("img").getAttribute("src");
@@ -120,6 +153,27 @@ describe("SpeciesCard", () => {
     });
   });
 
+  describe("similar species", () => {
+    const SIMILAR = [
+      { id: "Polar_bear", number: 12, name: "Polar Bear", image: "images/animals/Polar_bear.png" },
+      { id: "Black_bear", number: 30, name: "Black Bear", image: "images/animals/Black_bear.png" },
+    ];
+
+    it("lists similar species and selects one on click", () => {
+      const onSelect = vi.fn();
+      const { container, getByText } = renderCard({}, UNSEEN_ENTRY, { similar: SIMILAR, onSelect });
+      expect(container.querySelectorAll(".scard__similar-entry")).toHaveLength(2);
+      expect(getByText("#0012")).toBeInTheDocument();
+      fireEvent.click(getByText("Black Bear"));
+      expect(onSelect).toHaveBeenCalledWith(SIMILAR[1]);
+    });
+
+    it("hides the section without similar species", () => {
+      const { queryByText } = renderCard({}, UNSEEN_ENTRY, { onSelect: vi.fn() });
+      expect(queryByText("SIMILAR")).not.toBeInTheDocument();
+    });
+  });
+
   describe("info rendering", () => {
     it("shows conservation status when present", () => {
       const { getByText } = renderCard();
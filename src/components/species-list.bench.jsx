@@ -0,0 +1,45 @@
+import { bench, describe } from "vitest";
+import { render, cleanup, act } from "@testing-library/preact";
+import { SpeciesList } from "./species-list.jsx";
+
+// Run with `npm run bench`. Row counts are part of each bench name so they show
+// up next to the timings.
+
+const TYPES = ["Mammal", "Bird", "Reptile", "Amphibian", "Fish"];
+const SPECIES = Array.from({ length: 3300 }, (_, i) => ({
+  id: `Species_${i}`, number: i + 1, name: `Species ${i}`, type: TYPES[i % TYPES.length],
+  conservation_status: "Least Concern", image: `images/animals/Species_${i}.png`,
+}));
+const BIRDS = SPECIES.filter((s) => s.type === "Bird");
+
+const noop = () => {};
+const props = (species) => ({
+  species, types: TYPES, statuses: ["LC"], statusCodes: { "Least Concern": "LC" },
+  search: "", onSearch: noop, typeFilter: "", onTypeFilter: noop,
+  statusFilter: "", onStatusFilter: noop, seenFilter: "", onSeenFilter: noop,
+  onSelect: noop, onSettings: noop, onLog: noop, log: {},
+});
+
+function rowsMounted(species) {
+  const { container } = render(<SpeciesList {...props(species)} />);
+  const rows = container.querySelectorAll(".slist__entry").length;
+  cleanup();
+  return rows;
+}
+
+const mountRows = rowsMounted(SPECIES);
+const filterRows = rowsMounted(BIRDS);
+
+describe("SpeciesList", () => {
+  bench(`mount ${SPECIES.length} species (${mountRows} rows rendered)`, () => {
+    render(<SpeciesList {...props(SPECIES)} />);
+    cleanup();
+  });
+
+  bench(`filter change ${SPECIES.length} → ${BIRDS.length} (${filterRows} rows rendered)`, () => {
+    const { rerender } = render(<SpeciesList {...props(SPECIES)} />);
+    act(() => rerender(<SpeciesList {...props(BIRDS)} />));
+    act(() => rerender(<SpeciesList {...props(SPECIES)} />));
+    cleanup();
+  });
+});
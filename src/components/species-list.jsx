@@ -1,9 +1,61 @@
+import { useCallback, useEffect, useLayoutEffect, useRef, useState } from "preact/hooks";
+import { placeholderStyle } from "../lib/placeholders.js";
+import { PLACE_NAMES } from "../lib/places.js";
 import "./species-list.css";
 
+const BASE = import.meta.env.BASE_URL;
+// Rows are single-line and fixed height; this is only used until the first row is measured
+const ROW_HEIGHT = 37;
+const OVERSCAN = 10;
+
+// [first, last) rows of a window-scrolled list that intersect the viewport,
+// padded by OVERSCAN rows on each side.
+function useVisibleRange(listRef, count) {
+  const [rowHeight, setRowHeight] = useState(ROW_HEIGHT);
+  const [range, setRange] = useState(() => [0, Math.ceil(window.innerHeight / ROW_HEIGHT) + OVERSCAN]);
+
+  const update = useCallback(() => {
+    const el = listRef.current;
+    if (!el) return;
+    const rect = el.getBoundingClientRect();
+    // Zero height means the list is hidden behind another page; keep the old range
+    if (!rect.height) return;
+    const first = Math.max(0, Math.floor(-rect.top / rowHeight) - OVERSCAN);
+    const last = Math.min(count, Math.ceil((window.innerHeight - rect.top) / rowHeight) + OVERSCAN);
+    setRange((r) => (r[0] === first && r[1] === last ? r : [first, last]));
+  }, [count, rowHeight]);
+
+  useLayoutEffect(() => {
+    const row = listRef.current?.querySelector(".slist__entry");
+    if (row?.offsetHeight && row.offsetHeight !== rowHeight) setRowHeight(row.offsetHeight);
+    update();
+  });
+
+  useEffect(() => {
+    let frame = 0;
+    const onScroll = () => {
+      if (!frame) frame = requestAnimationFrame(() => {
+        frame = 0;
+        update();
+      });
+    };
+    window.addEventListener("scroll", onScroll, { passive: true });
+    window.addEventListener("resize", onScroll);
+    return () => {
+      window.removeEventListener("scroll", onScroll);
+      window.removeEventListener("resize", onScroll);
+      cancelAnimationFrame(frame);
+    };
+  }, [update]);
+
+  return { first: Math.min(range[0], count), last: Math.min(range[1], count), rowHeight };
+}
+
 export function SpeciesList({
   species,
   types,
   statuses,
+  places = [],
   statusCodes,
   search,
   onSearch,
@@ -11,6 +63,8 @@ export function SpeciesList({
   onTypeFilter,
   statusFilter,
   onStatusFilter,
+  placeFilter = "",
+  onPlaceFilter,
   seenFilter,
   onSeenFilter,
   onSelect,
@@ -18,6 +72,9 @@ export function SpeciesList({
   onLog,
   log,
 }) {
+  const listRef = useRef(null);
+  const { first, last, rowHeight } = useVisibleRange(listRef, species.length);
+
   return (
     <div class="slist">
       <div class="slist__controls">
@@ -112,10 +169,42 @@ export function SpeciesList({
             </button>
           ))}
         </div>
+        {places.length > 0 && (
+          <div class="slist__filters">
+            <select
+              class={`slist__filter slist__place ${placeFilter ? "slist__filter--active" : ""}`}
+              value={placeFilter}
+              onChange={(e) => onPlaceFilter(e.target.value)}
+              title="Found in"
+            >
+              <option value="">ANYWHERE</option>
+              {places.map((code) => (
+                <option key={code} value={code}>
+                  {PLACE_NAMES[code].toUpperCase()}
+                </option>
+              ))}
+            </select>
+          </div>
+        )}
       </div>
-      <ul class="slist__entries">
-        {species.map((s) => (
+      <ul
+        ref={listRef}
+        class="slist__entries"
+        style={{ paddingTop: first * rowHeight, paddingBottom: (species.length - last) * rowHeight }}
+      >
+        {species.slice(first, last).map((s) => (
           <li key={s.id} class="slist__entry" onClick={() => onSelect(s)}>
+            {s.image && (
+              <img
+                class="slist__sprite"
+                src={`${BASE}${s.image}`}
+                style={placeholderStyle(s)}
+                alt=""
+                loading="lazy"
+                decoding="async"
+                onError={(e) => (e.currentTarget.style.visibility = "hidden")}
+              />
+            )}
             {log[s.id]?.seen && <span class="slist__seen" title="Seen!">*</span>}
             <span class="slist__num">
               {String(s.number).padStart(4, "0")}
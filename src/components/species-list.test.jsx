@@ -26,6 +26,7 @@ function renderList(overrides = {}) {
     species: SPECIES,
     types: ["Bird", "Mammal", "Reptile"],
     statuses: ["LC", "VU"],
+    places: ["AK", "WA"],
     statusCodes: STATUS_CODES,
     search: "",
     onSearch: vi.fn(),
@@ -33,6 +34,8 @@ function renderList(overrides = {}) {
     onTypeFilter: vi.fn(),
     statusFilter: "",
     onStatusFilter: vi.fn(),
+    placeFilter: "",
+    onPlaceFilter: vi.fn(),
     seenFilter: "",
     onSeenFilter: vi.fn(),
     onSelect: vi.fn(),
@@ -65,6 +68,64 @@ describe("SpeciesList", () => {
     });
   });
 
+  describe("windowing", () => {
+    const MANY = Array.from({ length: 500 }, (_, i) => ({
+      id: `Species_${i}`, number: i + 1, name: `Species ${i}`, type: "Fish",
+      image: `images/animals/Species_${i}.png`,
+    }));
+
+    afterEach(() => vi.unstubAllGlobals());
+
+    it("only mounts rows near the viewport", () => {
+      const { container, getByText, queryByText } = renderList({ species: MANY });
+      const rows = container.querySelectorAll(".slist__entry");
+      expect(rows.length).toBeGreaterThan(0);
+      expect(rows.length).toBeLessThan(100);
+      expect(getByText("Species 0")).toBeInTheDocument();
+      expect(queryByText("Species 499")).not.toBeInTheDocument();
+    });
+
+    it("pads the list to its full height", () => {
+      const { container } = renderList({ species: MANY });
+      const list = container.querySelector(".slist__entries");
+      const rows = container.querySelectorAll(".slist__entry").length;
+      expect(parseInt(list.style.paddingBottom)).toBe((500 - rows) * 37);
+    });
+
+    it("moves the window on scroll", () => {
+      vi.stubGlobal("requestAnimationFrame", (cb) => { cb(0); return 1; });
+      const { container, getByText, queryByText } = renderList({ species: MANY });
+      const list = container.querySelector(".slist__entries");
+      list.getBoundingClientRect = () => ({ top: -200 * 37, height: 500 * 37 });
+      fireEvent.scroll(window);
+      expect(getByText("Species 200")).toBeInTheDocument();
+      expect(queryByText("Species 0")).not.toBeInTheDocument();
+      expect(parseInt(list.style.paddingTop)).toBe(190 * 37);
+    });
+
+    it("keeps the window while the list is hidden", () => {
+      vi.stubGlobal("requestAnimationFrame", (cb) => { cb(0); return 1; });
+      const { container, getByText } = renderList({ species: MANY });
+      container.querySelector(".slist__entries").getBoundingClientRect = () => ({ top: 0, height: 0 });
+      fireEvent.scroll(window);
+      expect(getByText("Species 0")).toBeInTheDocument();
+    });
+
+    it("renders lazy sprites for mounted rows", () => {
+      const { container } = renderList({ species: MANY });
+      const img = container.querySelector(".slist__sprite");
+      expect(img.getAttribute("src")).toBe("/images/animals/Species_0.png");
+      expect(img.getAttribute("loading")).toBe("lazy");
+    });
+
+    it("paints each sprite's placeholder behind it", () => {
+      const species = [{ ...MANY[0], placeholder: "336699".repeat(9) }, MANY[1]];
+      const [first, second] = renderList({ species }).container.querySelectorAll(".slist__sprite");
+      expect(first.style.getPropertyValue("--placeholder")).toContain("#336699 0% 33.33%");
+      expect(second.style.getPropertyValue("--placeholder")).toBe("");
+    });
+  });
+
   describe("indicators", () => {
     it("shows * for seen species", () => {
       const { container } = renderList({ log: { Grizzly_bear: { seen: true } } });
@@ -122,6 +183,19 @@ describe("SpeciesList", () => {
       fireEvent.click(vuBtn);
       expect(props.onStatusFilter).toHaveBeenCalledWith("VU");
     });
+
+    it("lists places by name and calls onPlaceFilter", () => {
+      const { container, props } = renderList();
+      const select = container.querySelector(".slist__place");
+      expect([...select.options].map((o) => o.textContent)).toEqual(["ANYWHERE", "ALASKA", "WASHINGTON"]);
+      fireEvent.change(select, { target: { value: "WA" } });
+      expect(props.onPlaceFilter).toHaveBeenCalledWith("WA");
+    });
+
+    it("hides the place filter when no species has places", () => {
+      const { container } = renderList({ places: [] });
+      expect(container.querySelector(".slist__place")).not.toBeInTheDocument();
+    });
   });
 
   describe("buttons", () => {
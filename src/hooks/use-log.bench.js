@@ -0,0 +1,39 @@
+import { bench, describe } from "vitest";
+import { renderHook, act } from "@testing-library/preact";
+import { LEGACY_KEY, idbLogStore } from "../lib/log-store.js";
+import { useLog } from "./use-log.js";
+
+// Run with `npm run bench`. Each bench loads a saved log of ENTRIES sightings
+// and types a KEYSTROKES-character note. jsdom has no IndexedDB, so useLog
+// runs on its localStorage fallback there; the IndexedDB bench runs where it
+// exists.
+
+const ENTRIES = 5000;
+const NOTE = "spotted near the river bend at dusk";
+const KEYSTROKES = 20;
+const LOG = Object.fromEntries(Array.from({ length: ENTRIES }, (_, i) => [
+  `Species_${i}`, { seen: true, note: NOTE, date: "2025-06-01" },
+]));
+
+describe(`sighting log, ${ENTRIES} entries, ${KEYSTROKES} keystrokes`, () => {
+  bench("whole log to localStorage per keystroke (before)", () => {
+    localStorage.setItem(LEGACY_KEY, JSON.stringify(LOG));
+    let log = JSON.parse(localStorage.getItem(LEGACY_KEY));
+    for (let k = 1; k <= KEYSTROKES; k++) {
+      log = { ...log, Species_0: { ...log.Species_0, note: NOTE.slice(0, k) } };
+      localStorage.setItem(LEGACY_KEY, JSON.stringify(log));
+    }
+  });
+
+  bench("useLog, debounced note write", () => {
+    localStorage.setItem(LEGACY_KEY, JSON.stringify(LOG));
+    const { result, unmount } = renderHook(() => useLog());
+    for (let k = 1; k <= KEYSTROKES; k++) act(() => result.current.setNote("Species_0", NOTE.slice(0, k)));
+    unmount();
+  });
+
+  bench.skipIf(!globalThis.indexedDB)("IndexedDB, one entry per keystroke", async () => {
+    const store = idbLogStore(globalThis.indexedDB);
+    for (let k = 1; k <= KEYSTROKES; k++) await store.put("Species_0", { ...LOG.Species_0, note: NOTE.slice(0, k) });
+  });
+});
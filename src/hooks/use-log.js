@@ -1,60 +1,108 @@
-import { useState, useCallback } from "preact/hooks";
+import { useState, useCallback, useEffect, useMemo, useRef } from "preact/hooks";
+import { createLogStore } from "../lib/log-store.js";
 
-const KEY = "wilddex-log";
+// Note edits are written once typing pauses this long (ms), or when the
+// page is hidden or the hook unmounts
+export const NOTE_DELAY = 500;
 
-function load() {
-  try {
-    return JSON.parse(localStorage.getItem(KEY)) || {};
-  } catch {
-    return {};
-  }
-}
-
-function save(log) {
-  localStorage.setItem(KEY, JSON.stringify(log));
-}
+const EMPTY = { seen: false, note: "", date: "" };
 
 export function useLog() {
-  const [log, setLog] = useState(load);
+  const store = useMemo(createLogStore, []);
+  const [log, setLog] = useState(() => store.peek());
+  const pending = useRef(new Map());
+  const timer = useRef(0);
+  // Ids changed before store.load() resolved, or null after a bulk change
+  const touched = useRef(new Set());
+
+  const flush = useCallback(() => {
+    clearTimeout(timer.current);
+    for (const [id, entry] of pending.current) store.put(id, entry);
+    pending.current.clear();
+  }, [store]);
+
+  const write = useCallback((id, entry, debounce) => {
+    touched.current?.add(id);
+    if (debounce) {
+      pending.current.set(id, entry);
+      clearTimeout(timer.current);
+      timer.current = setTimeout(flush, NOTE_DELAY);
+    } else {
+      pending.current.delete(id);
+      store.put(id, entry);
+    }
+  }, [store, flush]);
+
+  useEffect(() => {
+    store.load().then((stored) => {
+      if (stored) {
+        setLog((prev) => {
+          if (!touched.current) return prev;
+          const next = { ...stored };
+          for (const id of touched.current) next[id] = prev[id];
+          return next;
+        });
+      }
+      touched.current = null;
+    });
+  }, [store]);
+
+  useEffect(() => {
+    const onHide = () => document.visibilityState === "hidden" && flush();
+    window.addEventListener("pagehide", flush);
+    document.addEventListener("visibilitychange", onHide);
+    return () => {
+      window.removeEventListener("pagehide", flush);
+      document.removeEventListener("visibilitychange", onHide);
+      flush();
+    };
+  }, [flush]);
 
   const toggleSeen = useCallback((id) => {
     setLog((prev) => {
-      const entry = prev[id] || { seen: false, note: "", date: "" };
+      const entry = prev[id] || EMPTY;
       const seen = !entry.seen;
       const date = seen && !entry.date ? new Date().toISOString().slice(0, 10) : entry.date || "";
       const next = { ...prev, [id]: { ...entry, seen, date } };
-      save(next);
+      write(id, next[id]);
       return next;
     });
-  }, []);
+  }, [write]);
 
   const setNote = useCallback((id, note) => {
     setLog((prev) => {
-      const entry = prev[id] || { seen: false, note: "", date: "" };
+      const entry = prev[id] || EMPTY;
       const next = { ...prev, [id]: { ...entry, note } };
-      save(next);
+      write(id, next[id], true);
       return next;
     });
-  }, []);
+  }, [write]);
 
   const setDate = useCallback((id, date) => {
     setLog((prev) => {
-      const entry = prev[id] || { seen: false, note: "", date: "" };
+      const entry = prev[id] || EMPTY;
       const next = { ...prev, [id]: { ...entry, date } };
-      save(next);
+      write(id, next[id]);
       return next;
     });
-  }, []);
+  }, [write]);
 
+  // Bulk changes replace everything in one transaction, pending notes included
   const clearLog = useCallback(() => {
-    localStorage.removeItem(KEY);
+    clearTimeout(timer.current);
+    pending.current.clear();
+    touched.current = null;
+    store.clear();
     setLog({});
-  }, []);
+  }, [store]);
 
   const restoreLog = useCallback((imported) => {
-    localStorage.setItem(KEY, JSON.stringify(imported));
+    clearTimeout(timer.current);
+    pending.current.clear();
+    touched.current = null;
+    store.replace(imported);
     setLog(imported);
-  }, []);
+  }, [store]);
 
   return { log, toggleSeen, setNote, setDate, clearLog, restoreLog };
 }
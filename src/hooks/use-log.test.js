@@ -1,5 +1,7 @@
 import { renderHook, act } from "@testing-library/preact";
-import { useLog } from "./use-log.js";
+import { NOTE_DELAY, useLog } from "./use-log.js";
+
+const stored = () => JSON.parse(localStorage.getItem("wilddex-log"));
 
 beforeEach(() => localStorage.clear());
 
@@ -82,4 +84,56 @@ describe("useLog", () => {
     });
 
   });
+
+  describe("restoreLog", () => {
+    it("replaces state and storage with the imported log", () => {
+      localStorage.setItem("wilddex-log", JSON.stringify({ Grizzly_bear: { seen: true, note: "", date: "" } }));
+      const { result } = renderHook(() => useLog());
+      const imported = { Elk: { seen: true, note: "herd", date: "2025-09-01" } };
+      act(() => result.current.restoreLog(imported));
+      expect(result.current.log).toEqual(imported);
+      expect(stored()).toEqual(imported);
+    });
+  });
+
+  describe("note writes", () => {
+    beforeEach(() => vi.useFakeTimers());
+    afterEach(() => vi.useRealTimers());
+
+    it("waits for typing to pause", () => {
+      const { result } = renderHook(() => useLog());
+      act(() => result.current.setNote("Elk", "t"));
+      act(() => vi.advanceTimersByTime(NOTE_DELAY - 1));
+      act(() => result.current.setNote("Elk", "tracks"));
+      act(() => vi.advanceTimersByTime(NOTE_DELAY - 1));
+      expect(localStorage.getItem("wilddex-log")).toBeNull();
+      act(() => vi.advanceTimersByTime(1));
+      expect(stored().Elk.note).toBe("tracks");
+    });
+
+    it("are written right away with another change to the entry", () => {
+      const { result } = renderHook(() => useLog());
+      act(() => result.current.setNote("Elk", "tracks"));
+      act(() => result.current.setDate("Elk", "2025-10-01"));
+      expect(stored().Elk).toEqual({ seen: false, note: "tracks", date: "2025-10-01" });
+    });
+
+    it("are flushed when the page is hidden or the hook unmounts", () => {
+      const { result, unmount } = renderHook(() => useLog());
+      act(() => result.current.setNote("Elk", "tracks"));
+      window.dispatchEvent(new Event("pagehide"));
+      expect(stored().Elk.note).toBe("tracks");
+      act(() => result.current.setNote("Moose", "calf"));
+      unmount();
+      expect(stored().Moose.note).toBe("calf");
+    });
+
+    it("are dropped by clearLog", () => {
+      const { result } = renderHook(() => useLog());
+      act(() => result.current.setNote("Elk", "tracks"));
+      act(() => result.current.clearLog());
+      act(() => vi.advanceTimersByTime(NOTE_DELAY));
+      expect(localStorage.getItem("wilddex-log")).toBeNull();
+    });
+  });
 });
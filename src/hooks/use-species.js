@@ -1,6 +1,15 @@
-import { useState, useMemo } from "preact/hooks";
+import { useState, useEffect, useMemo, useRef } from "preact/hooks";
 import raw from "../data/species.json";
+import { createEngine } from "../lib/species-engine.js";
+import { createEngineClient } from "../lib/engine-client.js";
+import { emptyBits, equals, setBit } from "../lib/bitset.js";
 const data = raw.map((s, i) => ({ ...s, number: i + 1 }));
+const position = new Map(data.map((s, i) => [s.id, i]));
+
+// A species by id (with its number), e.g. for the neighbors in s.similar
+export function speciesById(id) {
+  return data[position.get(id)];
+}
 
 const STATUS_CODES = {
   "Least Concern": "LC",
@@ -13,43 +22,106 @@ const STATUS_CODES = {
   "Secure": "DD",
 };
 
+const NONE = emptyBits(data.length);
+const NO_OPTIONS = { types: [], statuses: [], places: [] };
+
+// Searching and filtering run in a worker (src/lib/species-worker.js) where
+// the browser has module workers, else on the main thread. Both are created
+// on first use.
+let engine = null;
+let client;
+
+function localEngine() {
+  // The shipped index is only fetched by the worker; this builds its own
+  return (engine ||= createEngine(data, null, STATUS_CODES));
+}
+
+function engineClient() {
+  if (client === undefined) {
+    client = typeof Worker === "undefined"
+      ? null
+      : createEngineClient(
+        new Worker(new URL("../lib/species-worker.js", import.meta.url), { type: "module" }),
+        // The SLIM_FIELDS of scrape/build.py, all the engine reads
+        data.map(({ id, name, species, type, region, places, conservation_status }) => ({
+          id, name, species, type, region, places, conservation_status,
+        })),
+        STATUS_CODES,
+        localEngine,
+      );
+  }
+  return client;
+}
+
+// Seen bitset, updated only for log entries whose object changed since the
+// last call (useLog replaces just the entry it touches).
+function useSeenBits(log) {
+  const prev = useRef({ log: {}, bits: NONE });
+  return useMemo(() => {
+    const { log: before, bits: old } = prev.current;
+    const bits = old.slice();
+    for (const id in log) {
+      if (log[id] !== before[id] && position.has(id)) setBit(bits, position.get(id), !!log[id]?.seen);
+    }
+    for (const id in before) {
+      if (!(id in log) && position.has(id)) setBit(bits, position.get(id), false);
+    }
+    prev.current = { log, bits: equals(bits, old) ? old : bits };
+    return prev.current.bits;
+  }, [log]);
+}
+
 export function useSpecies(log) {
   const [search, setSearch] = useState("");
   const [typeFilter, setTypeFilter] = useState("");
   const [seenFilter, setSeenFilter] = useState("");
   const [statusFilter, setStatusFilter] = useState("");
+  const [placeFilter, setPlaceFilter] = useState("");
 
-  const types = useMemo(
-    () => [...new Set(data.map((s) => s.type))].sort(),
-    [],
-  );
-
-  const statuses = useMemo(() => {
-    const codes = new Set();
-    for (const s of data) {
-      const code = STATUS_CODES[s.conservation_status];
-      if (code) codes.add(code);
-    }
-    return ["LC", "NT", "VU", "EN", "CR", "EX", "DD"].filter((c) => codes.has(c));
+  const remote = engineClient();
+  const [options, setOptions] = useState(() => (remote ? NO_OPTIONS : localEngine().options));
+  useEffect(() => {
+    remote?.options.then(setOptions);
   }, []);
 
-  const filtered = useMemo(() => {
-    const q = search.toLowerCase();
-    return data.filter((s) => {
-      if (typeFilter && s.type !== typeFilter) return false;
-      if (statusFilter && STATUS_CODES[s.conservation_status] !== statusFilter) return false;
-      if (q && !s.name.toLowerCase().includes(q)) return false;
-      if (seenFilter === "seen" && !log[s.id]?.seen) return false;
-      if (seenFilter === "unseen" && log[s.id]?.seen) return false;
-      return true;
+  const seen = useSeenBits(log);
+
+  const query = useMemo(() => ({
+    search,
+    type: typeFilter,
+    status: statusFilter,
+    place: placeFilter,
+    seen: seenFilter,
+    seenBits: seenFilter ? seen : null,
+  }), [search, typeFilter, statusFilter, placeFilter, seenFilter, seenFilter ? seen : null]);
+
+  // Positions to show, or null for all of them. From the worker they arrive
+  // asynchronously; a result for a query that's since changed is dropped.
+  const local = useMemo(() => (remote ? null : localEngine().query(query)), [query]);
+  const [answered, setAnswered] = useState(null);
+  useEffect(() => {
+    if (!remote) return;
+    let current = true;
+    remote.query(query).then((positions) => {
+      if (current && positions !== undefined) setAnswered(positions);
     });
-  }, [search, typeFilter, statusFilter, seenFilter, log]);
+    return () => {
+      current = false;
+    };
+  }, [query]);
+  const positions = remote ? answered : local;
+
+  const filtered = useMemo(() => (positions ? Array.from(positions, (i) => data[i]) : data), [positions]);
 
   return {
-    filtered, types, statuses,
+    filtered,
+    types: options.types,
+    statuses: options.statuses,
+    places: options.places,
     search, setSearch,
     typeFilter, setTypeFilter,
     statusFilter, setStatusFilter,
+    placeFilter, setPlaceFilter,
     seenFilter, setSeenFilter,
     STATUS_CODES,
   };
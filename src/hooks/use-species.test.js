@@ -1,5 +1,5 @@
 import { renderHook, act } from "@testing-library/preact";
-import { useSpecies } from "./use-species.js";
+import { speciesById, useSpecies } from "./use-species.js";
 
 vi.mock("../data/species.json", () => ({
   default: [
@@ -7,13 +7,13 @@ vi.mock("../data/species.json", () => ({
       id: "Grizzly_bear", name: "Grizzly Bear", species: "Ursus arctos", type: "Mammal",
       region: "Northwest", habitat: "Forest", conservation_status: "Least Concern",
       stats: { size: 90, speed: 60, rarity: 40, danger: 85 },
-      image: "images/animals/Grizzly_bear.png",
+      image: "images/animals/Grizzly_bear.png", places: "40800000001002",
     },
     {
       id: "Bald_eagle", name: "Bald Eagle", species: "Haliaeetus leucocephalus", type: "Bird",
       region: "Nationwide", habitat: "Wetlands", conservation_status: "Least Concern",
       stats: { size: 50, speed: 80, rarity: 30, danger: 20 },
-      image: "images/animals/Bald_eagle.png",
+      image: "images/animals/Bald_eagle.png", places: "800000000002",
     },
     {
       id: "Timber_rattlesnake", name: "Timber Rattlesnake", species: "Crotalus horridus", type: "Reptile",
@@ -35,6 +35,20 @@ describe("useSpecies", () => {
       expect(result.current.filtered[0].name).toBe("Grizzly Bear");
     });
 
+    it("matches latin names", () => {
+      const { result } = renderHook(() => useSpecies(emptyLog));
+      act(() => result.current.setSearch("crotalus"));
+      expect(result.current.filtered).toHaveLength(1);
+      expect(result.current.filtered[0].name).toBe("Timber Rattlesnake");
+    });
+
+    it("tolerates typos", () => {
+      const { result } = renderHook(() => useSpecies(emptyLog));
+      act(() => result.current.setSearch("rattlsnake"));
+      expect(result.current.filtered).toHaveLength(1);
+      expect(result.current.filtered[0].name).toBe("Timber Rattlesnake");
+    });
+
     it("returns empty when no match", () => {
       const { result } = renderHook(() => useSpecies(emptyLog));
       act(() => result.current.setSearch("unicorn"));
@@ -75,6 +89,23 @@ describe("useSpecies", () => {
     });
   });
 
+  describe("place filter", () => {
+    it("filters by state or province", () => {
+      const { result } = renderHook(() => useSpecies(emptyLog));
+      act(() => result.current.setPlaceFilter("WA"));
+      expect(result.current.filtered.map((s) => s.id)).toEqual(["Grizzly_bear", "Bald_eagle"]);
+      act(() => result.current.setPlaceFilter("BC"));
+      expect(result.current.filtered.map((s) => s.id)).toEqual(["Grizzly_bear"]);
+    });
+
+    it("combines with the type filter", () => {
+      const { result } = renderHook(() => useSpecies(emptyLog));
+      act(() => result.current.setPlaceFilter("AK"));
+      act(() => result.current.setTypeFilter("Bird"));
+      expect(result.current.filtered.map((s) => s.id)).toEqual(["Bald_eagle"]);
+    });
+  });
+
   describe("seen filter", () => {
     it("filters to seen species", () => {
       const log = { Grizzly_bear: { seen: true } };
@@ -92,6 +123,26 @@ describe("useSpecies", () => {
     });
   });
 
+  describe("seen tracking", () => {
+    it("follows log updates", () => {
+      const { result, rerender } = renderHook(({ log }) => useSpecies(log), { initialProps: { log: {} } });
+      act(() => result.current.setSeenFilter("seen"));
+      expect(result.current.filtered).toHaveLength(0);
+
+      rerender({ log: { Bald_eagle: { seen: true } } });
+      expect(result.current.filtered.map((s) => s.id)).toEqual(["Bald_eagle"]);
+
+      rerender({ log: { Bald_eagle: { seen: false } } });
+      expect(result.current.filtered).toHaveLength(0);
+
+      rerender({ log: { Grizzly_bear: { seen: true }, Unknown: { seen: true } } });
+      expect(result.current.filtered.map((s) => s.id)).toEqual(["Grizzly_bear"]);
+
+      rerender({ log: {} });
+      expect(result.current.filtered).toHaveLength(0);
+    });
+  });
+
   describe("combined filters", () => {
     it("applies search + type together (AND logic)", () => {
       const { result } = renderHook(() => useSpecies(emptyLog));
@@ -101,6 +152,15 @@ describe("useSpecies", () => {
       });
       expect(result.current.filtered).toHaveLength(0);
     });
+
+    it("keeps search ranking under filters", () => {
+      const { result } = renderHook(() => useSpecies(emptyLog));
+      act(() => {
+        result.current.setSearch("eastern");
+        result.current.setStatusFilter("VU");
+      });
+      expect(result.current.filtered.map((s) => s.id)).toEqual(["Timber_rattlesnake"]);
+    });
   });
 
   describe("computed arrays", () => {
@@ -113,5 +173,20 @@ describe("useSpecies", () => {
       const { result } = renderHook(() => useSpecies(emptyLog));
       expect(result.current.statuses).toEqual(["LC", "VU"]);
     });
+
+    it("returns places in PLACES order", () => {
+      const { result } = renderHook(() => useSpecies(emptyLog));
+      expect(result.current.places).toEqual(["AK", "ID", "WA", "BC"]);
+    });
+  });
+
+  describe("speciesById", () => {
+    it("finds a species with its number", () => {
+      expect(speciesById("Bald_eagle")).toMatchObject({ name: "Bald Eagle", number: 2 });
+    });
+
+    it("returns undefined for unknown ids", () => {
+      expect(speciesById("Gone_species")).toBeUndefined();
+    });
   });
 });
@@ -0,0 +1,78 @@
+// Fixed-size bitsets over species.json positions, stored as 32-bit words.
+// scrape/build.py emits facet bitsets in the same layout (bit i of word
+// i >> 5 is species i).
+
+import { placeCodes } from "./places.js";
+
+export function emptyBits(size) {
+  return new Uint32Array((size + 31) >>> 5);
+}
+
+export function fullBits(size) {
+  const bits = emptyBits(size).fill(0xffffffff);
+  if (size & 31) bits[bits.length - 1] = (1 << (size & 31)) - 1;
+  return bits;
+}
+
+export function fromWords(words, size) {
+  const bits = emptyBits(size);
+  bits.set(words.slice(0, bits.length));
+  return bits;
+}
+
+export function hasBit(bits, i) {
+  return (bits[i >>> 5] & (1 << (i & 31))) !== 0;
+}
+
+export function setBit(bits, i, on) {
+  if (on) bits[i >>> 5] |= 1 << (i & 31);
+  else bits[i >>> 5] &= ~(1 << (i & 31));
+}
+
+export function and(a, b) {
+  for (let w = 0; w < a.length; w++) a[w] &= b[w];
+  return a;
+}
+
+export function andNot(a, b) {
+  for (let w = 0; w < a.length; w++) a[w] &= ~b[w];
+  return a;
+}
+
+export function isEmpty(bits) {
+  for (let w = 0; w < bits.length; w++) if (bits[w]) return false;
+  return true;
+}
+
+export function equals(a, b) {
+  for (let w = 0; w < a.length; w++) if (a[w] !== b[w]) return false;
+  return true;
+}
+
+export function toIndices(bits) {
+  const out = [];
+  for (let w = 0; w < bits.length; w++) {
+    let word = bits[w];
+    while (word) {
+      const low = word & -word;
+      out.push((w << 5) + 31 - Math.clz32(low));
+      word ^= low;
+    }
+  }
+  return out;
+}
+
+// Same shape as build_facet_index() in scrape/build.py.
+export function buildFacets(records, statusCodes) {
+  const types = {};
+  const statuses = {};
+  const places = {};
+  records.forEach((s, i) => {
+    setBit((types[s.type] ||= emptyBits(records.length)), i, true);
+    const code = statusCodes[s.conservation_status];
+    if (code) setBit((statuses[code] ||= emptyBits(records.length)), i, true);
+    for (const place of placeCodes(s.places)) setBit((places[place] ||= emptyBits(records.length)), i, true);
+  });
+  const words = (facet) => Object.fromEntries(Object.entries(facet).map(([k, bits]) => [k, [...bits]]));
+  return { types: words(types), statuses: words(statuses), places: words(places) };
+}
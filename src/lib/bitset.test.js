@@ -0,0 +1,54 @@
+import { and, andNot, buildFacets, emptyBits, equals, fromWords, fullBits, hasBit, isEmpty, setBit, toIndices } from "./bitset.js";
+
+describe("bitset", () => {
+  it("masks the tail word of a full set", () => {
+    expect(toIndices(fullBits(35))).toEqual([...Array(35).keys()]);
+    expect(toIndices(fullBits(64))).toHaveLength(64);
+  });
+
+  it("sets, clears and reads bits", () => {
+    const bits = emptyBits(70);
+    setBit(bits, 0, true);
+    setBit(bits, 31, true);
+    setBit(bits, 69, true);
+    expect(toIndices(bits)).toEqual([0, 31, 69]);
+    setBit(bits, 31, false);
+    expect(hasBit(bits, 31)).toBe(false);
+    expect(hasBit(bits, 69)).toBe(true);
+  });
+
+  it("intersects and subtracts in place", () => {
+    const a = fromWords([0b1111], 40);
+    expect(toIndices(and(a.slice(), fromWords([0b0110], 40)))).toEqual([1, 2]);
+    expect(toIndices(andNot(a.slice(), fromWords([0b0110], 40)))).toEqual([0, 3]);
+  });
+
+  it("compares and tests emptiness", () => {
+    expect(isEmpty(emptyBits(10))).toBe(true);
+    expect(equals(fromWords([5], 10), fromWords([5], 10))).toBe(true);
+    expect(equals(fromWords([5], 10), fromWords([4], 10))).toBe(false);
+  });
+});
+
+describe("buildFacets", () => {
+  it("builds type and status bitsets in record order", () => {
+    const facets = buildFacets(
+      [
+        { type: "Bird", conservation_status: "Least Concern" },
+        { type: "Mammal", conservation_status: "Vulnerable" },
+        { type: "Bird" },
+      ],
+      { "Least Concern": "LC", "Vulnerable": "VU" },
+    );
+    expect(facets.types).toEqual({ Bird: [0b101], Mammal: [0b010] });
+    expect(facets.statuses).toEqual({ LC: [0b001], VU: [0b010] });
+  });
+
+  it("builds place bitsets from each record's places mask", () => {
+    const facets = buildFacets(
+      [{ type: "Bird", places: "3" }, { type: "Bird" }, { type: "Fish", places: "2" }],
+      {},
+    );
+    expect(facets.places).toEqual({ AL: [0b001], AK: [0b101] });
+  });
+});
@@ -0,0 +1,113 @@
+// The species records (species.json), loaded by main.jsx before the app's
+// modules are imported. vite.config.js points their imports of
+// src/data/species.json at dataset(), so the records aren't in the bundle and
+// a content fix doesn't make installed clients download all of them again.
+//
+// The records are kept in Cache Storage with their version. On each start the
+// cached copy is used right away, and brought up to date in the background
+// for the next start: from public/data/manifest.json, by applying the diffs
+// since its version (see scrape/dataset_versions.py), or by downloading
+// species.json whole when the manifest has no chain from it.
+
+import fullUrl from "../data/species.json?url";
+
+export const DATASET_CACHE = "dataset";
+
+let records = null;
+
+export function dataset() {
+  if (!records) throw new Error("dataset() called before loadDataset()");
+  return records;
+}
+
+// Records after one diff from scrape/dataset_versions.py
+export function applyDiff(before, diff) {
+  const byId = new Map(before.map((s) => [s.id, s]));
+  for (const id of diff.removed) byId.delete(id);
+  for (const { id, set, unset = [] } of diff.changed) {
+    const entry = { ...byId.get(id), ...set };
+    for (const field of unset) delete entry[field];
+    byId.set(id, entry);
+  }
+  for (const s of diff.added) byId.set(s.id, s);
+  const removed = new Set(diff.removed);
+  const order = diff.order || [...before.map((s) => s.id).filter((id) => !removed.has(id)), ...diff.added.map((s) => s.id)];
+  const after = order.map((id) => byId.get(id));
+  if (after.length !== diff.count || after.some((s) => !s?.id)) throw new Error(`diff ${diff.from}-${diff.to} doesn't apply`);
+  return after;
+}
+
+// The manifest's diffs leading from `version` to its own, or null if there's
+// no such chain
+export function diffChain(manifest, version) {
+  const chain = [];
+  for (let v = version; v !== manifest.version; v = chain[chain.length - 1].to) {
+    const next = manifest.diffs.find((d) => d.from === v);
+    if (!next) return null;
+    chain.push(next);
+  }
+  return chain;
+}
+
+async function sha1(buffer) {
+  const digest = await crypto.subtle.digest("SHA-1", buffer);
+  return [...new Uint8Array(digest)].map((b) => b.toString(16).padStart(2, "0")).join("");
+}
+
+// The release the manifest describes, from `stored` ({ version, records } or
+// null) and diffs where possible. Resolves to `stored` when it's current, or
+// when the manifest can't be fetched and there's a stored copy.
+export async function updateDataset(stored, base, { fetch = globalThis.fetch } = {}) {
+  const getJson = async (url, options) => {
+    const res = await fetch(url, options);
+    if (!res.ok) throw new Error(`${url}: ${res.status}`);
+    return res.json();
+  };
+
+  let manifest = null;
+  try {
+    manifest = await getJson(`${base}data/manifest.json`, { cache: "no-cache" });
+  } catch (e) {
+    if (stored) return stored;
+  }
+  if (stored && stored.version === manifest?.version) return stored;
+
+  const chain = stored && manifest && diffChain(manifest, stored.version);
+  if (chain) {
+    try {
+      let next = stored.records;
+      for (const d of chain) next = applyDiff(next, await getJson(`${base}${d.path}`));
+      return { version: manifest.version, records: next };
+    } catch {
+      // Download it whole instead
+    }
+  }
+
+  const res = await fetch(fullUrl);
+  if (!res.ok) throw new Error(`${fullUrl}: ${res.status}`);
+  const buffer = await res.arrayBuffer();
+  // An unknown version (null) is downloaded whole again next time
+  const version = manifest && (await sha1(buffer)) === manifest.hash ? manifest.version : null;
+  return { version, records: JSON.parse(new TextDecoder().decode(buffer)) };
+}
+
+// Sets the records dataset() returns: the cached release if there is one
+// (updating it in the background), else the current one from the network.
+export async function loadDataset(base, { fetch = globalThis.fetch, caches = globalThis.caches } = {}) {
+  const cache = caches && (await caches.open(DATASET_CACHE).catch(() => null));
+  const key = `${base}data/local.json`;
+  const stored = cache && (await (await cache.match(key))?.json().catch(() => null));
+
+  const update = updateDataset(stored || null, base, { fetch }).then(async (latest) => {
+    if (latest !== stored) await cache?.put(key, new Response(JSON.stringify(latest)));
+    return latest;
+  });
+
+  if (stored) {
+    update.catch(() => {});
+    records = stored.records;
+  } else {
+    records = (await update).records;
+  }
+  return records;
+}
@@ -0,0 +1,128 @@
+import { applyDiff, dataset, diffChain, loadDataset, updateDataset } from "./dataset.js";
+
+const V1 = [
+  { id: "Elk", name: "Elk", type: "Mammal" },
+  { id: "Moose", name: "Moose", type: "Mammal", region: "North" },
+  { id: "Loon", name: "Loon", type: "Bird" },
+];
+const V2 = [
+  { id: "Elk", name: "Elk", type: "Mammal", description: "Big." },
+  { id: "Loon", name: "Common Loon", type: "Bird" },
+  { id: "Puffin", name: "Puffin", type: "Bird" },
+];
+// As scrape/dataset_versions.py writes it
+const DIFF_1_2 = {
+  from: 1, to: 2, count: 3,
+  removed: ["Moose"],
+  added: [{ id: "Puffin", name: "Puffin", type: "Bird" }],
+  changed: [{ id: "Elk", set: { description: "Big." } }, { id: "Loon", set: { name: "Common Loon" } }],
+};
+
+const sha1 = async (text) => {
+  const digest = await crypto.subtle.digest("SHA-1", new TextEncoder().encode(text));
+  return [...new Uint8Array(digest)].map((b) => b.toString(16).padStart(2, "0")).join("");
+};
+
+// Serves `files` by URL suffix and records what was asked for
+function fakeFetch(files) {
+  const fetch = async (url) => {
+    fetch.urls.push(url);
+    const key = Object.keys(files).find((k) => url.endsWith(k));
+    if (!key) return new Response("", { status: 404 });
+    const body = files[key];
+    return new Response(typeof body === "string" ? body : JSON.stringify(body));
+  };
+  fetch.urls = [];
+  return fetch;
+}
+
+function fakeCaches(entries = {}) {
+  const store = new Map(Object.entries(entries).map(([k, v]) => [k, JSON.stringify(v)]));
+  const cache = {
+    match: async (key) => (store.has(key) ? new Response(store.get(key)) : undefined),
+    put: async (key, res) => {
+      store.set(key, await res.text());
+    },
+  };
+  return { store, open: async () => cache };
+}
+
+const settle = () => new Promise((resolve) => setTimeout(resolve));
+
+describe("applyDiff", () => {
+  it("removes, changes and adds records", () => {
+    expect(applyDiff(V1, DIFF_1_2)).toEqual(V2);
+    expect(V1[0]).not.toHaveProperty("description");
+  });
+
+  it("unsets fields and follows an explicit order", () => {
+    const diff = { from: 1, to: 2, count: 3, removed: [], added: [], changed: [{ id: "Moose", set: {}, unset: ["region"] }], order: ["Loon", "Elk", "Moose"] };
+    expect(applyDiff(V1, diff)).toEqual([V1[2], V1[0], { id: "Moose", name: "Moose", type: "Mammal" }]);
+  });
+
+  it("throws when the diff is for other records", () => {
+    expect(() => applyDiff(V1.slice(1), DIFF_1_2)).toThrow();
+  });
+});
+
+describe("diffChain", () => {
+  const manifest = { version: 4, diffs: [{ from: 2, to: 3 }, { from: 3, to: 4 }] };
+
+  it("lists the diffs from a version to the manifest's", () => {
+    expect(diffChain(manifest, 2)).toEqual(manifest.diffs);
+    expect(diffChain(manifest, 4)).toEqual([]);
+  });
+
+  it("is null when the version is too old or unknown", () => {
+    expect(diffChain(manifest, 1)).toBeNull();
+    expect(diffChain(manifest, null)).toBeNull();
+  });
+});
+
+describe("updateDataset", () => {
+  it("applies the diffs since the stored version", async () => {
+    const fetch = fakeFetch({
+      "data/manifest.json": { version: 2, diffs: [{ from: 1, to: 2, path: "data/diffs/1-2.json" }] },
+      "data/diffs/1-2.json": DIFF_1_2,
+    });
+    expect(await updateDataset({ version: 1, records: V1 }, "/", { fetch })).toEqual({ version: 2, records: V2 });
+    expect(fetch.urls).toEqual(["/data/manifest.json", "/data/diffs/1-2.json"]);
+  });
+
+  it("downloads everything when there's no chain, and checks the hash", async () => {
+    const body = JSON.stringify(V2);
+    const fetch = fakeFetch({ "data/manifest.json": { version: 2, hash: await sha1(body), diffs: [] }, "species.json": body });
+    expect(await updateDataset({ version: 1, records: V1 }, "/", { fetch })).toEqual({ version: 2, records: V2 });
+
+    const stale = fakeFetch({ "data/manifest.json": { version: 3, hash: "0", diffs: [] }, "species.json": body });
+    expect(await updateDataset(null, "/", { fetch: stale })).toEqual({ version: null, records: V2 });
+  });
+
+  it("keeps the stored records when current or offline", async () => {
+    const stored = { version: 1, records: V1 };
+    expect(await updateDataset(stored, "/", { fetch: fakeFetch({ "data/manifest.json": { version: 1, diffs: [] } }) })).toBe(stored);
+    expect(await updateDataset(stored, "/", { fetch: fakeFetch({}) })).toBe(stored);
+    await expect(updateDataset(null, "/", { fetch: fakeFetch({}) })).rejects.toThrow();
+  });
+});
+
+describe("loadDataset", () => {
+  const manifest = { version: 2, diffs: [{ from: 1, to: 2, path: "data/diffs/1-2.json" }] };
+
+  it("uses the stored records and updates them for next time", async () => {
+    const caches = fakeCaches({ "/data/local.json": { version: 1, records: V1 } });
+    const fetch = fakeFetch({ "data/manifest.json": manifest, "data/diffs/1-2.json": DIFF_1_2 });
+    expect(await loadDataset("/", { fetch, caches })).toEqual(V1);
+    expect(dataset()).toEqual(V1);
+    await settle();
+    expect(JSON.parse(caches.store.get("/data/local.json"))).toEqual({ version: 2, records: V2 });
+  });
+
+  it("waits for the network on first start", async () => {
+    const body = JSON.stringify(V2);
+    const caches = fakeCaches();
+    const fetch = fakeFetch({ "data/manifest.json": { version: 2, hash: await sha1(body), diffs: [] }, "species.json": body });
+    expect(await loadDataset("/", { fetch, caches })).toEqual(V2);
+    expect(JSON.parse(caches.store.get("/data/local.json")).version).toBe(2);
+  });
+});
@@ -0,0 +1,64 @@
+// Main-thread side of the data worker (species-worker.js). At most one query
+// is in the worker at a time; a query made meanwhile waits, and replaces any
+// query already waiting, so the worker skips keystrokes it can't keep up with.
+// If the worker fails, queries go to `fallback()` (a createEngine()) instead.
+
+export function createEngineClient(worker, records, statusCodes, fallback) {
+  let local = null;
+  let inFlight = null;
+  let waiting = null;
+  let nextId = 0;
+  let setOptions;
+  const options = new Promise((resolve) => (setOptions = resolve));
+
+  const send = (entry) => {
+    inFlight = entry;
+    worker.postMessage({ type: "query", id: entry.id, query: entry.query });
+  };
+
+  const next = () => {
+    inFlight = null;
+    if (waiting) {
+      const entry = waiting;
+      waiting = null;
+      send(entry);
+    }
+  };
+
+  worker.onmessage = ({ data }) => {
+    if (data.type === "ready") setOptions(data.options);
+    if (data.type === "result" && data.id === inFlight?.id) {
+      inFlight.resolve(data.positions);
+      next();
+    }
+  };
+
+  worker.onerror = () => {
+    worker.terminate();
+    local = fallback();
+    setOptions(local.options);
+    for (const entry of [inFlight, waiting]) entry?.resolve(local.query(entry.query));
+    inFlight = waiting = null;
+  };
+
+  worker.postMessage({ type: "init", records, statusCodes });
+
+  return {
+    // Resolves to createEngine().options once the worker has loaded
+    options,
+
+    // Resolves to createEngine().query()'s positions, or to undefined if a
+    // later query replaced this one before it reached the worker
+    query(query) {
+      if (local) return Promise.resolve(local.query(query));
+      return new Promise((resolve) => {
+        const entry = { id: ++nextId, query, resolve };
+        if (!inFlight) send(entry);
+        else {
+          waiting?.resolve(undefined);
+          waiting = entry;
+        }
+      });
+    },
+  };
+}
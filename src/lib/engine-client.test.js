@@ -0,0 +1,75 @@
+import { createEngineClient } from "./engine-client.js";
+
+// Records messages; the test answers them
+function fakeWorker() {
+  return {
+    sent: [],
+    terminated: false,
+    postMessage(message) {
+      this.sent.push(message);
+    },
+    terminate() {
+      this.terminated = true;
+    },
+    reply(data) {
+      this.onmessage({ data });
+    },
+  };
+}
+
+const queries = (worker) => worker.sent.filter((m) => m.type === "query");
+const flush = () => new Promise((resolve) => setTimeout(resolve));
+
+describe("createEngineClient", () => {
+  it("sends the records once, then resolves options when the worker is ready", async () => {
+    const worker = fakeWorker();
+    const client = createEngineClient(worker, [{ id: "Elk" }], { "Least Concern": "LC" }, null);
+    expect(worker.sent).toEqual([{ type: "init", records: [{ id: "Elk" }], statusCodes: { "Least Concern": "LC" } }]);
+    worker.reply({ type: "ready", options: { types: ["Mammal"] } });
+    expect(await client.options).toEqual({ types: ["Mammal"] });
+  });
+
+  it("keeps one query in flight and only the latest waiting", async () => {
+    const worker = fakeWorker();
+    const client = createEngineClient(worker, [], {}, null);
+    const results = [];
+    for (const search of ["b", "be", "bea", "bear"]) {
+      client.query({ search }).then((positions) => results.push([search, positions]));
+    }
+    expect(queries(worker).map((m) => m.query.search)).toEqual(["b"]);
+
+    worker.reply({ type: "result", id: queries(worker)[0].id, positions: Int32Array.of(1, 2) });
+    expect(queries(worker).map((m) => m.query.search)).toEqual(["b", "bear"]);
+    worker.reply({ type: "result", id: queries(worker)[1].id, positions: null });
+    await flush();
+
+    expect(results).toEqual([
+      ["be", undefined],
+      ["bea", undefined],
+      ["b", Int32Array.of(1, 2)],
+      ["bear", null],
+    ]);
+  });
+
+  it("ignores results for queries it isn't waiting on", async () => {
+    const worker = fakeWorker();
+    const client = createEngineClient(worker, [], {}, null);
+    const pending = client.query({ search: "elk" });
+    worker.reply({ type: "result", id: 99, positions: Int32Array.of(5) });
+    worker.reply({ type: "result", id: queries(worker)[0].id, positions: Int32Array.of(3) });
+    expect(await pending).toEqual(Int32Array.of(3));
+  });
+
+  it("answers from the fallback engine when the worker fails", async () => {
+    const worker = fakeWorker();
+    const engine = { options: { types: ["Bird"] }, query: ({ search }) => (search ? Int32Array.of(0) : null) };
+    const client = createEngineClient(worker, [], {}, () => engine);
+    const inFlight = client.query({ search: "owl" });
+    worker.onerror(new Event("error"));
+    expect(worker.terminated).toBe(true);
+    expect(await inFlight).toEqual(Int32Array.of(0));
+    expect(await client.options).toEqual({ types: ["Bird"] });
+    expect(await client.query({})).toBeNull();
+    expect(queries(worker)).toHaveLength(1);
+  });
+});
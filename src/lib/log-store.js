@@ -0,0 +1,101 @@
+// Sighting log storage. IndexedDB holds one record per species (keyed by id),
+// so a change writes just that entry instead of re-serializing the whole log.
+// Where IndexedDB is missing or won't open (jsdom, some private modes) the
+// log stays a single JSON string in localStorage under LEGACY_KEY, as before.
+// The first IndexedDB open moves an existing localStorage log into it.
+
+export const LEGACY_KEY = "wilddex-log";
+const DB_NAME = "wilddex";
+const DB_VERSION = 1;
+const STORE = "log";
+
+function readLegacy() {
+  try {
+    return JSON.parse(localStorage.getItem(LEGACY_KEY)) || {};
+  } catch {
+    return {};
+  }
+}
+
+const done = (request) => new Promise((resolve, reject) => {
+  request.onsuccess = () => resolve(request.result);
+  request.onerror = () => reject(request.error);
+});
+
+const committed = (tx) => new Promise((resolve, reject) => {
+  tx.oncomplete = () => resolve();
+  tx.onerror = tx.onabort = () => reject(tx.error);
+});
+
+// The whole log in localStorage, kept in memory between writes
+export function localLogStore() {
+  let log = null;
+  const current = () => (log ||= readLegacy());
+  const save = () => localStorage.setItem(LEGACY_KEY, JSON.stringify(log));
+  return {
+    peek: () => ({ ...current() }),
+    load: () => Promise.resolve(null),
+    put(id, entry) {
+      current()[id] = entry;
+      save();
+    },
+    replace(next) {
+      log = { ...next };
+      save();
+    },
+    clear() {
+      log = {};
+      localStorage.removeItem(LEGACY_KEY);
+    },
+  };
+}
+
+function openDb(factory) {
+  let migrated = false;
+  const request = factory.open(DB_NAME, DB_VERSION);
+  request.onupgradeneeded = () => {
+    const store = request.result.createObjectStore(STORE);
+    for (const [id, entry] of Object.entries(readLegacy())) store.put(entry, id);
+    migrated = true;
+  };
+  return done(request).then((db) => {
+    if (migrated) localStorage.removeItem(LEGACY_KEY);
+    return db;
+  });
+}
+
+export function idbLogStore(factory) {
+  const fallback = localLogStore();
+  // open() itself throws in some private modes
+  const db = Promise.resolve(factory).then(openDb).catch(() => null);
+  // One readwrite transaction per call, or the localStorage fallback if the
+  // database didn't open
+  const write = (apply, otherwise) => db.then((d) => {
+    if (!d) return otherwise();
+    const tx = d.transaction(STORE, "readwrite");
+    apply(tx.objectStore(STORE));
+    return committed(tx);
+  });
+  return {
+    // Until the migration runs, the old log is still in localStorage
+    peek: fallback.peek,
+    load: () => db.then(async (d) => {
+      if (!d) return null;
+      const store = d.transaction(STORE).objectStore(STORE);
+      const [ids, entries] = await Promise.all([done(store.getAllKeys()), done(store.getAll())]);
+      return Object.fromEntries(ids.map((id, i) => [id, entries[i]]));
+    }),
+    put: (id, entry) => write((s) => s.put(entry, id), () => fallback.put(id, entry)),
+    replace: (log) => write((s) => {
+      s.clear();
+      for (const [id, entry] of Object.entries(log)) s.put(entry, id);
+    }, () => fallback.replace(log)),
+    clear: () => write((s) => s.clear(), () => fallback.clear()),
+  };
+}
+
+// peek() is the log available synchronously; load() resolves to the stored
+// log once it's read, or null when peek() already had all of it.
+export function createLogStore() {
+  return globalThis.indexedDB ? idbLogStore(globalThis.indexedDB) : localLogStore();
+}
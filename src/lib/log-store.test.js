@@ -0,0 +1,125 @@
+import { LEGACY_KEY, createLogStore, idbLogStore, localLogStore } from "./log-store.js";
+
+const stored = () => JSON.parse(localStorage.getItem(LEGACY_KEY));
+
+// Just enough of IndexedDB for log-store.js: one database of Map stores,
+// requests and transactions that settle on a later tick
+function fakeIndexedDB() {
+  const stores = new Map();
+  const transactions = [];
+  let created = false;
+  const settle = (request, run) => {
+    setTimeout(() => {
+      request.result = run();
+      request.onsuccess?.();
+    });
+    return request;
+  };
+  const db = {
+    createObjectStore(name) {
+      const data = new Map();
+      stores.set(name, data);
+      return { put: (value, key) => data.set(key, value) };
+    },
+    transaction(name) {
+      const data = stores.get(name);
+      const tx = {
+        writes: 0,
+        objectStore: () => ({
+          put: (value, key) => (tx.writes++, settle({}, () => data.set(key, value))),
+          clear: () => (tx.writes++, settle({}, () => data.clear())),
+          getAll: () => settle({}, () => [...data.values()]),
+          getAllKeys: () => settle({}, () => [...data.keys()]),
+        }),
+      };
+      setTimeout(() => setTimeout(() => tx.oncomplete?.()));
+      transactions.push(tx);
+      return tx;
+    },
+  };
+  return {
+    stores,
+    transactions,
+    open() {
+      const request = { result: db };
+      setTimeout(() => {
+        if (!created) {
+          created = true;
+          request.onupgradeneeded();
+        }
+        request.onsuccess();
+      });
+      return request;
+    },
+  };
+}
+
+beforeEach(() => localStorage.clear());
+
+describe("localLogStore", () => {
+  it("peeks a copy of the saved log", () => {
+    localStorage.setItem(LEGACY_KEY, JSON.stringify({ Bald_eagle: { seen: true, note: "", date: "" } }));
+    const store = localLogStore();
+    const log = store.peek();
+    expect(log.Bald_eagle.seen).toBe(true);
+    store.put("Elk", { seen: true, note: "", date: "" });
+    expect(log.Elk).toBeUndefined();
+  });
+
+  it("writes entries into the saved log", () => {
+    localStorage.setItem(LEGACY_KEY, JSON.stringify({ Bald_eagle: { seen: true, note: "", date: "" } }));
+    const store = localLogStore();
+    store.put("Elk", { seen: false, note: "tracks", date: "" });
+    expect(Object.keys(stored())).toEqual(["Bald_eagle", "Elk"]);
+  });
+
+  it("replaces and clears", () => {
+    const store = localLogStore();
+    store.replace({ Elk: { seen: true, note: "", date: "" } });
+    expect(Object.keys(stored())).toEqual(["Elk"]);
+    store.clear();
+    expect(localStorage.getItem(LEGACY_KEY)).toBeNull();
+  });
+
+  it("has nothing to load beyond peek()", async () => {
+    expect(await localLogStore().load()).toBeNull();
+  });
+});
+
+describe("idbLogStore", () => {
+  it("falls back to localStorage when the database can't open", async () => {
+    const store = idbLogStore({ open: () => { throw new Error("blocked"); } });
+    expect(await store.load()).toBeNull();
+    await store.put("Elk", { seen: true, note: "", date: "" });
+    expect(stored().Elk.seen).toBe(true);
+  });
+
+  it("moves the localStorage log into the database on first open", async () => {
+    localStorage.setItem(LEGACY_KEY, JSON.stringify({ Bald_eagle: { seen: true, note: "hi", date: "" } }));
+    const factory = fakeIndexedDB();
+    const store = idbLogStore(factory);
+    expect(store.peek().Bald_eagle.note).toBe("hi");
+    expect(await store.load()).toEqual({ Bald_eagle: { seen: true, note: "hi", date: "" } });
+    expect(localStorage.getItem(LEGACY_KEY)).toBeNull();
+    expect(await idbLogStore(factory).load()).toEqual({ Bald_eagle: { seen: true, note: "hi", date: "" } });
+  });
+
+  it("writes one entry per put and bulk changes in one transaction", async () => {
+    const factory = fakeIndexedDB();
+    const store = idbLogStore(factory);
+    await store.put("Elk", { seen: true, note: "", date: "" });
+    expect(factory.transactions.at(-1).writes).toBe(1);
+    await store.replace({ Moose: { seen: true, note: "", date: "" }, Bison: { seen: false, note: "", date: "" } });
+    expect(factory.transactions.at(-1).writes).toBe(3);
+    expect([...factory.stores.get("log").keys()]).toEqual(["Moose", "Bison"]);
+    await store.clear();
+    expect(await store.load()).toEqual({});
+  });
+});
+
+describe("createLogStore", () => {
+  it("uses localStorage without IndexedDB", async () => {
+    expect(globalThis.indexedDB).toBeUndefined();
+    expect(await createLogStore().load()).toBeNull();
+  });
+});
@@ -0,0 +1,98 @@
+// "Download everything for offline fieldwork": saves every sprite and local
+// original into a cache the service worker falls back to (see vite.config.js),
+// outside the size-bounded runtime caches.
+
+export const OFFLINE_CACHE = "offline-pack";
+
+export function offlineSupported() {
+  return typeof caches !== "undefined";
+}
+
+export function offlineUrls(species, base) {
+  const urls = new Set();
+  for (const s of species) {
+    if (s.image) urls.add(`${base}${s.image}`);
+    if (s.fallback_image) urls.add(`${base}${s.fallback_image}`);
+  }
+  return [...urls];
+}
+
+// Fetches whatever isn't cached yet, `concurrency` requests at a time.
+// Resolves to { done, failed } once finished or aborted.
+export async function downloadOfflinePack(urls, { onProgress, signal, concurrency = 6 } = {}) {
+  const cache = await caches.open(OFFLINE_CACHE);
+  let next = 0;
+  let done = 0;
+  let failed = 0;
+
+  const worker = async () => {
+    while (next < urls.length && !signal?.aborted) {
+      const url = urls[next++];
+      if (!(await cache.match(url))) {
+        try {
+          const res = await fetch(url, { signal });
+          if (res.ok) await cache.put(url, res);
+          else failed++;
+        } catch {
+          if (signal?.aborted) return;
+          failed++;
+        }
+      }
+      done++;
+      onProgress?.(done, urls.length);
+    }
+  };
+
+  await Promise.all(Array.from({ length: concurrency }, worker));
+  return { done, failed };
+}
+
+export async function offlinePackCount() {
+  if (!offlineSupported() || !(await caches.has(OFFLINE_CACHE))) return 0;
+  const cache = await caches.open(OFFLINE_CACHE);
+  return (await cache.keys()).length;
+}
+
+export function removeOfflinePack() {
+  return caches.delete(OFFLINE_CACHE);
+}
+
+// One download at a time, surviving the Settings page being closed.
+let job = null;
+const listeners = new Set();
+
+function emit() {
+  const progress = job && { done: job.done, total: job.total };
+  for (const fn of listeners) fn(progress);
+}
+
+// Calls fn with { done, total } while a download runs, null otherwise.
+export function onOfflineProgress(fn) {
+  listeners.add(fn);
+  fn(job && { done: job.done, total: job.total });
+  return () => listeners.delete(fn);
+}
+
+export function startOfflineDownload(urls) {
+  if (job) return job.promise;
+  const controller = new AbortController();
+  job = { done: 0, total: urls.length, controller };
+  // Ask the browser not to evict the pack under storage pressure
+  navigator.storage?.persist?.();
+  job.promise = downloadOfflinePack(urls, {
+    signal: controller.signal,
+    onProgress: (done) => {
+      job.done = done;
+      emit();
+    },
+  }).finally(() => {
+    job = null;
+    emit();
+  });
+  emit();
+  return job.promise;
+}
+
+export function cancelOfflineDownload() {
+  job?.controller.abort();
+}
@@ -0,0 +1,78 @@
+import {
+  OFFLINE_CACHE, offlineUrls, downloadOfflinePack, offlinePackCount, onOfflineProgress, startOfflineDownload,
+} from "./offline-pack.js";
+
+function fakeCaches() {
+  const stores = new Map();
+  const open = async (name) => {
+    if (!stores.has(name)) stores.set(name, new Map());
+    const store = stores.get(name);
+    return {
+      match: async (url) => store.get(url),
+      put: async (url, res) => void store.set(url, res),
+      keys: async () => [...store.keys()],
+    };
+  };
+  return { stores, open, has: async (name) => stores.has(name), delete: async (name) => stores.delete(name) };
+}
+
+describe("offline pack", () => {
+  let store;
+
+  beforeEach(() => {
+    const fake = fakeCaches();
+    store = fake.stores;
+    vi.stubGlobal("caches", fake);
+    vi.stubGlobal("fetch", vi.fn(async (url) => ({ ok: !url.includes("missing"), url })));
+  });
+
+  afterEach(() => vi.unstubAllGlobals());
+
+  it("lists sprite and original urls once each", () => {
+    const urls = offlineUrls(
+      [
+        { image: "images/animals/A.png", fallback_image: "images/originals/A.webp" },
+        { image: "images/animals/placeholder.svg" },
+        { image: "images/animals/placeholder.svg" },
+      ],
+      "/pokedex/",
+    );
+    expect(urls).toEqual([
+      "/pokedex/images/animals/A.png",
+      "/pokedex/images/originals/A.webp",
+      "/pokedex/images/animals/placeholder.svg",
+    ]);
+  });
+
+  it("downloads into its own cache and skips what is already saved", async () => {
+    const urls = ["/a.png", "/b.png", "/missing.png"];
+    const progress = [];
+    const result = await downloadOfflinePack(urls, { onProgress: (done, total) => progress.push([done, total]) });
+    expect(result).toEqual({ done: 3, failed: 1 });
+    expect([...store.get(OFFLINE_CACHE).keys()].sort()).toEqual(["/a.png", "/b.png"]);
+    expect(progress.at(-1)).toEqual([3, 3]);
+
+    fetch.mockClear();
+    await downloadOfflinePack(urls);
+    expect(fetch.mock.calls.map(([url]) => url)).toEqual(["/missing.png"]);
+    expect(await offlinePackCount()).toBe(2);
+  });
+
+  it("stops when aborted", async () => {
+    const controller = new AbortController();
+    controller.abort();
+    const result = await downloadOfflinePack(["/a.png"], { signal: controller.signal });
+    expect(result.done).toBe(0);
+    expect(fetch).not.toHaveBeenCalled();
+  });
+
+  it("reports progress of the background job", async () => {
+    const seen = [];
+    const off = onOfflineProgress((p) => seen.push(p));
+    await startOfflineDownload(["/a.png", "/b.png"]);
+    off();
+    expect(seen[0]).toBeNull();
+    expect(seen).toContainEqual({ done: 2, total: 2 });
+    expect(seen.at(-1)).toBeNull();
+  });
+});
@@ -0,0 +1,23 @@
+// Responsive species photos written by scrape/transcode_photos.py and listed
+// in species.json as photo: { path, widths }. Every width exists in every
+// format, as {path}-{width}.{format}.
+
+// Best first; the browser takes the first <source> type it can decode
+// (must match PHOTO_FORMATS in scrape/build.py)
+export const PHOTO_FORMATS = ["avif", "webp"];
+
+// How wide the card's image frame renders: the app column is at most 600px
+export const PHOTO_SIZES = "(max-width: 600px) 100vw, 600px";
+
+export function photoUrl(photo, width, format, base = "") {
+  return `${base}${photo.path}-${width}.${format}`;
+}
+
+export function photoSrcset(photo, format, base = "") {
+  return photo.widths.map((w) => `${photoUrl(photo, w, format, base)} ${w}w`).join(", ");
+}
+
+// For <img src> where srcset isn't used: the largest WebP
+export function photoFallbackUrl(photo, base = "") {
+  return photoUrl(photo, photo.widths[photo.widths.length - 1], "webp", base);
+}
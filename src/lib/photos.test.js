@@ -0,0 +1,23 @@
+import { PHOTO_FORMATS, photoFallbackUrl, photoSrcset, photoUrl } from "./photos.js";
+
+const PHOTO = { path: "images/photos/Grizzly_bear", widths: [160, 220] };
+
+describe("photos", () => {
+  it("builds a url per width and format", () => {
+    expect(photoUrl(PHOTO, 160, "avif", "/pokedex/")).toBe("/pokedex/images/photos/Grizzly_bear-160.avif");
+  });
+
+  it("lists every width in a srcset with w descriptors", () => {
+    expect(photoSrcset(PHOTO, "webp", "/")).toBe(
+      "/images/photos/Grizzly_bear-160.webp 160w, /images/photos/Grizzly_bear-220.webp 220w",
+    );
+  });
+
+  it("falls back to the largest webp", () => {
+    expect(photoFallbackUrl(PHOTO)).toBe("images/photos/Grizzly_bear-220.webp");
+  });
+
+  it("offers avif before webp", () => {
+    expect(PHOTO_FORMATS).toEqual(["avif", "webp"]);
+  });
+});
@@ -0,0 +1,33 @@
+// Placeholders written by scrape/placeholders.py and listed in species.json
+// as placeholder: a PLACEHOLDER_SIZE x PLACEHOLDER_SIZE grid of the sprite's
+// colors, "rrggbb" per cell, row by row. Painted as a background behind the
+// sprite or photo so the image area isn't blank while it loads.
+
+// Must match PLACEHOLDER_SIZE in scrape/placeholders.py
+export const PLACEHOLDER_SIZE = 3;
+
+const percent = (value) => `${+value.toFixed(2)}%`;
+
+// One hard-stopped gradient per row of the grid, blocky like the sprites.
+// Rows overlap by a hair so no seam shows between them.
+export function placeholderBackground(placeholder) {
+  const colors = placeholder?.match(/[0-9a-f]{6}/gi);
+  if (colors?.length !== PLACEHOLDER_SIZE * PLACEHOLDER_SIZE) return undefined;
+  const cell = 100 / PLACEHOLDER_SIZE;
+  const rows = [];
+  for (let r = 0; r < PLACEHOLDER_SIZE; r++) {
+    const stops = colors
+      .slice(r * PLACEHOLDER_SIZE, (r + 1) * PLACEHOLDER_SIZE)
+      .map((c, i) => `#${c} ${percent(i * cell)} ${percent((i + 1) * cell)}`);
+    const y = percent((r * 100) / (PLACEHOLDER_SIZE - 1));
+    rows.push(`linear-gradient(to right, ${stops.join(", ")}) 0 ${y} / 100% ${percent(cell + 0.01)} no-repeat`);
+  }
+  return rows.join(", ");
+}
+
+// Style prop for the element showing a species' image; its CSS decides
+// where var(--placeholder) is painted
+export function placeholderStyle(species) {
+  const background = placeholderBackground(species.placeholder);
+  return background ? { "--placeholder": background } : undefined;
+}
@@ -0,0 +1,26 @@
+import { placeholderBackground, placeholderStyle } from "./placeholders.js";
+
+const GRID = "ff0000".repeat(3) + "00ff00".repeat(3) + "0000ff".repeat(3);
+
+describe("placeholders", () => {
+  it("paints one row of color blocks per grid row", () => {
+    const layers = placeholderBackground(GRID).split(/, (?=linear)/);
+    expect(layers).toHaveLength(3);
+    expect(layers[0]).toBe(
+      "linear-gradient(to right, #ff0000 0% 33.33%, #ff0000 33.33% 66.67%, #ff0000 66.67% 100%) 0 0% / 100% 33.34% no-repeat",
+    );
+    expect(layers[1]).toContain("#00ff00 0% 33.33%");
+    expect(layers[1]).toContain(" 0 50% / ");
+    expect(layers[2]).toContain(" 0 100% / ");
+  });
+
+  it("ignores missing or malformed placeholders", () => {
+    expect(placeholderBackground(undefined)).toBeUndefined();
+    expect(placeholderBackground("ff0000")).toBeUndefined();
+    expect(placeholderStyle({})).toBeUndefined();
+  });
+
+  it("returns a style for species with a placeholder", () => {
+    expect(placeholderStyle({ placeholder: GRID })["--placeholder"]).toBe(placeholderBackground(GRID));
+  });
+});
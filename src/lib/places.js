@@ -0,0 +1,39 @@
+// US states and Canadian provinces each species can be found in, written by
+// scrape/places.py (from its free-text region) and listed in species.json as
+// places: a hex bitmask, bit i for PLACES[i].
+
+// Code → name, in bit order (must match PLACES in scrape/places.py)
+export const PLACES = [
+  ["AL", "Alabama"], ["AK", "Alaska"], ["AZ", "Arizona"], ["AR", "Arkansas"], ["CA", "California"],
+  ["CO", "Colorado"], ["CT", "Connecticut"], ["DE", "Delaware"], ["DC", "District of Columbia"],
+  ["FL", "Florida"], ["GA", "Georgia"], ["HI", "Hawaii"], ["ID", "Idaho"], ["IL", "Illinois"],
+  ["IN", "Indiana"], ["IA", "Iowa"], ["KS", "Kansas"], ["KY", "Kentucky"], ["LA", "Louisiana"],
+  ["ME", "Maine"], ["MD", "Maryland"], ["MA", "Massachusetts"], ["MI", "Michigan"], ["MN", "Minnesota"],
+  ["MS", "Mississippi"], ["MO", "Missouri"], ["MT", "Montana"], ["NE", "Nebraska"], ["NV", "Nevada"],
+  ["NH", "New Hampshire"], ["NJ", "New Jersey"], ["NM", "New Mexico"], ["NY", "New York"],
+  ["NC", "North Carolina"], ["ND", "North Dakota"], ["OH", "Ohio"], ["OK", "Oklahoma"], ["OR", "Oregon"],
+  ["PA", "Pennsylvania"], ["RI", "Rhode Island"], ["SC", "South Carolina"], ["SD", "South Dakota"],
+  ["TN", "Tennessee"], ["TX", "Texas"], ["UT", "Utah"], ["VT", "Vermont"], ["VA", "Virginia"],
+  ["WA", "Washington"], ["WV", "West Virginia"], ["WI", "Wisconsin"], ["WY", "Wyoming"],
+  ["PR", "Puerto Rico"], ["VI", "US Virgin Islands"],
+  ["AB", "Alberta"], ["BC", "British Columbia"], ["MB", "Manitoba"], ["NB", "New Brunswick"],
+  ["NL", "Newfoundland and Labrador"], ["NS", "Nova Scotia"], ["NT", "Northwest Territories"],
+  ["NU", "Nunavut"], ["ON", "Ontario"], ["PE", "Prince Edward Island"], ["QC", "Quebec"],
+  ["SK", "Saskatchewan"], ["YT", "Yukon"],
+];
+
+export const PLACE_NAMES = Object.fromEntries(PLACES);
+
+// Codes in a places mask, in PLACES order. Read a hex digit (4 bits) at a
+// time from the low end, since the mask is wider than 53 bits.
+export function placeCodes(mask) {
+  const codes = [];
+  if (!mask) return codes;
+  for (let d = 0; d < mask.length; d++) {
+    const digit = parseInt(mask[mask.length - 1 - d], 16);
+    for (let b = 0; b < 4; b++) {
+      if (digit & (1 << b) && PLACES[d * 4 + b]) codes.push(PLACES[d * 4 + b][0]);
+    }
+  }
+  return codes;
+}
@@ -0,0 +1,22 @@
+import { PLACES, PLACE_NAMES, placeCodes } from "./places.js";
+
+describe("places", () => {
+  it("decodes a mask in PLACES order", () => {
+    expect(placeCodes("1")).toEqual(["AL"]);
+    expect(placeCodes("12")).toEqual(["AK", "CA"]);
+  });
+
+  it("decodes bits past 53", () => {
+    expect(placeCodes("30000000000000001")).toEqual(["AL", "SK", "YT"]);
+    expect(placeCodes("3ffffffffffffffff")).toHaveLength(PLACES.length);
+  });
+
+  it("returns nothing for a missing mask", () => {
+    expect(placeCodes(undefined)).toEqual([]);
+    expect(placeCodes("0")).toEqual([]);
+  });
+
+  it("names places by code", () => {
+    expect(PLACE_NAMES.QC).toBe("Quebec");
+  });
+});
@@ -0,0 +1,169 @@
+// Token search over the index emitted by scrape/build.py (search-index.json).
+// Postings are `doc * 8 + fieldBits`, doc being the position in species.json.
+
+const FIELDS = [["name", 1], ["species", 2], ["region", 4]];
+// Must match SEARCH_INDEX_VERSION in scrape/build.py
+const INDEX_VERSION = 2;
+const FIELD_WEIGHT = { 1: 3, 2: 2, 4: 1 };
+const EXACT = 3;
+const PREFIX = 2;
+const FUZZY = 1;
+
+export function normalize(text) {
+  return text
+    .normalize("NFKD")
+    .replace(/\p{Mn}/gu, "")
+    .toLowerCase()
+    .replace(/['’]/g, "")
+    .replace(/[^a-z0-9]+/g, " ")
+    .trim();
+}
+
+function trigrams(term) {
+  const padded = `$${term}$`;
+  const grams = new Set();
+  for (let i = 0; i + 3 <= padded.length; i++) grams.add(padded.slice(i, i + 3));
+  return [...grams];
+}
+
+// Same shape as build_search_index() in scrape/build.py. Only used when the
+// shipped index is stale relative to species.json (or in tests with mock data).
+export function buildIndex(records) {
+  const postings = new Map();
+  records.forEach((s, doc) => {
+    for (const [field, bit] of FIELDS) {
+      for (const token of normalize(s[field] || "").split(" ")) {
+        if (!token) continue;
+        if (!postings.has(token)) postings.set(token, new Map());
+        const bits = postings.get(token);
+        bits.set(doc, (bits.get(doc) || 0) | bit);
+      }
+    }
+  });
+  const terms = [...postings.keys()].sort();
+  const grams = {};
+  terms.forEach((term, id) => {
+    for (const g of trigrams(term).sort()) (grams[g] ||= []).push(id);
+  });
+  return {
+    version: INDEX_VERSION,
+    ids: records.map((s) => s.id),
+    terms,
+    postings: terms.map((t) => [...postings.get(t)].sort((a, b) => a[0] - b[0]).map(([doc, bits]) => doc * 8 + bits)),
+    grams,
+  };
+}
+
+function lowerBound(terms, q) {
+  let lo = 0;
+  let hi = terms.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >> 1;
+    if (terms[mid] < q) lo = mid + 1;
+    else hi = mid;
+  }
+  return lo;
+}
+
+function fieldScore(bits) {
+  let best = 0;
+  for (const bit of [1, 2, 4]) if (bits & bit) best = Math.max(best, FIELD_WEIGHT[bit]);
+  return best;
+}
+
+// Levenshtein distance, giving up once it exceeds `max`.
+function withinDistance(a, b, max) {
+  if (Math.abs(a.length - b.length) > max) return false;
+  let prev = Array.from({ length: b.length + 1 }, (_, j) => j);
+  for (let i = 1; i <= a.length; i++) {
+    const cur = [i];
+    let rowMin = i;
+    for (let j = 1; j <= b.length; j++) {
+      const cost = a[i - 1] === b[j - 1] ? 0 : 1;
+      cur[j] = Math.min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost);
+      if (cur[j] < rowMin) rowMin = cur[j];
+    }
+    if (rowMin > max) return false;
+    prev = cur;
+  }
+  return prev[b.length] <= max;
+}
+
+function fuzzyTerms(index, token) {
+  const max = token.length >= 8 ? 2 : 1;
+  const grams = trigrams(token);
+  const shared = new Map();
+  for (const g of grams) {
+    for (const id of index.grams[g] || []) shared.set(id, (shared.get(id) || 0) + 1);
+  }
+  // One edit destroys at most three trigrams
+  const need = Math.max(1, grams.length - 3 * max);
+  const out = [];
+  for (const [id, count] of shared) {
+    if (count >= need && withinDistance(token, index.terms[id], max)) out.push(id);
+  }
+  return out;
+}
+
+// Matching term ids for one query token, each with its match strength.
+function matchToken(index, token) {
+  const { terms } = index;
+  const matches = [];
+  for (let i = lowerBound(terms, token); i < terms.length && terms[i].startsWith(token); i++) {
+    matches.push([i, terms[i] === token ? EXACT : PREFIX]);
+  }
+  if (!matches.length && token.length >= 4) {
+    for (const id of fuzzyTerms(index, token)) matches.push([id, FUZZY]);
+  }
+  return matches;
+}
+
+// Ranked doc positions matching every token of `query`, or null for an empty
+// query. Ties keep species.json (popularity) order.
+export function search(index, query, names) {
+  const tokens = normalize(query).split(" ").filter(Boolean);
+  if (!tokens.length) return null;
+
+  let scores = null;
+  for (const token of tokens) {
+    const best = new Map();
+    for (const [termId, strength] of matchToken(index, token)) {
+      for (const code of index.postings[termId]) {
+        const doc = Math.floor(code / 8);
+        if (scores && !scores.has(doc)) continue;
+        const score = strength * fieldScore(code & 7);
+        if (score > (best.get(doc) || 0)) best.set(doc, score);
+      }
+    }
+    if (scores) for (const [doc, score] of best) best.set(doc, score + scores.get(doc));
+    scores = best;
+    if (!scores.size) return [];
+  }
+
+  if (names) {
+    const phrase = tokens.join(" ");
+    for (const [doc, score] of scores) {
+      const name = names[doc];
+      if (name === phrase) scores.set(doc, score + 20);
+      else if (name.startsWith(phrase)) scores.set(doc, score + 10);
+    }
+  }
+
+  return [...scores].sort((a, b) => b[1] - a[1] || a[0] - b[0]).map(([doc]) => doc);
+}
+
+// Whether a shipped index was built from exactly these records.
+export function isFresh(shipped, records) {
+  return (
+    shipped?.version === INDEX_VERSION &&
+    shipped.ids.length === records.length &&
+    shipped.ids.every((id, i) => id === records[i].id)
+  );
+}
+
+// Use the shipped index when it matches `records`, otherwise rebuild it.
+export function createSearch(shipped, records) {
+  const index = isFresh(shipped, records) ? shipped : buildIndex(records);
+  const names = records.map((s) => normalize(s.name));
+  return (query) => search(index, query, names);
+}
@@ -0,0 +1,87 @@
+import { buildIndex, createSearch, normalize, search } from "./search.js";
+
+const SPECIES = [
+  { id: "Bald_eagle", name: "Bald Eagle", species: "Haliaeetus leucocephalus", region: "Continental US, Alaska" },
+  { id: "Grizzly_bear", name: "Grizzly Bear", species: "Ursus arctos", region: "Northwest" },
+  { id: "Bear_Lake_sculpin", name: "Bear Lake Sculpin", species: "Cottus extensus", region: "Bear Lake, Utah" },
+  { id: "Common_coqui", name: "Common Coquí", species: "Eleutherodactylus coqui", region: "Puerto Rico, Hawaii (introduced)" },
+  { id: "Aberts_towhee", name: "Abert's Towhee", species: "Melozone aberti", region: "Southwestern US" },
+];
+
+describe("normalize", () => {
+  it("lowercases, strips accents and apostrophes", () => {
+    expect(normalize("Common Coquí")).toBe("common coqui");
+    expect(normalize("Abert's Towhee")).toBe("aberts towhee");
+  });
+
+  it("splits on punctuation", () => {
+    expect(normalize("  Sea-eagle, (introduced) ")).toBe("sea eagle introduced");
+  });
+});
+
+describe("buildIndex", () => {
+  it("sorts terms and encodes field bits in postings", () => {
+    const index = buildIndex(SPECIES);
+    expect(index.ids).toEqual(SPECIES.map((s) => s.id));
+    expect([...index.terms].sort()).toEqual(index.terms);
+    // "bear": Grizzly Bear name (1), Bear Lake Sculpin name + region (1|4)
+    expect(index.postings[index.terms.indexOf("bear")]).toEqual([1 * 8 + 1, 2 * 8 + 5]);
+  });
+});
+
+describe("search", () => {
+  const index = buildIndex(SPECIES);
+  const names = SPECIES.map((s) => normalize(s.name));
+  const find = (q) => {
+    const hits = search(index, q, names);
+    return hits && hits.map((i) => SPECIES[i].id);
+  };
+
+  it("returns null for an empty query", () => {
+    expect(find("")).toBeNull();
+    expect(find(" !! ")).toBeNull();
+  });
+
+  it("matches token prefixes", () => {
+    expect(find("griz")).toEqual(["Grizzly_bear"]);
+    expect(find("bald ea")).toEqual(["Bald_eagle"]);
+  });
+
+  it("matches latin names", () => {
+    expect(find("ursus")).toEqual(["Grizzly_bear"]);
+    expect(find("haliaeetus leuco")).toEqual(["Bald_eagle"]);
+  });
+
+  it("matches region tokens", () => {
+    expect(find("hawaii")).toEqual(["Common_coqui"]);
+  });
+
+  it("tolerates typos", () => {
+    expect(find("grizly")).toEqual(["Grizzly_bear"]);
+    expect(find("towhie")).toEqual(["Aberts_towhee"]);
+    expect(find("eleutherodactilus")).toEqual(["Common_coqui"]);
+  });
+
+  it("requires every token to match", () => {
+    expect(find("grizzly eagle")).toEqual([]);
+  });
+
+  it("ranks name-prefix matches first", () => {
+    expect(find("bear")).toEqual(["Bear_Lake_sculpin", "Grizzly_bear"]);
+  });
+});
+
+describe("createSearch", () => {
+  it("uses the shipped index when it matches the records", () => {
+    const shipped = buildIndex(SPECIES);
+    shipped.postings[shipped.terms.indexOf("grizzly")] = [0 * 8 + 1];
+    const query = createSearch(shipped, SPECIES);
+    expect(query("grizzly")).toEqual([0]);
+  });
+
+  it("rebuilds a stale index", () => {
+    const stale = buildIndex(SPECIES.slice(0, 2));
+    const query = createSearch(stale, SPECIES);
+    expect(query("coqui")).toEqual([3]);
+  });
+});
@@ -0,0 +1,49 @@
+// Search and filtering over species.json positions. Runs in the data worker
+// (species-worker.js), or on the main thread where workers aren't available.
+
+import { createSearch, isFresh } from "./search.js";
+import { and, andNot, buildFacets, emptyBits, fromWords, fullBits, hasBit, toIndices } from "./bitset.js";
+import { PLACES } from "./places.js";
+
+const STATUS_ORDER = ["LC", "NT", "VU", "EN", "CR", "EX", "DD"];
+
+// `records` need the SLIM_FIELDS of scrape/build.py. `shipped` is the search
+// index, used (with its facets) when it was built from these records.
+export function createEngine(records, shipped, statusCodes) {
+  const search = createSearch(shipped, records);
+  const facets = isFresh(shipped, records) && shipped.facets
+    ? shipped.facets
+    : buildFacets(records, statusCodes);
+  const toBits = (facet) => Object.fromEntries(Object.entries(facet || {}).map(([k, words]) => [k, fromWords(words, records.length)]));
+  const typeBits = toBits(facets.types);
+  const statusBits = toBits(facets.statuses);
+  const placeBits = toBits(facets.places);
+  const none = emptyBits(records.length);
+
+  return {
+    // Values the filters can take
+    options: {
+      types: Object.keys(typeBits).sort(),
+      statuses: STATUS_ORDER.filter((c) => c in statusBits),
+      places: PLACES.map(([code]) => code).filter((c) => c in placeBits),
+    },
+
+    // Positions matching every filter, ranked by the search when there is
+    // one, else in species.json order; null when nothing is filtered out.
+    // `seenBits` (positions in the sighting log) is needed for seen/unseen.
+    query({ search: text = "", type = "", status = "", place = "", seen = "", seenBits = null }) {
+      let bits = null;
+      if (type || status || place || seen) {
+        bits = fullBits(records.length);
+        if (type) and(bits, typeBits[type] || none);
+        if (status) and(bits, statusBits[status] || none);
+        if (place) and(bits, placeBits[place] || none);
+        if (seen === "seen") and(bits, seenBits || none);
+        if (seen === "unseen") andNot(bits, seenBits || none);
+      }
+      const matches = search(text);
+      if (matches) return Int32Array.from(bits ? matches.filter((i) => hasBit(bits, i)) : matches);
+      return bits && Int32Array.from(toIndices(bits));
+    },
+  };
+}
@@ -0,0 +1,48 @@
+import { createEngine } from "./species-engine.js";
+import { buildIndex } from "./search.js";
+import { fromWords } from "./bitset.js";
+
+const RECORDS = [
+  { id: "Grizzly_bear", name: "Grizzly Bear", species: "Ursus arctos", type: "Mammal", region: "Northwest", conservation_status: "Least Concern", places: "2" },
+  { id: "Bald_eagle", name: "Bald Eagle", species: "Haliaeetus leucocephalus", type: "Bird", region: "Nationwide", conservation_status: "Least Concern", places: "3" },
+  { id: "Black_bear", name: "Black Bear", species: "Ursus americanus", type: "Mammal", region: "Eastern", conservation_status: "Vulnerable" },
+];
+const STATUS_CODES = { "Least Concern": "LC", "Vulnerable": "VU" };
+
+describe("createEngine", () => {
+  const engine = createEngine(RECORDS, null, STATUS_CODES);
+
+  it("lists the filter options present", () => {
+    expect(engine.options).toEqual({ types: ["Bird", "Mammal"], statuses: ["LC", "VU"], places: ["AL", "AK"] });
+  });
+
+  it("returns null when nothing is filtered", () => {
+    expect(engine.query({})).toBeNull();
+    expect(engine.query({ search: "  " })).toBeNull();
+  });
+
+  it("ANDs filters in species.json order", () => {
+    expect([...engine.query({ type: "Mammal" })]).toEqual([0, 2]);
+    expect([...engine.query({ type: "Mammal", place: "AK" })]).toEqual([0]);
+    expect([...engine.query({ status: "VU", place: "AK" })]).toEqual([]);
+  });
+
+  it("filters by seen bits", () => {
+    const seenBits = fromWords([0b010], RECORDS.length);
+    expect([...engine.query({ seen: "seen", seenBits })]).toEqual([1]);
+    expect([...engine.query({ seen: "unseen", seenBits })]).toEqual([0, 2]);
+  });
+
+  it("keeps search ranking under filters", () => {
+    expect([...engine.query({ search: "bear" })]).toEqual([0, 2]);
+    expect([...engine.query({ search: "black bear", type: "Mammal" })]).toEqual([2]);
+    expect([...engine.query({ search: "ursus", status: "VU" })]).toEqual([2]);
+  });
+
+  it("uses a fresh shipped index and its facets", () => {
+    const shipped = { ...buildIndex(RECORDS), facets: { types: { Fish: [0b111] }, statuses: {}, places: {} } };
+    const fresh = createEngine(RECORDS, shipped, STATUS_CODES);
+    expect(fresh.options.types).toEqual(["Fish"]);
+    expect([...fresh.query({ type: "Fish" })]).toEqual([0, 1, 2]);
+  });
+});
@@ -0,0 +1,31 @@
+// Data worker: owns the search index and answers useSpecies' queries, so
+// searching and filtering never run on the main thread. The index is fetched
+// as a plain asset (not bundled), the records arrive from the page once.
+//
+// Messages in:  { type: "init", records, statusCodes }
+//               { type: "query", id, query }      (see createEngine().query)
+// Messages out: { type: "ready", options }
+//               { type: "result", id, positions } (Int32Array, transferred, or null)
+
+import indexUrl from "../data/search-index.json?url";
+import { createEngine } from "./species-engine.js";
+
+let engine = null;
+let ready = null;
+
+self.onmessage = async ({ data }) => {
+  if (data.type === "init") {
+    // Without the shipped index the engine builds its own from the records
+    ready = fetch(indexUrl)
+      .then((r) => (r.ok ? r.json() : null))
+      .catch(() => null)
+      .then((shipped) => {
+        engine = createEngine(data.records, shipped, data.statusCodes);
+        self.postMessage({ type: "ready", options: engine.options });
+      });
+    return;
+  }
+  await ready;
+  const positions = engine.query(data.query);
+  self.postMessage({ type: "result", id: data.id, positions }, positions ? [positions.buffer] : []);
+};
@@ -1,6 +1,6 @@
 import { render } from "preact";
 import { registerSW } from "virtual:pwa-register";
-import { App } from "./app.jsx";
+import { loadDataset } from "./lib/dataset.js";
 import "./app.css";
 
 registerSW({
@@ -14,4 +14,11 @@ registerSW({
   },
 });
 
-render(<App />, document.getElementById("app"));
+// The app's modules read the records as they're imported (see vite.config.js)
+const root = document.getElementById("app");
+loadDataset(import.meta.env.BASE_URL)
+  .then(() => import("./app.jsx"))
+  .then(({ App }) => render(<App />, root))
+  .catch(() => {
+    root.textContent = "Couldn't load the species data. Check your connection and reload.";
+  });
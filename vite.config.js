@@ -1,15 +1,64 @@
+import { existsSync, readFileSync } from "node:fs";
+import { fileURLToPath } from "node:url";
 import { defineConfig } from "vite";
 import preact from "@preact/preset-vite";
 import { VitePWA } from "vite-plugin-pwa";
 
-export default defineConfig({
+// Written by scrape/build.py: the most popular sprites to precache on install,
+// and LRU sizes for everything cached on demand afterwards
+const PLAN_PATH = new URL("./src/data/precache-plan.json", import.meta.url);
+const plan = existsSync(PLAN_PATH)
+  ? JSON.parse(readFileSync(PLAN_PATH, "utf8"))
+  : { precache: [], runtime: { sprites: 600, originals: 150, photos: 150 } };
+
+// Images saved by "download for offline" (src/lib/offline-pack.js) live in their
+// own cache so LRU eviction never touches them; serve them when the LRU cache misses.
+// Serialized into the generated service worker, so it must be self-contained.
+const offlinePackFallback = {
+  cachedResponseWillBeUsed: async ({ request, cachedResponse }) =>
+    cachedResponse || (await caches.match(request, { cacheName: "offline-pack" })) || null,
+};
+
+// The offline pack holds each species' original, not every photo size and
+// format; serve images/photos/{slug}-{w}.{avif,webp} from images/originals/{slug}.webp
+const offlinePhotoFallback = {
+  cachedResponseWillBeUsed: async ({ request, cachedResponse }) =>
+    cachedResponse ||
+    (await caches.match(request.url.replace(/\/photos\/(.+)-\d+\.\w+$/, "/originals/$1.webp"), {
+      cacheName: "offline-pack",
+    })) ||
+    null,
+};
+
+// The app's imports of src/data/species.json get the records src/lib/dataset.js
+// loaded (from Cache Storage, updated by diff) instead of bundling them.
+// Tests keep importing the file itself.
+const DATASET_PATH = fileURLToPath(new URL("./src/lib/dataset.js", import.meta.url));
+const RECORDS_ID = "\0dataset-records";
+const datasetRecords = {
+  name: "dataset-records",
+  enforce: "pre",
+  resolveId(source, importer) {
+    if (source.endsWith("/data/species.json") && importer !== DATASET_PATH) return RECORDS_ID;
+  },
+  load(id) {
+    if (id === RECORDS_ID) return `import { dataset } from ${JSON.stringify(DATASET_PATH)};\nexport default dataset();\n`;
+  },
+};
+
+export default defineConfig(({ mode }) => ({
   base: "/pokedex/",
   test: {
     environment: "jsdom",
     globals: true,
     setupFiles: ["./src/test-setup.js"],
   },
+  // The data worker (src/lib/species-worker.js) is a module worker
+  worker: {
+    format: "es",
+  },
   plugins: [
+    mode === "test" ? null : datasetRecords,
     preact(),
     VitePWA({
       registerType: "autoUpdate",
@@ -31,9 +80,52 @@ export default defineConfig({
         ],
       },
       workbox: {
-        globPatterns: ["**/*.{js,css,html,json,png,jpg,svg,webp}"],
-        maximumFileSizeToCacheInBytes: 4 * 1024 * 1024,
+        // App shell (and the search index the data worker fetches); sprites
+        // come from the plan, originals on demand
+        globPatterns: ["**/*.{js,css,html,svg,json}"],
+        // dataset.js keeps the records itself, and must see new manifests
+        globIgnores: ["**/species-*.json", "data/**"],
+        additionalManifestEntries: plan.precache,
+        maximumFileSizeToCacheInBytes: 8 * 1024 * 1024,
+        runtimeCaching: [
+          {
+            urlPattern: /\/images\/animals\/[^/]+\.png$/,
+            handler: "CacheFirst",
+            options: {
+              cacheName: "sprites",
+              expiration: { maxEntries: plan.runtime.sprites },
+              plugins: [offlinePackFallback],
+            },
+          },
+          {
+            urlPattern: /\/images\/originals\//,
+            handler: "CacheFirst",
+            options: {
+              cacheName: "originals",
+              expiration: { maxEntries: plan.runtime.originals },
+              plugins: [offlinePackFallback],
+            },
+          },
+          {
+            urlPattern: /\/images\/photos\//,
+            handler: "CacheFirst",
+            options: {
+              cacheName: "photos",
+              expiration: { maxEntries: plan.runtime.photos },
+              plugins: [offlinePhotoFallback],
+            },
+          },
+          {
+            urlPattern: /^https:\/\/upload\.wikimedia\.org\//,
+            handler: "CacheFirst",
+            options: {
+              cacheName: "wikimedia",
+              expiration: { maxEntries: plan.runtime.originals },
+              cacheableResponse: { statuses: [0, 200] },
+            },
+          },
+        ],
       },
     }),
   ],
-});
+}));